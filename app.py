@@ -1,241 +1,431 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
-import joblib
 import os
 
-# Import modular components
+# Import modular components. Only the lightweight instrumentation is imported
+# up front; each page imports its own helpers (and with them plotly, the
+# dataset or the model) when it is first shown.
 from helper import (
-    # Dashboard functions
-    create_status_distribution, create_course_success_rate, 
-    create_age_distribution, create_grade_analysis,
-    create_economic_impact, create_scholarship_impact,
-    
-    # Prediction functions
-    user_input_features, predict_student_status
+    # Instrumentation
+    timed, metrics_enabled, stage_metrics, start_exporters_from_env, profiling_allowed, start_profile, stop_profile
 )
 
-# Load model, scaller, and data
-try:
-    model_path = 'model/rf_model.pkl'
-    if os.path.exists(model_path):
-        model = joblib.load(model_path)
-        model_loaded = True
-    else:
-        st.error(f"Model file not found: {model_path}")
-        model_loaded = False
-except Exception as e:
-    st.error(f"Error loading model: {str(e)}")
-    model_loaded = False
-    
+# Stage timing exporters (STUDENT_METRICS=1, STUDENT_METRICS_PORT / STUDENT_METRICS_LOG)
+start_exporters_from_env()
+
+# Opt-in profile of this single rerun: open the app with ?profile=cprofile (or ?profile=pyinstrument).
+# Only honoured when the operator enabled it (STUDENT_METRICS=1 or STUDENT_PROFILE=1).
+profile_mode = st.query_params.get("profile") if profiling_allowed() else None
+profile = start_profile(profile_mode) if profile_mode else None
+
+
+def load_model():
+    """
+    Return the model bundle (shared per process, memory-mapped, reloaded when the file changes).
+
+    Without a bundle file the three pickles are loaded and packed in memory,
+    which is the only path that imports scikit-learn. Returns None (after
+    showing the error) when no model can be loaded.
+    """
+    from helper import load_artifact, load_bundle, bundle_identity, get_bundle, check_feature_names, DEFAULT_BUNDLE_PATH
+
+    try:
+        if os.path.exists(DEFAULT_BUNDLE_PATH):
+            return load_artifact(DEFAULT_BUNDLE_PATH, loader=load_bundle, identify=bundle_identity)
+        model_path = 'model/rf_model.pkl'
+        scaller_path = 'model/scaller.pkl'
+        encoder_path = 'model/label_lencoder.pkl'
+        missing = [path for path in (model_path, scaller_path, encoder_path) if not os.path.exists(path)]
+        if missing:
+            st.error(f"Model file not found: {', '.join(missing)}")
+            return None
+        scaller = load_artifact(scaller_path)
+        check_feature_names(scaller)
+        return get_bundle(load_artifact(model_path), scaller, load_artifact(encoder_path))
+    except Exception as e:
+        st.error(f"Error loading model: {str(e)}")
+        return None
+
+
+# Always stop the profiler, also when Streamlit interrupts this rerun (widget change, st.stop)
 try:
-    scaller_path = 'model/scaller.pkl'
-    if os.path.exists(scaller_path):
-        scaller = joblib.load(scaller_path)
-        scaller_loaded = True
-    else:
-        st.error(f"Scaller file not found: {scaller_path}")
-        scaller_loaded = False
-except Exception as e:
-    st.error(f"Error loading scaller: {str(e)}")
-    scaller_loaded = False
-
-# Load dataset for visualization purposes only
-data = pd.read_csv("data/data_students.csv", delimiter=",")
-
-# Map course codes to names
-course_mapping = {
-    33: 'Biofuel Production Technologies',
-    171: 'Animation and Multimedia Design',
-    8014: 'Social Service (evening attendance)',
-    9003: 'Agronomy',
-    9070: 'Communication Design',
-    9085: 'Veterinary Nursing',
-    9119: 'Informatics Engineering',
-    9130: 'Equinculture',
-    9147: 'Management',
-    9238: 'Social Service',
-    9254: 'Tourism',
-    9500: 'Nursing',
-    9556: 'Oral Hygiene',
-    9670: 'Advertising and Marketing Management',
-    9773: 'Journalism and Communication',
-    9853: 'Basic Education',
-    9991: 'Management (evening attendance)'
-}
-data['Course_Name'] = data['Course'].map(course_mapping)
-
-# UI Setup
-st.set_page_config(page_title="Mahasiswa Analytics", layout="wide")
-
-# Sidebar for navigation
-st.sidebar.title("📋 Menu Navigasi")
-page = st.sidebar.radio("Pilih Halaman:", ["📊 Dashboard", "🔮 Prediksi"])
-st.sidebar.markdown("---")
-
-# Author info in sidebar
-st.sidebar.markdown("### 👨‍💻 Developed by")
-st.sidebar.info("Wahid Hasim")
-st.sidebar.markdown("---")
-
-# Main Application Logic
-if page == "📊 Dashboard":
-    st.title("📊 Dashboard Analisis Mahasiswa")
-    st.write("Visualisasi data performa dan status mahasiswa")
-    
-    # Dashboard filters
-    st.sidebar.header("🔍 Filter Dashboard")
-    
-    # Course filter
-    all_courses = ['Semua Program'] + sorted(data['Course_Name'].unique().tolist())
-    selected_course = st.sidebar.selectbox('Program Studi:', all_courses)
-    
-    # Gender filter
-    gender_options = ['Semua', 'Laki-laki', 'Perempuan']
-    selected_gender = st.sidebar.selectbox('Jenis Kelamin:', gender_options)
-    
-    # Age range filter
-    age_min = int(data['Age_at_enrollment'].min())
-    age_max = int(data['Age_at_enrollment'].max())
-    age_range = st.sidebar.slider(
-        'Rentang Usia:',
-        min_value=age_min, 
-        max_value=age_max, 
-        value=(age_min, age_max)
-    )
-    
-    # Apply filters
-    filtered_data = data.copy()
-    
-    if selected_course != 'Semua Program':
-        filtered_data = filtered_data[filtered_data['Course_Name'] == selected_course]
-    
-    if selected_gender != 'Semua':
-        gender_map = {'Laki-laki': 1, 'Perempuan': 0}
-        filtered_data = filtered_data[filtered_data['Gender'] == gender_map[selected_gender]]
-    
-    filtered_data = filtered_data[(filtered_data['Age_at_enrollment'] >= age_range[0]) & 
-                                (filtered_data['Age_at_enrollment'] <= age_range[1])]
-    
-    # ui Show filter summary
+    # UI Setup
+    st.set_page_config(page_title="Mahasiswa Analytics", layout="wide")
+
+    # Sidebar for navigation (?page=prediksi opens the prediction page directly)
+    pages = ["📊 Dashboard", "🔮 Prediksi"]
+    st.sidebar.title("📋 Menu Navigasi")
+    page = st.sidebar.radio("Pilih Halaman:", pages, index=1 if st.query_params.get("page") == "prediksi" else 0)
+    st.sidebar.markdown("---")
+
+    # Author info in sidebar
+    st.sidebar.markdown("### 👨‍💻 Developed by")
+    st.sidebar.info("Wahid Hasim")
     st.sidebar.markdown("---")
-    st.sidebar.markdown(f"**Data yang ditampilkan:** {len(filtered_data)} mahasiswa")
-    
-    # Key metrics
-    st.markdown("### 📌 Metrik Utama")
-    
-    total_students = len(filtered_data)
-    dropout_count = len(filtered_data[filtered_data['Status'] == 'Dropout'])
-    graduate_count = len(filtered_data[filtered_data['Status'] == 'Graduate'])
-    enrolled_count = len(filtered_data[filtered_data['Status'] == 'Enrolled'])
-    
-    dropout_rate = (dropout_count / total_students * 100) if total_students > 0 else 0
-    graduate_rate = (graduate_count / total_students * 100) if total_students > 0 else 0
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total Mahasiswa", f"{total_students}")
-    with col2:
-        st.metric("Tingkat Dropout", f"{dropout_rate:.1f}%")
-    with col3:
-        st.metric("Tingkat Kelulusan", f"{graduate_rate:.1f}%")
-    with col4:
-        st.metric("Masih Terdaftar", f"{enrolled_count}")
-    
-    # Charts
-    st.markdown("---")
-    
-    # Row 1: Status distribution & Grade analysis
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        fig = create_status_distribution(filtered_data)
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        fig = create_grade_analysis(filtered_data)
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Row 2: Age distribution & Scholarship impact
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        fig = create_age_distribution(filtered_data)
-        st.plotly_chart(fig, use_container_width=True)
-        
-    with col2:
-        fig = create_scholarship_impact(filtered_data)
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Row 3: Economic impact & Course success rate
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        fig = create_economic_impact(filtered_data)
-        st.plotly_chart(fig, use_container_width=True)
-        
-    with col2:
-        fig = create_course_success_rate(filtered_data)
-        st.plotly_chart(fig, use_container_width=True)
-
-elif page == "🔮 Prediksi":
-    st.title("🔮 Prediksi Status Mahasiswa")
-    
-    # Periksa apakah model berhasil dimuat
-    if not model_loaded:
-        st.error("⚠️ Model prediksi tidak dapat dimuat. Fitur prediksi tidak tersedia.")
-        st.info("Pastikan file model/rf_model.pkl tersedia dan valid.")
-    else:
-        st.write("Masukkan data untuk memprediksi kemungkinan status mahasiswa")
-        
-        # Ambil input
-        input_data = user_input_features()
-          # Prediksi
-        st.markdown("### 🔮 Hasil Prediksi")
-        if st.button('Prediksi Status Mahasiswa', use_container_width=True):
-            # Gunakan fungsi prediksi untuk memastikan penggunaan model langsung
-            prediction, probabilities = predict_student_status(input_data, model, scaller)
-            status_map = {0: 'Dropout', 1: 'Masih Terdaftar', 2: 'Lulus'}
-            prediction_label = status_map.get(prediction, "Tidak Diketahui")
+
+    # Main Application Logic
+    if page == "📊 Dashboard":
+        from helper import (
+            # Dashboard functions
+            create_status_distribution, create_course_success_rate,
+            create_age_distribution, create_grade_analysis,
+            create_economic_impact, create_scholarship_impact, create_predicted_vs_actual,
+
+            # Data store
+            load_dataset, dataset_version,
+
+            # Count cube
+            CUBE_KEYS, build_count_cube, get_count_cube, slice_cube, status_counts,
+
+            # Bitmap row index
+            get_bitmap_index, resolve_filter, gather_columns, CHART_COLUMNS,
+
+            # Figure cache
+            cached_figure, figure_cache_stats,
+
+            # At-risk ranking
+            get_risk_index, top_at_risk,
+
+            # Background precompute
+            get_precompute, precompute_status, is_precompute_current, PSI_THRESHOLDS
+        )
+
+        # Load dataset for visualization purposes only (shared, read-only columnar store)
+        data = load_dataset("data/data_students.csv")
+
+        st.title("📊 Dashboard Analisis Mahasiswa")
+        st.write("Visualisasi data performa dan status mahasiswa")
+        
+        # Model predictions of every student, computed in the background; only finished results are read
+        bundle = load_model()
+        precomputed = get_precompute(data, bundle) if bundle is not None else None
+        predictions_ready = bundle is not None and is_precompute_current(precomputed, data, bundle)
+        
+        # Dashboard filters
+        st.sidebar.header("🔍 Filter Dashboard")
+        
+        # Course filter
+        all_courses = ['Semua Program'] + sorted(data['Course_Name'].unique().tolist())
+        selected_course = st.sidebar.selectbox('Program Studi:', all_courses)
+        
+        # Gender filter
+        gender_options = ['Semua', 'Laki-laki', 'Perempuan']
+        selected_gender = st.sidebar.selectbox('Jenis Kelamin:', gender_options)
+        
+        # Age range filter
+        age_min = int(data['Age_at_enrollment'].min())
+        age_max = int(data['Age_at_enrollment'].max())
+        age_range = st.sidebar.slider(
+            'Rentang Usia:',
+            min_value=age_min, 
+            max_value=age_max, 
+            value=(age_min, age_max)
+        )
+        
+        # Predicted status filter (available once the background predictions are ready)
+        prediction_options = {'Semua': None, 'Dropout': 'Dropout', 'Terdaftar': 'Enrolled', 'Lulus': 'Graduate'}
+        selected_prediction = st.sidebar.selectbox(
+            'Prediksi Model:', list(prediction_options), disabled=not predictions_ready,
+            help=None if predictions_ready else "Prediksi seluruh mahasiswa sedang dihitung di background."
+        )
+        predicted_status = prediction_options[selected_prediction] if predictions_ready else None
+        
+        # Apply filters: resolve row positions from the shared bitmap index (no frame copy)
+        gender_map = {'Laki-laki': 1, 'Perempuan': 0}
+        filter_args = dict(
+            course=None if selected_course == 'Semua Program' else selected_course,
+            gender=gender_map.get(selected_gender),
+            age_range=age_range
+        )
+        with timed('filter'):
+            filtered_rows = resolve_filter(get_bitmap_index(data), **filter_args)
+            
+            if predicted_status is None:
+                # Same filters answered from the pre-aggregated count cube
+                filtered_cube = slice_cube(get_count_cube(data), **filter_args)
+            else:
+                predicted = precomputed['scores']['Predicted_Status'].to_numpy()
+                filtered_rows = filtered_rows[predicted[filtered_rows] == predicted_status]
+                # The cube has no prediction dimension: count the remaining rows instead
+                filtered_cube = build_count_cube(gather_columns(data, filtered_rows, CUBE_KEYS))
+            status_count = status_counts(filtered_cube)
+        
+        # ui Show filter summary
+        total_students = int(filtered_cube['Count'].sum())
+        st.sidebar.markdown("---")
+        st.sidebar.markdown(f"**Data yang ditampilkan:** {total_students} mahasiswa")
+        
+        # Key metrics
+        st.markdown("### 📌 Metrik Utama")
+        
+        dropout_count = status_count.get('Dropout', 0)
+        graduate_count = status_count.get('Graduate', 0)
+        enrolled_count = status_count.get('Enrolled', 0)
+        
+        dropout_rate = (dropout_count / total_students * 100) if total_students > 0 else 0
+        graduate_rate = (graduate_count / total_students * 100) if total_students > 0 else 0
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Mahasiswa", f"{total_students}")
+        with col2:
+            st.metric("Tingkat Dropout", f"{dropout_rate:.1f}%")
+        with col3:
+            st.metric("Tingkat Kelulusan", f"{graduate_rate:.1f}%")
+        with col4:
+            st.metric("Masih Terdaftar", f"{enrolled_count}")
+        
+        # Charts (memoized per filter state, shared across sessions)
+        st.markdown("---")
+        figure_key = (dataset_version(data), selected_course, selected_gender, tuple(age_range))
+        if predicted_status is not None:
+            figure_key += (predicted_status, precomputed['model'])
+        
+        def row_chart(chart_id, create_chart):
+            # Built from the filtered rows only on a cache miss
+            return cached_figure(chart_id, figure_key, lambda: create_chart(
+                gather_columns(data, filtered_rows, CHART_COLUMNS[chart_id])))
+        
+        # Row 1: Status distribution & Grade analysis
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = row_chart('status_distribution', create_status_distribution)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            fig = row_chart('grade_analysis', create_grade_analysis)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Row 2: Age distribution & Scholarship impact
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = row_chart('age_distribution', create_age_distribution)
+            st.plotly_chart(fig, use_container_width=True)
+            
+        with col2:
+            fig = cached_figure('scholarship_impact', figure_key, lambda: create_scholarship_impact(filtered_cube))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Row 3: Economic impact & Course success rate
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = row_chart('economic_impact', create_economic_impact)
+            st.plotly_chart(fig, use_container_width=True)
             
-            # Tampilkan hasil dengan warna berbeda berdasarkan prediksi
-            if prediction == 0:  # Dropout
-                st.error(f"### 🚫 Prediksi: DROPOUT")
-                st.info("Mahasiswa ini diprediksi akan dropout. Disarankan untuk memberikan perhatian khusus dan bimbingan.")
-            elif prediction == 1:  # Enrolled
-                st.info(f"### ⏳ Prediksi: MASIH TERDAFTAR")
-                st.success("Mahasiswa ini diprediksi akan tetap terdaftar. Terus pantau perkembangannya.")
-            else:  # Graduated
-                st.success(f"### 🎓 Prediksi: LULUS")
-                st.balloons()
-                st.info("Mahasiswa ini diprediksi akan lulus dengan baik. Pertahankan performa akademiknya.")
+        with col2:
+            fig = cached_figure('course_success_rate', figure_key, lambda: create_course_success_rate(filtered_cube))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Mahasiswa berisiko: ranking per program, dihitung sekali per versi data/model
+        if bundle is not None:
+            st.markdown("---")
+            st.markdown("### 🚨 Mahasiswa Terdaftar dengan Risiko Dropout Tertinggi")
+            top_n = st.slider('Jumlah mahasiswa:', 5, 50, 10)
+            # Only ranked from the finished background predictions, never scored in the rerun
+            at_risk = None
+            if predictions_ready:
+                probabilities = precomputed['scores']['Dropout_probability'].to_numpy()
+                at_risk = top_at_risk(get_risk_index(data, bundle, probabilities=probabilities), n=top_n, **filter_args)
+            if at_risk is None:
+                st.info("Daftar mahasiswa berisiko sedang dihitung di background. Muat ulang halaman sebentar lagi.")
+            elif len(at_risk) == 0:
+                st.info("Tidak ada mahasiswa terdaftar yang sesuai dengan filter.")
+            else:
+                st.dataframe(
+                    at_risk.assign(
+                        Gender=at_risk['Gender'].map({1: 'Laki-laki', 0: 'Perempuan'}),
+                        Dropout_probability=at_risk['Dropout_probability'] * 100
+                    ).rename(columns={
+                        'Course_Name': 'Program Studi', 'Student_id': 'ID Mahasiswa', 'Gender': 'Jenis Kelamin',
+                        'Age_at_enrollment': 'Usia', 'Approval_rate': 'Tingkat Kelulusan MK (%)',
+                        'Average_grade': 'Rata-rata Nilai', 'Dropout_probability': 'Risiko Dropout (%)'
+                    }).round(1),
+                    hide_index=True, use_container_width=True
+                )
             
-            # Tampilkan probabilitas jika tersedia
-            if probabilities is not None:
-                st.markdown("#### Tingkat Kepercayaan Prediksi:")
-                
-                col_prob1, col_prob2, col_prob3 = st.columns(3)
-                with col_prob1:
-                    st.progress(probabilities[0])
-                    st.caption(f"Dropout: {probabilities[0]:.1%}")
-                with col_prob2:
-                    st.progress(probabilities[1])
-                    st.caption(f"Masih Terdaftar: {probabilities[1]:.1%}")
-                with col_prob3:
-                    st.progress(probabilities[2])
-                    st.caption(f"Lulus: {probabilities[2]:.1%}")
-                
-                # Tampilkan interpretasi hasil prediksi
-                st.markdown("### 📊 Interpretasi Hasil")
+            # Prediksi seluruh mahasiswa & drift: dihitung di background, UI hanya membaca hasil yang sudah selesai
+            st.markdown("---")
+            st.markdown("### 🤖 Prediksi Model untuk Seluruh Mahasiswa")
+            if not predictions_ready:
+                st.info("Prediksi seluruh mahasiswa sedang dihitung di background. Muat ulang halaman sebentar lagi.")
+            else:
+                scores = precomputed['scores'].iloc[filtered_rows]
+                predicted_count = scores['Predicted_Status'].value_counts()
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Prediksi Dropout", f"{predicted_count.get('Dropout', 0)}")
+                with col2:
+                    st.metric("Prediksi Lulus", f"{predicted_count.get('Graduate', 0)}")
+                with col3:
+                    st.metric("Rata-rata Risiko Dropout", f"{scores['Dropout_probability'].mean() * 100 if len(scores) else 0:.1f}%")
+                fig = cached_figure('predicted_vs_actual', figure_key + (precomputed['model'],), lambda: create_predicted_vs_actual(
+                    gather_columns(data, filtered_rows, ['Status']).assign(Predicted_Status=scores['Predicted_Status'].to_numpy())))
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"Dihitung dalam {precomputed['seconds']:.2f} detik ({precomputed['finished_at']})")
+            
+            # Drift: last finished result, even while a newer data version is being scored
+            if precomputed is not None:
+                with st.expander("📈 Drift Data terhadap Data Latih"):
+                    if precomputed['drift'] is None:
+                        st.caption("Bundle model ini belum menyimpan distribusi data latih. Latih ulang dengan "
+                                   "`python -m helper.training` atau buat ulang bundle dengan "
+                                   "`python -m helper.bundle --data data/data_students.csv`.")
+                    else:
+                        st.caption(f"PSI terhadap distribusi data latih model: < {PSI_THRESHOLDS[0]} stabil, "
+                                   f"{PSI_THRESHOLDS[0]}–{PSI_THRESHOLDS[1]} sedang, > {PSI_THRESHOLDS[1]} signifikan")
+                        st.dataframe(precomputed['drift'].round(3), use_container_width=True)
+            status = precompute_status()
+            if status['error'] is not None:
+                st.warning(f"Precompute gagal: {status['error']}")
+        
+        # ui Figure cache counters
+        cache_stats = figure_cache_stats()
+        st.sidebar.caption(f"Cache grafik: {cache_stats['hits']} hit / {cache_stats['misses']} miss ({cache_stats['size']} grafik)")
+
+    elif page == "🔮 Prediksi":
+        from helper import (
+            # Prediction functions
+            user_input_features, predict_student_status, create_contribution_chart,
+
+            # Model registry
+            artifact_stats,
+
+            # Model bundle
+            DEFAULT_BUNDLE_PATH,
+
+            # What-if sweeps
+            SWEEP_FEATURES, sweep_values, run_sweep, create_sweep_figure
+        )
+
+        bundle = load_model()
+        st.title("🔮 Prediksi Status Mahasiswa")
+        
+        # Periksa apakah model berhasil dimuat
+        if bundle is None:
+            st.error("⚠️ Model prediksi tidak dapat dimuat. Fitur prediksi tidak tersedia.")
+            st.info(f"Pastikan file {DEFAULT_BUNDLE_PATH} (atau model/rf_model.pkl, model/scaller.pkl dan model/label_lencoder.pkl) tersedia dan valid.")
+        else:
+            st.write("Masukkan data untuk memprediksi kemungkinan status mahasiswa")
+            
+            # Ambil input
+            input_data = user_input_features()
+            status_labels = {'Dropout': 'Dropout', 'Enrolled': 'Masih Terdaftar', 'Graduate': 'Lulus'}
+              # Prediksi
+            st.markdown("### 🔮 Hasil Prediksi")
+            if st.button('Prediksi Status Mahasiswa', use_container_width=True):
+                # Gunakan fungsi prediksi untuk memastikan penggunaan model langsung
+                prediction, probabilities, contributions = predict_student_status(
+                    input_data, bundle.forest, None, return_contributions=True
+                )
                 
-                # Mencari kelas dengan probabilitas tertinggi
-                max_prob_idx = np.argmax(probabilities)
-                max_prob_value = probabilities[max_prob_idx]
+                # Tampilkan hasil dengan warna berbeda berdasarkan prediksi
+                if prediction == 'Dropout':
+                    st.error(f"### 🚫 Prediksi: DROPOUT")
+                    st.info("Mahasiswa ini diprediksi akan dropout. Disarankan untuk memberikan perhatian khusus dan bimbingan.")
+                elif prediction == 'Enrolled':
+                    st.info(f"### ⏳ Prediksi: MASIH TERDAFTAR")
+                    st.success("Mahasiswa ini diprediksi akan tetap terdaftar. Terus pantau perkembangannya.")
+                else:  # Graduate
+                    st.success(f"### 🎓 Prediksi: LULUS")
+                    st.balloons()
+                    st.info("Mahasiswa ini diprediksi akan lulus dengan baik. Pertahankan performa akademiknya.")
                 
-                if max_prob_value > 0.7:
-                    st.success(f"Prediksi memiliki tingkat kepercayaan tinggi ({max_prob_value:.1%})")
-                elif max_prob_value > 0.5:
-                    st.info(f"Prediksi memiliki tingkat kepercayaan sedang ({max_prob_value:.1%})")
-                else:
-                    st.warning(f"Prediksi memiliki tingkat kepercayaan rendah ({max_prob_value:.1%})")
-                    st.write("Disarankan untuk memperhatikan faktor-faktor lain dalam pengambilan keputusan.")
\ No newline at end of file
+                # Tampilkan probabilitas jika tersedia
+                if probabilities is not None:
+                    st.markdown("#### Tingkat Kepercayaan Prediksi:")
+                    
+                    for col_prob, label, probability in zip(st.columns(len(bundle.class_labels)), bundle.class_labels, probabilities):
+                        with col_prob:
+                            st.progress(float(probability))
+                            st.caption(f"{status_labels.get(label, label)}: {probability:.1%}")
+                    
+                    # Tampilkan interpretasi hasil prediksi
+                    st.markdown("### 📊 Interpretasi Hasil")
+                    
+                    # Mencari kelas dengan probabilitas tertinggi
+                    max_prob_idx = np.argmax(probabilities)
+                    max_prob_value = probabilities[max_prob_idx]
+                    
+                    if max_prob_value > 0.7:
+                        st.success(f"Prediksi memiliki tingkat kepercayaan tinggi ({max_prob_value:.1%})")
+                    elif max_prob_value > 0.5:
+                        st.info(f"Prediksi memiliki tingkat kepercayaan sedang ({max_prob_value:.1%})")
+                    else:
+                        st.warning(f"Prediksi memiliki tingkat kepercayaan rendah ({max_prob_value:.1%})")
+                        st.write("Disarankan untuk memperhatikan faktor-faktor lain dalam pengambilan keputusan.")
+
+                    # Kontribusi tiap fitur di sepanjang jalur keputusan setiap pohon
+                    st.markdown("### 🧭 Faktor Penentu Prediksi")
+                    st.write("Fitur yang paling mendorong probabilitas naik atau turun untuk mahasiswa ini.")
+                    classes = [prediction] + [label for label in contributions.columns if label != prediction]
+                    tabs = st.tabs([status_labels.get(label, label) for label in classes])
+                    for tab, label in zip(tabs, classes):
+                        with tab:
+                            st.plotly_chart(
+                                create_contribution_chart(contributions, label, status_labels.get(label, label)),
+                                use_container_width=True
+                            )
+
+            # Analisis what-if: semua variasi satu atau dua fitur dinilai sekaligus
+            st.markdown("### 🔬 Analisis What-if")
+            st.write("Lihat bagaimana probabilitas berubah jika satu atau dua nilai mahasiswa ini diubah.")
+            feature_label = lambda name: SWEEP_FEATURES[name][0]
+            col_x, col_y, col_status = st.columns(3)
+            with col_x:
+                sweep_x = st.selectbox('Fitur 1', list(SWEEP_FEATURES), format_func=feature_label)
+            with col_y:
+                sweep_y = st.selectbox(
+                    'Fitur 2 (opsional)', [None] + [name for name in SWEEP_FEATURES if name != sweep_x],
+                    format_func=lambda name: 'Tidak ada' if name is None else feature_label(name)
+                )
+            with col_status:
+                sweep_status = st.selectbox(
+                    'Status pada grafik 2 fitur', bundle.class_labels,
+                    format_func=lambda label: status_labels.get(label, label), disabled=sweep_y is None
+                )
+            sweep_steps = st.slider('Jumlah langkah per fitur', 5, 41, 21)
+            
+            sweep_result = run_sweep(
+                input_data, bundle, None, sweep_x, sweep_values(sweep_x, sweep_steps),
+                sweep_y, sweep_values(sweep_y, sweep_steps) if sweep_y else None
+            )
+            st.plotly_chart(
+                create_sweep_figure(sweep_result, sweep_x, sweep_y, sweep_status, status_labels),
+                use_container_width=True
+            )
+            
+            if sweep_y is None:
+                # Titik di mana prediksi berubah
+                valid = sweep_result[sweep_result['Valid']]
+                changes = valid[valid['Predicted_Status'] != valid['Predicted_Status'].shift()].iloc[1:]
+                for _, row in changes.iterrows():
+                    st.caption(
+                        f"Mulai {feature_label(sweep_x)} = {row[sweep_x]:g}: prediksi menjadi "
+                        f"{status_labels.get(row['Predicted_Status'], row['Predicted_Status'])}"
+                    )
+            st.caption(f"{len(sweep_result)} skenario dinilai dalam satu panggilan prediksi.")
+
+            # Info biaya pemuatan model
+            with st.expander("ℹ️ Info Model"):
+                st.caption(f"Versi model: {bundle.version} ({bundle.header['created_at']})")
+                for stats in artifact_stats():
+                    st.caption(
+                        f"{os.path.basename(stats['path'])}: {stats['size_bytes'] / 1024:.1f} KB, "
+                        f"dimuat dalam {stats['load_seconds'] * 1000:.1f} ms (dimuat {stats['loads']}x)"
+                    )
+
+    # Waktu per tahap (hanya jika STUDENT_METRICS=1)
+    if metrics_enabled():
+        with st.sidebar.expander("⏱️ Waktu per Tahap"):
+            for stage, stats in stage_metrics().items():
+                st.caption(f"{stage}: {stats['mean'] * 1000:.1f} ms rata-rata, {stats['count']}x")
+finally:
+    profile_path = stop_profile(profile) if profile is not None else None
+
+# Simpan profil rerun ini lalu hapus parameter agar rerun berikutnya tidak diprofil
+if profile_path is not None:
+    del st.query_params["profile"]
+    st.sidebar.caption(f"Profil disimpan: {profile_path}")
@@ -0,0 +1,218 @@
+"""
+Concurrent-session load test for the Streamlit app, fully offline.
+
+Simulated advisor sessions drive app.py through Streamlit's AppTest. A
+session opens the app and then randomly switches pages, moves the course,
+gender and age filters, or fills in the form and triggers a prediction.
+Every action is one rerun of app.py. Sessions run in parallel in a process
+pool, and each worker process keeps its module caches between the sessions
+it runs, like a server process does.
+
+For every session count the harness reports per-rerun latency percentiles,
+total CPU time and the peak resident memory of the workers:
+
+    python benchmarks/load_test.py --sessions 1 4 16 --steps 20
+    python benchmarks/load_test.py --sessions 8 --workers 4 --output load.json
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ["📊 Dashboard", "🔮 Prediksi"]
+DASHBOARD_ACTIONS = ['switch_page', 'course', 'gender', 'age_range', 'top_n']
+PREDICTION_ACTIONS = ['switch_page', 'edit_input', 'predict']
+
+
+def _widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    return None
+
+
+def _act(at, action, rng):
+    # Apply one user action to the widgets; returns False when the widget is not on the page
+    if action == 'switch_page':
+        current = at.sidebar.radio[0].value
+        at.sidebar.radio[0].set_value(PAGES[1] if current == PAGES[0] else PAGES[0])
+    elif action == 'course':
+        widget = _widget(at.selectbox, 'Program Studi:')
+        if widget is None:
+            return False
+        widget.set_value(rng.choice(widget.options))
+    elif action == 'gender':
+        widget = _widget(at.selectbox, 'Jenis Kelamin:')
+        if widget is None:
+            return False
+        widget.set_value(rng.choice(widget.options))
+    elif action == 'age_range':
+        widget = _widget(at.slider, 'Rentang Usia:')
+        if widget is None:
+            return False
+        low, high = sorted(rng.sample(range(int(widget.min), int(widget.max) + 1), 2))
+        widget.set_value((low, high))
+    elif action == 'top_n':
+        widget = _widget(at.slider, 'Jumlah mahasiswa:')
+        if widget is None:
+            return False
+        widget.set_value(rng.randint(5, 50))
+    elif action == 'edit_input':
+        widget = _widget(at.slider, rng.choice(['Nilai Rata-rata Semester 1', 'Nilai Rata-rata Semester 2']))
+        if widget is None:
+            return False
+        widget.set_value(round(rng.uniform(0.0, 20.0), 1))
+    elif action == 'predict':
+        widget = _widget(at.button, 'Prediksi Status Mahasiswa')
+        if widget is None:
+            return False
+        widget.click()
+    return True
+
+
+def run_session(app_path, steps, seed):
+    """
+    Run one simulated session.
+
+    Returns:
+        dict with the timed reruns [(action, seconds)], error messages, and the worker's
+        CPU seconds and peak RSS (MB) measured at the end of the session
+    """
+    import logging
+    import warnings
+
+    from streamlit.testing.v1 import AppTest
+
+    # Bare AppTest runs log warnings on every rerun; only errors matter here
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings('ignore')
+
+    os.chdir(os.path.dirname(app_path))
+
+    rng = random.Random(seed)
+    reruns = []
+    errors = []
+    at = AppTest.from_file(app_path, default_timeout=300)
+
+    start = time.perf_counter()
+    at.run()
+    reruns.append(('open', time.perf_counter() - start))
+    for _ in range(steps):
+        on_dashboard = at.sidebar.radio[0].value == PAGES[0]
+        action = rng.choice(DASHBOARD_ACTIONS if on_dashboard else PREDICTION_ACTIONS)
+        if not _act(at, action, rng):
+            continue
+        start = time.perf_counter()
+        at.run()
+        reruns.append((action, time.perf_counter() - start))
+        errors.extend(f"{action}: {exception.value}" for exception in at.exception)
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {
+        'pid': os.getpid(),
+        'reruns': reruns,
+        'errors': errors,
+        'cpu_seconds': usage.ru_utime + usage.ru_stime,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': usage.ru_maxrss / 1024,
+    }
+
+
+def _percentiles(seconds):
+    values = np.asarray(seconds) * 1000
+    return {
+        'p50_ms': float(np.percentile(values, 50)),
+        'p90_ms': float(np.percentile(values, 90)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max()),
+    }
+
+
+def run_level(app_path, sessions, steps, workers=None, seed=0):
+    """
+    Run ``sessions`` simulated sessions in parallel in a fresh process pool.
+
+    Returns:
+        dict with rerun latency percentiles (overall and per action), wall time,
+        total CPU seconds, worker peak RSS and the error count
+    """
+    workers = workers or min(sessions, os.cpu_count() or 1)
+    # AppTest runs app.py as __main__, so workers must find run_session under
+    # an importable module name rather than through this script's __main__
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    session = importlib.import_module('load_test').run_session
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(session, [app_path] * sessions, [steps] * sessions,
+                                [seed + i for i in range(sessions)]))
+    wall = time.perf_counter() - start
+
+    # CPU and RSS are cumulative per worker process, so keep the last session of each
+    by_worker = {}
+    for result in results:
+        by_worker[result['pid']] = result
+    reruns = [rerun for result in results for rerun in result['reruns']]
+    actions = sorted({action for action, _ in reruns})
+    return {
+        'sessions': sessions,
+        'workers': workers,
+        'reruns': len(reruns),
+        'wall_seconds': wall,
+        'reruns_per_second': len(reruns) / wall,
+        'latency': _percentiles([seconds for _, seconds in reruns]),
+        'latency_by_action': {
+            action: dict(_percentiles([s for a, s in reruns if a == action]),
+                         count=sum(1 for a, _ in reruns if a == action))
+            for action in actions
+        },
+        'cpu_seconds': sum(result['cpu_seconds'] for result in by_worker.values()),
+        'peak_rss_mb': {
+            'max_worker': max(result['peak_rss_mb'] for result in by_worker.values()),
+            'total': sum(result['peak_rss_mb'] for result in by_worker.values()),
+        },
+        'errors': sum(len(result['errors']) for result in results),
+        'error_messages': sorted({message for result in results for message in result['errors']}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated sessions against app.py with AppTest.")
+    parser.add_argument('--app', default=os.path.join(ROOT, 'app.py'))
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16],
+                        help="Session counts to run, one process pool each (default: 1 4 16)")
+    parser.add_argument('--steps', type=int, default=20, help="User actions per session")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: min(sessions, CPUs))")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    app_path = os.path.abspath(args.app)
+    levels = []
+    print(f"{'sessions':>8}{'workers':>8}{'reruns':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+          f"{'CPU s':>8}{'RSS MB':>9}{'errors':>8}")
+    for sessions in args.sessions:
+        level = run_level(app_path, sessions, args.steps, args.workers, args.seed)
+        levels.append(level)
+        latency = level['latency']
+        print(f"{sessions:>8}{level['workers']:>8}{level['reruns']:>8}{latency['p50_ms']:>9.0f}"
+              f"{latency['p90_ms']:>9.0f}{latency['p99_ms']:>9.0f}{level['cpu_seconds']:>8.1f}"
+              f"{level['peak_rss_mb']['total']:>9.0f}{level['errors']:>8}", flush=True)
+        for message in level['error_messages']:
+            print(f"  error: {message}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'app': app_path, 'steps': args.steps, 'cpus': os.cpu_count(), 'levels': levels}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Cold-start benchmark: time-to-first-render of every app page in a fresh interpreter.
+
+Each measurement runs in a new Python process (like a new container), renders
+one page with Streamlit's AppTest and reports how long the first render and a
+warm rerun took and which heavy libraries the page pulled in.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Query parameter that opens each page directly (see app.py)
+PAGES = {'Dashboard': 'dashboard', 'Prediksi': 'prediksi'}
+
+# Libraries whose import dominates cold start
+HEAVY_MODULES = ['pandas', 'plotly', 'sklearn', 'scipy', 'joblib']
+
+_CHILD = r'''
+import json, sys, time, warnings
+warnings.filterwarnings('ignore')
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.query_params['page'] = {page!r}
+at.run()
+rendered = time.perf_counter()
+loaded = [name for name in {heavy!r} if name in sys.modules]
+at.run()
+print(json.dumps({{
+    'streamlit_import_seconds': imported - start,
+    'first_render_seconds': rendered - imported,
+    'rerun_seconds': time.perf_counter() - rendered,
+    'modules': loaded,
+    'exceptions': [str(e.value) for e in at.exception],
+}}))
+'''
+
+
+def measure_page(app_path, page, python=sys.executable):
+    """Render ``page`` once in a fresh interpreter and return its timings."""
+    code = _CHILD.format(app=app_path, page=page, heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [python, '-c', code], cwd=os.path.dirname(app_path), capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(app_path, repeat=3):
+    """
+    Measure every page ``repeat`` times.
+
+    Returns:
+        dict {page: {median timings, modules, exceptions, runs}}
+    """
+    results = {}
+    for name, page in PAGES.items():
+        runs = [measure_page(app_path, page) for _ in range(repeat)]
+        results[name] = {
+            key: statistics.median(run[key] for run in runs)
+            for key in ('streamlit_import_seconds', 'first_render_seconds', 'rerun_seconds')
+        }
+        results[name]['modules'] = runs[-1]['modules']
+        results[name]['exceptions'] = runs[-1]['exceptions']
+        results[name]['runs'] = runs
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time-to-first-render of every app page from a cold process.")
+    parser.add_argument('--app', default=os.path.join(ROOT, 'app.py'))
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh processes per page (median is reported)")
+    parser.add_argument('--output', default=None, help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(os.path.abspath(args.app), args.repeat)
+    print(f"{'page':<12}{'streamlit s':>13}{'first render s':>16}{'rerun s':>9}  heavy modules")
+    for name, result in results.items():
+        print(
+            f"{name:<12}{result['streamlit_import_seconds']:>13.2f}{result['first_render_seconds']:>16.2f}"
+            f"{result['rerun_seconds']:>9.2f}  {', '.join(result['modules'])}"
+        )
+        for exception in result['exceptions']:
+            print(f"  exception: {exception}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Benchmark suite for the dashboard and prediction hot paths at growing data scale.
+
+Synthetic students with the schema of data/data_students.csv are generated
+at every scale (1x = 4424 rows) and loaded through the same data store as
+the app. For each scale the suite times every create_* chart builder, the
+filter chain of app.py, predict_student_status on one row and batched
+predict_proba, and records the peak traced memory of each.
+
+    python benchmarks/suite.py --scales 1 10 100 --output benchmarks/results.json
+    python benchmarks/suite.py --baseline benchmarks/results.json   # flags regressions
+
+Exits with status 1 when a benchmark is slower (or uses more memory) than the
+baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from helper import (  # noqa: E402
+    CHART_COLUMNS, DEFAULT_BUNDLE_PATH, add_derived_features, build_feature_frame, create_age_distribution,
+    create_course_success_rate, create_economic_impact, create_grade_analysis, create_scholarship_impact,
+    create_status_distribution, gather_columns, get_bitmap_index, get_bundle, get_count_cube, load_bundle,
+    load_dataset, predict_student_status, resolve_filter, slice_cube, status_counts,
+)
+from helper.bitmap_index import build_bitmap_index  # noqa: E402
+from helper.cube import build_count_cube  # noqa: E402
+from helper.data_store import DERIVED_COLUMNS, build_store  # noqa: E402
+
+SOURCE_CSV = os.path.join(ROOT, 'data', 'data_students.csv')
+DEFAULT_SCALES = [1, 10, 100, 1000]
+
+# Continuous columns that get a little noise so resampled rows are not exact copies
+JITTER_COLUMNS = {
+    'Previous_qualification_grade': 2.0,
+    'Admission_grade': 2.0,
+    'Curricular_units_1st_sem_grade': 0.5,
+    'Curricular_units_2nd_sem_grade': 0.5,
+}
+
+# Chart builders fed with gathered student rows; the others read the count cube
+ROW_CHARTS = {
+    'status_distribution': create_status_distribution,
+    'age_distribution': create_age_distribution,
+    'grade_analysis': create_grade_analysis,
+    'economic_impact': create_economic_impact,
+}
+CUBE_CHARTS = {
+    'course_success_rate': create_course_success_rate,
+    'scholarship_impact': create_scholarship_impact,
+}
+
+# A typical dashboard filter state (course picked from the data at run time)
+FILTER_GENDER = 1
+FILTER_AGE_RANGE = (18, 30)
+
+
+def synthesize(source, scale, seed=0):
+    """
+    Return ``scale`` times as many students as ``source``, with the same columns.
+
+    Rows are resampled with replacement, the grade columns get a small clipped
+    noise (grades of 0, i.e. no approved units, stay 0) and the derived
+    columns are recomputed.
+    """
+    rng = np.random.default_rng(seed)
+    raw = source.drop(columns=[c for c in DERIVED_COLUMNS if c in source.columns])
+    rows = raw.iloc[rng.integers(0, len(raw), len(raw) * scale)].reset_index(drop=True)
+    for column, noise in JITTER_COLUMNS.items():
+        values = rows[column].to_numpy()
+        jittered = np.clip(values + rng.normal(0.0, noise, len(values)), values.min(), source[column].max())
+        rows[column] = np.where(values > 0, jittered.round(2), values)
+    return add_derived_features(rows)
+
+
+def measure(function, repeat):
+    """
+    Time ``function`` and trace its peak memory.
+
+    The first call runs under tracemalloc (and doubles as warm-up); the
+    timed calls run without tracing.
+
+    Returns:
+        dict with median_s, min_s, runs and peak_mb
+    """
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {
+        'median_s': statistics.median(timings),
+        'min_s': min(timings),
+        'runs': repeat,
+        'peak_mb': peak / 2 ** 20,
+    }
+
+
+def _load_model():
+    if os.path.exists(os.path.join(ROOT, DEFAULT_BUNDLE_PATH)):
+        return load_bundle(os.path.join(ROOT, DEFAULT_BUNDLE_PATH))
+    import joblib
+
+    model, scaller, encoder = (
+        joblib.load(os.path.join(ROOT, 'model', name))
+        for name in ('rf_model.pkl', 'scaller.pkl', 'label_lencoder.pkl')
+    )
+    return get_bundle(model, scaller, encoder)
+
+
+def run_scale(source, scale, bundle, workdir, repeat=5, max_predict_rows=200_000):
+    """
+    Run every benchmark on one synthetic dataset.
+
+    Returns:
+        dict {benchmark name: measurement}
+    """
+    csv_path = os.path.join(workdir, f'students_{scale}x.csv')
+    synthesize(source, scale).to_csv(csv_path, index=False)
+
+    results = {}
+    # CSV parse + columnar store build, as on the first app start after a data change
+    results['store_build'] = measure(lambda: build_store(csv_path), max(1, repeat // 2))
+    data = load_dataset(csv_path)
+    results['store_build']['rows'] = len(data)
+
+    results['index_build'] = measure(lambda: (build_bitmap_index(data), build_count_cube(data)), repeat)
+
+    course = data['Course_Name'].astype(str).value_counts().index[0]
+    filters = dict(course=course, gender=FILTER_GENDER, age_range=FILTER_AGE_RANGE)
+    bitmap_index = get_bitmap_index(data)
+    cube = get_count_cube(data)
+
+    def filter_chain():
+        # Same steps as app.py between the sidebar filters and the charts
+        rows = resolve_filter(bitmap_index, **filters)
+        sliced = slice_cube(cube, **filters)
+        status_counts(sliced)
+        return [gather_columns(data, rows, CHART_COLUMNS[chart]) for chart in ROW_CHARTS]
+
+    results['filter_chain'] = measure(filter_chain, repeat * 4)
+
+    # Charts over the unfiltered dataset (the largest input they get)
+    all_rows = np.arange(len(data))
+    for chart, create_chart in ROW_CHARTS.items():
+        frame = gather_columns(data, all_rows, CHART_COLUMNS[chart])
+        results[f'chart.{chart}'] = measure(lambda: create_chart(frame), repeat)
+    for chart, create_chart in CUBE_CHARTS.items():
+        results[f'chart.{chart}'] = measure(lambda: create_chart(cube), repeat)
+
+    features = build_feature_frame(data.iloc[:max_predict_rows])
+    one_row = features.iloc[:1]
+    results['predict_single'] = measure(lambda: predict_student_status(one_row, bundle.forest, None), repeat * 40)
+    results['predict_batch'] = measure(lambda: bundle.forest.predict_proba(features), max(1, repeat // 2))
+    results['predict_batch']['rows'] = len(features)
+    results['predict_batch']['rows_per_second'] = len(features) / results['predict_batch']['median_s']
+
+    os.remove(csv_path)
+    return results
+
+
+def compare(current, baseline, threshold=0.2, min_delta_s=0.001, min_delta_mb=1.0):
+    """
+    Compare two result files.
+
+    A benchmark regresses when its median time or its peak memory grew by
+    more than ``threshold`` relative to the baseline (and by more than
+    ``min_delta_s`` / ``min_delta_mb``, so tiny numbers do not flap).
+
+    Returns:
+        list of dicts (key, metric, baseline, current, ratio, regression)
+    """
+    rows = []
+    for key, now in current['results'].items():
+        before = baseline['results'].get(key)
+        if before is None:
+            continue
+        for metric in ('median_s', 'peak_mb'):
+            if not before.get(metric):
+                continue
+            ratio = now[metric] / before[metric]
+            regression = ratio > 1 + threshold
+            min_delta = min_delta_s if metric == 'median_s' else min_delta_mb
+            regression = regression and now[metric] - before[metric] > min_delta
+            rows.append({
+                'key': key, 'metric': metric, 'baseline': before[metric], 'current': now[metric],
+                'ratio': ratio, 'regression': regression,
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard and prediction hot paths on synthetic data.")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help="Multiples of the real dataset size (default: 1 10 100 1000)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument('--max-predict-rows', type=int, default=200_000, help="Rows scored by predict_batch")
+    parser.add_argument('--workdir', default=None, help="Where synthetic CSVs and stores are written (default: temp)")
+    parser.add_argument('--output', default=None, help="Write the results as JSON")
+    parser.add_argument('--baseline', default=None, help="Earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown / memory growth (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    source = pd.read_csv(SOURCE_CSV, float_precision='round_trip')
+    bundle = _load_model()
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': {
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'numpy': np.__version__, 'pandas': pd.__version__,
+        },
+        'model_version': getattr(bundle, 'version', None),
+        'results': {},
+    }
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        for scale in args.scales:
+            for name, result in run_scale(source, scale, bundle, workdir, args.repeat, args.max_predict_rows).items():
+                report['results'][f'{scale}x/{name}'] = result
+                print(f"{scale:>5}x {name:<32}{result['median_s'] * 1000:>10.2f} ms{result['peak_mb']:>10.1f} MB",
+                      flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        regressions = [row for row in rows if row['regression']]
+        for row in rows:
+            marker = 'REGRESSION' if row['regression'] else ''
+            print(f"{row['key']:<40}{row['metric']:<10}{row['baseline']:>12.4f}{row['current']:>12.4f}"
+                  f"{row['ratio']:>8.2f}x {marker}")
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+# Makes the repository root importable (``import helper``) when running pytest
@@ -1,16 +1,86 @@
-from .dashboard import (create_status_distribution, create_course_success_rate, 
-                        create_age_distribution, create_grade_analysis,
-                        create_economic_impact, create_scholarship_impact)
+import importlib
 
-from .prediction import user_input_features, predict_student_status
-
-# Expose all functions
-__all__ = [
+# Public names per submodule. Submodules are imported on first access
+# (PEP 562 module __getattr__), so `import helper` is cheap and every app
+# page only pays for the libraries it actually uses.
+_EXPORTS = {
     # Dashboard functions
-    'create_status_distribution', 'create_course_success_rate', 
-    'create_age_distribution', 'create_grade_analysis',
-    'create_economic_impact', 'create_scholarship_impact',
-    
+    'dashboard': [
+        'create_status_distribution', 'create_course_success_rate',
+        'create_age_distribution', 'create_grade_analysis',
+        'create_economic_impact', 'create_scholarship_impact', 'create_predicted_vs_actual',
+        'CHART_COLUMNS',
+    ],
+
     # Prediction functions
-    'user_input_features', 'predict_student_status'
-]
+    'prediction': ['user_input_features', 'predict_student_status', 'create_contribution_chart', 'FEATURE_LABELS'],
+
+    # Model registry
+    'registry': ['load_artifact', 'artifact_stats'],
+
+    # Data store
+    'data_store': ['load_dataset', 'dataset_version', 'dataset_changes', 'ingest_records'],
+
+    # Count cube
+    'cube': ['CUBE_KEYS', 'build_count_cube', 'get_count_cube', 'update_count_cube', 'slice_cube', 'status_counts'],
+
+    # Bitmap row index
+    'bitmap_index': ['get_bitmap_index', 'resolve_filter', 'gather_columns'],
+
+    # Compiled forest inference
+    'forest': ['CompiledForest', 'compile_forest', 'get_compiled_forest', 'float32_forest'],
+
+    # Feature pipeline
+    'features': [
+        'FEATURE_NAMES', 'add_derived_features', 'build_feature_frame', 'build_feature_block',
+        'check_feature_names',
+    ],
+
+    # Figure cache
+    'figure_cache': ['cached_figure', 'figure_cache_stats', 'clear_figure_cache'],
+
+    # Model bundle
+    'bundle': [
+        'ModelBundle', 'load_bundle', 'bundle_identity', 'write_bundle', 'bundle_from_artifacts', 'bundle_from_forest',
+        'get_bundle',
+        'DEFAULT_BUNDLE_PATH',
+    ],
+
+    # Instrumentation
+    'instrumentation': [
+        'timed', 'instrument', 'record', 'metrics_enabled', 'set_enabled', 'stage_metrics',
+        'reset_metrics', 'prometheus_text', 'start_metrics_server', 'start_json_logger',
+        'start_exporters_from_env', 'profiling_allowed', 'start_profile', 'stop_profile',
+    ],
+
+    # What-if sweeps
+    'sweep': ['SWEEP_FEATURES', 'sweep_values', 'build_sweep_grid', 'run_sweep', 'create_sweep_figure'],
+
+    # At-risk ranking
+    'risk_index': ['build_risk_index', 'update_risk_index', 'get_risk_index', 'top_at_risk'],
+
+    # Background precompute
+    'precompute': [
+        'run_precompute', 'request_precompute', 'get_precompute', 'precompute_status', 'is_precompute_current',
+        'build_drift_reference', 'feature_drift', 'PSI_THRESHOLDS',
+    ],
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+# Expose all functions
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    # Cache on the package so the next lookup skips __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,249 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .bundle import ModelBundle, bundle_identity, load_bundle
+from .features import FEATURE_NAMES, build_feature_frame, check_feature_names
+from .forest import CompiledForest, get_compiled_forest, is_compilable
+from .registry import load_artifact
+
+DEFAULT_MODEL_PATH = 'model/rf_model.pkl'
+DEFAULT_SCALLER_PATH = 'model/scaller.pkl'
+DEFAULT_ENCODER_PATH = 'model/label_lencoder.pkl'
+
+# Artifacts of the current worker process (set by _init_worker)
+_worker = {}
+
+
+def score_frame(df, model, scaller, class_names=None, explain=None):
+    """
+    Score a block of students in one vectorized predict_proba call.
+
+    Args:
+        df: DataFrame with the raw student columns
+        model: Fitted classifier with predict_proba (forests use the compiled engine),
+            or a ModelBundle / CompiledForest
+        scaller: Fitted scaler (fitted on helper.features.FEATURE_NAMES), unused for bundles
+        class_names: Optional list of class names indexed by the model's classes
+        explain: Optional class name; adds a Contrib_<feature> column per feature with
+            its decision-path contribution to that class's probability (forests only)
+
+    Returns:
+        DataFrame (same index as df) with Predicted_Status and Prob_<class> columns
+    """
+    features = build_feature_frame(df)
+    if isinstance(model, ModelBundle):
+        model = model.forest
+
+    engine = None
+    if isinstance(model, CompiledForest):
+        engine = model
+    elif is_compilable(model):
+        # Raw features go straight into the compiled forest (scaler folded in)
+        engine = get_compiled_forest(model, scaller)
+
+    if engine is not None:
+        probabilities = engine.predict_proba(features)
+    else:
+        scaled_df = pd.DataFrame(scaller.transform(features), columns=FEATURE_NAMES)
+        probabilities = model.predict_proba(scaled_df)
+    classes = model.classes if isinstance(model, CompiledForest) else model.classes_
+    if class_names is not None:
+        classes = [class_names[c] for c in classes]
+
+    result = pd.DataFrame(probabilities, columns=[f'Prob_{c}' for c in classes], index=df.index)
+    result.insert(0, 'Predicted_Status', np.asarray(classes)[probabilities.argmax(axis=1)])
+
+    if explain is not None:
+        if engine is None:
+            raise ValueError("Feature contributions are only available for Random Forest models")
+        if explain not in classes:
+            raise ValueError(f"Unknown class {explain!r}, expected one of {list(classes)}")
+        _, contributions = engine.contributions(features)
+        contributions = contributions[:, :, list(classes).index(explain)]
+        for position, name in enumerate(engine.feature_names):
+            result[f'Contrib_{name}'] = contributions[:, position]
+    return result
+
+
+def _load_artifacts(model_path, scaller_path, encoder_path, bundle_path=None):
+    if bundle_path:
+        # Memory-mapped, so every worker shares one copy of the forest
+        return load_artifact(bundle_path, loader=load_bundle, identify=bundle_identity), None, None
+    model = load_artifact(model_path)
+    scaller = load_artifact(scaller_path)
+    check_feature_names(scaller)
+    class_names = None
+    if encoder_path and os.path.exists(encoder_path):
+        class_names = list(load_artifact(encoder_path).classes_)
+    return model, scaller, class_names
+
+
+def _init_worker(model_path, scaller_path, encoder_path, bundle_path=None):
+    _worker['artifacts'] = _load_artifacts(model_path, scaller_path, encoder_path, bundle_path)
+
+
+def _score_chunk(chunk, keep_columns, explain=None):
+    model, scaller, class_names = _worker['artifacts']
+    result = score_frame(chunk, model, scaller, class_names, explain)
+    if keep_columns is None:
+        return pd.concat([chunk, result], axis=1)
+    return pd.concat([chunk[keep_columns], result], axis=1)
+
+
+def _read_chunks(path, chunk_size):
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet requires pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def _output_schema(table):
+    """
+    Parquet schema of the scored output, fixed before the first chunk is written.
+
+    Model features and scores always get the same type, whatever pandas
+    inferred for the first chunk (an integer column turns float in a chunk
+    with a missing value). Other input columns keep the first chunk's type,
+    and string for a column that is empty there.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for field in table.schema:
+        if field.name in FEATURE_NAMES or field.name.startswith(('Prob_', 'Contrib_')):
+            fields.append(pa.field(field.name, pa.float64()))
+        elif field.name == 'Predicted_Status' or table.column(field.name).null_count == table.num_rows:
+            fields.append(pa.field(field.name, pa.string()))
+        else:
+            fields.append(pa.field(field.name, field.type))
+    return pa.schema(fields)
+
+
+class _ChunkWriter:
+    # Streams scored chunks to CSV or Parquet without keeping them in memory
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet_writer = None
+        self.schema = None
+        self.started = False
+
+    def write(self, df):
+        if self.path.endswith('.parquet'):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Writing Parquet requires pyarrow: pip install pyarrow")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet_writer is None:
+                self.schema = _output_schema(table)
+                self.parquet_writer = pq.ParquetWriter(self.path, self.schema)
+            self.parquet_writer.write_table(table.cast(self.schema))
+        else:
+            df.to_csv(self.path, mode='a' if self.started else 'w', header=not self.started, index=False)
+        self.started = True
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def score_file(input_path, output_path, model_path=DEFAULT_MODEL_PATH, scaller_path=DEFAULT_SCALLER_PATH,
+               encoder_path=DEFAULT_ENCODER_PATH, chunk_size=50_000, workers=None, keep_columns=None,
+               progress=None, bundle_path=None, explain=None):
+    """
+    Score a CSV or Parquet file of students chunk by chunk.
+
+    Chunks are scored in a process pool with a bounded number of chunks in
+    flight and written out in input order, so memory stays constant no matter
+    how large the input file is.
+
+    Args:
+        input_path: CSV or .parquet file with the raw student columns
+        output_path: CSV or .parquet file to write predictions to
+        model_path, scaller_path, encoder_path: Model artifacts
+        chunk_size: Number of rows per chunk
+        workers: Number of worker processes (default: CPU count, 1 disables the pool)
+        keep_columns: Input columns copied to the output (default: all)
+        progress: Optional callable(rows_done, seconds_elapsed)
+        bundle_path: Model bundle to score with instead of the three pickles
+        explain: Optional class name whose per-feature contributions are added (see score_frame)
+
+    Returns:
+        dict with rows, seconds and rows_per_second
+    """
+    workers = workers or os.cpu_count() or 1
+    artifacts = (model_path, scaller_path, encoder_path, bundle_path)
+    writer = _ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+
+    def emit(scored):
+        nonlocal rows
+        writer.write(scored)
+        rows += len(scored)
+        if progress is not None:
+            progress(rows, time.perf_counter() - start)
+
+    try:
+        if workers == 1:
+            _init_worker(*artifacts)
+            for chunk in _read_chunks(input_path, chunk_size):
+                emit(_score_chunk(chunk, keep_columns, explain))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=artifacts) as pool:
+                pending = deque()
+                for chunk in _read_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(_score_chunk, chunk, keep_columns, explain))
+                    if len(pending) >= 2 * workers:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds > 0 else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a whole cohort of students with the Random Forest model.")
+    parser.add_argument('input', help="CSV or .parquet file with student records")
+    parser.add_argument('output', help="CSV or .parquet file to write predictions to")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--scaller', default=DEFAULT_SCALLER_PATH)
+    parser.add_argument('--encoder', default=DEFAULT_ENCODER_PATH)
+    parser.add_argument('--bundle', default=None, help="Model bundle (replaces --model/--scaller/--encoder)")
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--keep', nargs='*', default=None, help="Input columns to copy to the output (default: all)")
+    parser.add_argument('--explain', default=None, metavar='CLASS',
+                        help="Add per-feature contributions to this class's probability (e.g. Dropout)")
+    args = parser.parse_args(argv)
+
+    def report(rows, seconds):
+        print(f"{rows} rows scored, {rows / seconds:,.0f} rows/s", file=sys.stderr)
+
+    summary = score_file(
+        args.input, args.output, args.model, args.scaller, args.encoder,
+        chunk_size=args.chunk_size, workers=args.workers, keep_columns=args.keep, progress=report,
+        bundle_path=args.bundle, explain=args.explain
+    )
+    print(f"Done: {summary['rows']} rows in {summary['seconds']:.2f}s ({summary['rows_per_second']:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .data_store import dataset_changes
+
+# Columns the dashboard filters on
+INDEX_COLUMNS = ['Course_Name', 'Gender', 'Age_at_enrollment']
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def build_bitmap_index(df, columns=INDEX_COLUMNS):
+    """
+    Build one packed bitmap per distinct value of each filter column.
+
+    Args:
+        df: Student DataFrame
+        columns: Columns to index
+
+    Returns:
+        dict with 'n_rows' and 'bitmaps' ({column: {value: packed uint8 bits}})
+    """
+    bitmaps = {}
+    for column in columns:
+        codes, uniques = pd.factorize(df[column])
+        bitmaps[column] = {
+            value: np.packbits(codes == i)
+            for i, value in enumerate(uniques.tolist())
+        }
+    return {'n_rows': len(df), 'bitmaps': bitmaps}
+
+
+def update_bitmap_index(index, added, rows, n_rows):
+    """
+    Apply a data delta to a bitmap index without rescanning the full dataset.
+
+    Only the bits of the changed rows are rewritten. The packed bitmaps
+    themselves are copied (n_rows / 8 bytes each), because the old index is
+    still shared by sessions on the previous version.
+
+    Args:
+        index: Bitmap index of the previous dataset version
+        added: New or updated rows (data_store.dataset_changes)
+        rows: Position of every added row in the new dataset
+        n_rows: Number of rows of the new dataset
+
+    Returns:
+        New bitmap index, equal to build_bitmap_index of the updated dataset
+    """
+    n_bytes = (n_rows + 7) // 8
+    rows = np.asarray(rows, dtype=np.int64)
+    changed = np.zeros(n_bytes, dtype=np.uint8)
+    np.bitwise_or.at(changed, rows >> 3, (0x80 >> (rows & 7)).astype(np.uint8))
+
+    bitmaps = {}
+    for column, old_bitmaps in index['bitmaps'].items():
+        codes, uniques = pd.factorize(added[column])
+        added_rows = {value: rows[codes == i] for i, value in enumerate(uniques.tolist())}
+        updated = {}
+        for value in set(old_bitmaps) | set(added_rows):
+            bits = np.zeros(n_bytes, dtype=np.uint8)
+            old_bits = old_bitmaps.get(value)
+            if old_bits is not None:
+                bits[:len(old_bits)] = old_bits
+                bits &= ~changed
+            value_rows = added_rows.get(value)
+            if value_rows is not None:
+                np.bitwise_or.at(bits, value_rows >> 3, (0x80 >> (value_rows & 7)).astype(np.uint8))
+            if bits.any():
+                updated[value] = bits
+        bitmaps[column] = updated
+    return {'n_rows': n_rows, 'bitmaps': bitmaps}
+
+
+def get_bitmap_index(df):
+    """
+    Return the bitmap index of ``df``, built once per dataset version.
+
+    A version loaded incrementally (see data_store.dataset_changes) is derived
+    from the index of its parent version and the delta.
+    """
+    version = df.attrs.get('version')
+    if version is None:
+        return build_bitmap_index(df)
+
+    index = _indexes.get(version)
+    if index is None:
+        with _lock:
+            index = _indexes.get(version)
+            if index is None:
+                changes = dataset_changes(df)
+                parent = _indexes.get(changes['parent']) if changes is not None else None
+                if parent is not None:
+                    index = update_bitmap_index(parent, changes['added'], changes['rows'], len(df))
+                else:
+                    index = build_bitmap_index(df)
+                _indexes.clear()
+                _indexes[version] = index
+    return index
+
+
+def resolve_filter(index, course=None, gender=None, age_range=None):
+    """
+    Resolve the dashboard filters into the positions of the matching rows.
+
+    Args:
+        index: Bitmap index from build_bitmap_index
+        course: Course name, or None for all programs
+        gender: Gender code (1: male, 0: female), or None for both
+        age_range: Inclusive (min, max) age tuple, or None for all ages
+
+    Returns:
+        Sorted int64 array of row positions
+    """
+    n_rows = index['n_rows']
+    bitmaps = index['bitmaps']
+    empty = np.zeros((n_rows + 7) // 8, dtype=np.uint8)
+    selected = None
+
+    if course is not None:
+        selected = bitmaps['Course_Name'].get(course, empty)
+    if gender is not None:
+        bits = bitmaps['Gender'].get(gender, empty)
+        selected = bits if selected is None else selected & bits
+    if age_range is not None:
+        bits = empty.copy()
+        for age, age_bits in bitmaps['Age_at_enrollment'].items():
+            if age_range[0] <= age <= age_range[1]:
+                bits |= age_bits
+        selected = bits if selected is None else selected & bits
+
+    if selected is None:
+        return np.arange(n_rows, dtype=np.int64)
+    return np.flatnonzero(np.unpackbits(selected, count=n_rows))
+
+
+def gather_columns(df, positions, columns):
+    """
+    Gather only ``columns`` of the rows at ``positions`` into a new small frame.
+
+    Args:
+        df: Source DataFrame (not copied)
+        positions: Row positions from resolve_filter
+        columns: Columns to gather
+
+    Returns:
+        DataFrame with the selected rows and columns
+    """
+    gathered = {}
+    for column in columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            gathered[column] = values.array.take(positions)
+        else:
+            gathered[column] = np.take(values.to_numpy(), positions)
+    return pd.DataFrame(gathered, copy=False)
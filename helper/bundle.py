@@ -0,0 +1,286 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .features import FEATURE_NAMES
+from .forest import CompiledForest, compile_forest
+
+DEFAULT_BUNDLE_PATH = 'model/student_model.bundle'
+BUNDLE_FORMAT = 1
+
+# File layout: MAGIC, uint64 header length, JSON header, then every array as
+# raw little-endian bytes starting on an ALIGNMENT boundary.
+MAGIC = b'STUDMDL\x00'
+ALIGNMENT = 64
+
+# Node arrays of the CompiledForest, stored in this order
+_FOREST_ARRAYS = ['roots', 'feature', 'threshold', 'left', 'right', 'value', 'children', 'is_leaf']
+
+_bundles = {}
+_lock = threading.Lock()
+
+
+def schema_hash(feature_names):
+    """Short hash of the ordered feature list; bundles only load against the same schema."""
+    return hashlib.sha256(json.dumps(list(feature_names)).encode()).hexdigest()[:16]
+
+
+def _aligned(n):
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+class ModelBundle:
+    """
+    Everything serving needs from one training run.
+
+    Attributes:
+        forest: CompiledForest that scores raw features and returns class labels
+        class_labels: Class names in probability column order, e.g. ['Dropout', 'Enrolled', 'Graduate']
+        feature_names: Model input order
+        scaler_mean, scaler_scale: Scaler parameters (already folded into the forest)
+        drift_reference: Training feature distribution (see precompute.build_drift_reference), or None
+        header: Raw bundle header (format, schema_hash, content_sha256, created_at, ...)
+    """
+
+    def __init__(self, forest, scaler_mean, scaler_scale, header):
+        self.forest = forest
+        self.class_labels = [str(c) for c in forest.classes]
+        self.feature_names = forest.feature_names
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+        self.drift_reference = header.get('drift_reference')
+        self.header = header
+
+    @property
+    def version(self):
+        """Identifier of this bundle: schema hash plus the first bytes of the content hash."""
+        return f"{self.header['schema_hash']}-{self.header['content_sha256'][:12]}"
+
+    def predict_with_proba(self, X):
+        return self.forest.predict_with_proba(X)
+
+
+def bundle_from_artifacts(model, scaller, label_encoder=None, drift_reference=None):
+    """
+    Build an in-memory ModelBundle from the fitted model, scaller and label encoder.
+
+    Args:
+        model: Fitted RandomForestClassifier (trained on scaled FEATURE_NAMES)
+        scaller: Fitted StandardScaler
+        label_encoder: Fitted LabelEncoder used for the target, or None to keep the model's classes
+        drift_reference: Training feature distribution stored in the header, or None
+
+    Returns:
+        ModelBundle whose forest predicts the encoder's class names
+    """
+    forest = compile_forest(model, scaller)
+    if label_encoder is not None:
+        forest.classes = np.asarray(label_encoder.classes_)[forest.classes]
+    return bundle_from_forest(forest, scaller, drift_reference)
+
+
+def bundle_from_forest(forest, scaller, drift_reference=None):
+    """
+    Build an in-memory ModelBundle around an already compiled forest.
+
+    Args:
+        forest: CompiledForest scoring raw features (e.g. from float32_forest)
+        scaller: The StandardScaler folded into the forest (kept for the header)
+        drift_reference: Training feature distribution stored in the header, or None
+
+    Returns:
+        ModelBundle
+    """
+    arrays = {name: _forest_array(forest, name) for name in _FOREST_ARRAYS}
+    header = _header(forest, scaller, arrays)
+    if drift_reference is not None:
+        header['drift_reference'] = drift_reference
+    return ModelBundle(forest, np.asarray(scaller.mean_), np.asarray(scaller.scale_), header)
+
+
+def get_bundle(model, scaller, label_encoder=None):
+    """Return the ModelBundle of loaded pickles, built once per object triple."""
+    key = (id(model), id(scaller), id(label_encoder))
+    entry = _bundles.get(key)
+    if entry is None:
+        with _lock:
+            entry = _bundles.get(key)
+            if entry is None:
+                # Keep references so the ids stay valid; old triples are dropped on reload
+                entry = (model, scaller, label_encoder, bundle_from_artifacts(model, scaller, label_encoder))
+                _bundles.clear()
+                _bundles[key] = entry
+    return entry[3]
+
+
+def _forest_array(forest, name):
+    # Little-endian on disk; 32-bit arrays (float32_forest) keep their width
+    array = getattr(forest, name)
+    if array.dtype.kind in 'iu':
+        array = array.astype('<i4' if array.dtype.itemsize == 4 else '<i8')
+    elif array.dtype.kind == 'f':
+        array = array.astype('<f4' if array.dtype.itemsize == 4 else '<f8')
+    return np.ascontiguousarray(array)
+
+
+def _header(forest, scaller, arrays):
+    digest = hashlib.sha256()
+    for name in _FOREST_ARRAYS:
+        digest.update(arrays[name].tobytes())
+    return {
+        'format': BUNDLE_FORMAT,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'feature_names': forest.feature_names,
+        'schema_hash': schema_hash(forest.feature_names),
+        'class_labels': [str(c) for c in forest.classes],
+        'max_depth': forest.max_depth,
+        'scaler': {'mean': np.asarray(scaller.mean_).tolist(), 'scale': np.asarray(scaller.scale_).tolist()},
+        'content_sha256': digest.hexdigest(),
+    }
+
+
+def write_bundle(path, bundle):
+    """
+    Write a ModelBundle to ``path`` (atomically, via a .tmp file).
+
+    Returns:
+        The header that was written
+    """
+    arrays = {name: _forest_array(bundle.forest, name) for name in _FOREST_ARRAYS}
+    header = dict(bundle.header, arrays={})
+    offset = 0
+    for name in _FOREST_ARRAYS:
+        array = arrays[name]
+        header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header_bytes = json.dumps(header).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(header_bytes)) + header_bytes)
+        for name in _FOREST_ARRAYS:
+            f.seek(data_start + header['arrays'][name]['offset'])
+            f.write(arrays[name].tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_header(path):
+    """Return (header, data_start) of a bundle file without touching the arrays."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a model bundle")
+        (length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(length))
+    return header, _aligned(len(MAGIC) + 8 + length)
+
+
+def bundle_identity(path):
+    """
+    Return a content identity of a bundle from its header alone.
+
+    The header records the hash of every array (content_sha256) next to the
+    scaler, classes and drift reference, so hashing the header bytes
+    identifies the whole bundle without reading the arrays. Use
+    load_bundle(verify=True) to check the arrays against it.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a model bundle")
+        (length,) = struct.unpack('<Q', f.read(8))
+        return hashlib.sha256(f.read(length)).hexdigest()
+
+
+def load_bundle(path, feature_names=FEATURE_NAMES, verify=False):
+    """
+    Open a bundle with its node arrays memory-mapped read-only.
+
+    Every process that opens the same file shares one physical copy of the
+    forest through the OS page cache, and opening it only parses the header.
+
+    Args:
+        path: Bundle file
+        feature_names: Schema the caller feeds; a different schema raises ValueError
+        verify: Also check the content hash (reads every array once)
+
+    Returns:
+        ModelBundle
+    """
+    header, data_start = read_header(path)
+    if header.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format {header.get('format')} (expected {BUNDLE_FORMAT})")
+    if feature_names is not None and header['schema_hash'] != schema_hash(feature_names):
+        raise ValueError(
+            f"Feature schema mismatch: bundle {header['schema_hash']} was built for {header['feature_names']}, "
+            f"serving expects {schema_hash(feature_names)} {list(feature_names)}"
+        )
+
+    raw = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        start = data_start + spec['offset']
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        arrays[name] = raw[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+
+    if verify:
+        digest = hashlib.sha256()
+        for name in _FOREST_ARRAYS:
+            digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+        if digest.hexdigest() != header['content_sha256']:
+            raise ValueError(f"Bundle {path} is corrupted (content hash mismatch)")
+
+    forest = CompiledForest(
+        feature_names=header['feature_names'],
+        classes=header['class_labels'],
+        roots=arrays['roots'],
+        feature=arrays['feature'],
+        threshold=arrays['threshold'],
+        left=arrays['left'],
+        right=arrays['right'],
+        value=arrays['value'],
+        max_depth=header['max_depth'],
+        children=arrays['children'],
+        is_leaf=arrays['is_leaf'],
+    )
+    return ModelBundle(forest, np.asarray(header['scaler']['mean']), np.asarray(header['scaler']['scale']), header)
+
+
+def main(argv=None):
+    import joblib
+
+    from .batch_scoring import DEFAULT_ENCODER_PATH, DEFAULT_MODEL_PATH, DEFAULT_SCALLER_PATH
+
+    parser = argparse.ArgumentParser(description="Pack model, scaller and label encoder into one model bundle.")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--scaller', default=DEFAULT_SCALLER_PATH)
+    parser.add_argument('--encoder', default=DEFAULT_ENCODER_PATH)
+    parser.add_argument('--output', default=DEFAULT_BUNDLE_PATH)
+    parser.add_argument('--data', default=None,
+                        help="Training CSV: store its training-split distribution for drift monitoring")
+    args = parser.parse_args(argv)
+
+    drift_reference = None
+    if args.data:
+        from .precompute import build_drift_reference
+        from .training import split_dataset
+
+        drift_reference = build_drift_reference(split_dataset(args.data)[0])
+    bundle = bundle_from_artifacts(
+        joblib.load(args.model), joblib.load(args.scaller), joblib.load(args.encoder), drift_reference
+    )
+    write_bundle(args.output, bundle)
+    print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB, version {bundle.version})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+import argparse
+import copy
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score, f1_score
+
+from .batch_scoring import DEFAULT_ENCODER_PATH, DEFAULT_MODEL_PATH, DEFAULT_SCALLER_PATH
+from .bundle import bundle_from_artifacts, bundle_from_forest, load_bundle, write_bundle
+from .data_store import DEFAULT_CSV_PATH
+from .features import FEATURE_NAMES
+from .forest import float32_forest
+from .precompute import build_drift_reference
+from .training import RANDOM_SEED, _search_estimator, split_dataset
+
+DEFAULT_COMPACTION_REPORT_PATH = 'model/compaction_report.json'
+DEFAULT_COMPACT_BUNDLE_PATH = 'model/student_model.compact.bundle'
+
+# A candidate is recommended when its test accuracy is at most this far below the baseline
+ACCURACY_TOLERANCE = 0.01
+
+# ... and the F1 of the smallest class (Enrolled) at most this far below the baseline's
+MINORITY_F1_TOLERANCE = 0.02
+
+# Random Forests refit with the baseline's hyperparameters plus these limits
+LIMITED_FORESTS = {
+    'depth_12': {'max_depth': 12},
+    'depth_8': {'max_depth': 8},
+    'leaf_10': {'min_samples_leaf': 10},
+}
+
+
+def _soft_label_fit(estimator, X, teacher_probabilities):
+    """
+    Fit ``estimator`` on the teacher's class probabilities instead of hard labels.
+
+    Every row is repeated once per class with that class's probability as
+    sample weight, so the weighted log-loss / impurity the estimator minimizes
+    is the one against the soft targets.
+    """
+    n_rows, n_classes = teacher_probabilities.shape
+    X_rep = np.tile(np.asarray(X), (n_classes, 1))
+    y_rep = np.repeat(np.arange(n_classes), n_rows)
+    weights = teacher_probabilities.T.ravel()
+    keep = weights > 0
+    X_rep = pd.DataFrame(X_rep[keep], columns=FEATURE_NAMES)
+    return estimator.fit(X_rep, y_rep[keep], sample_weight=weights[keep])
+
+
+def _refit(model, X_scaled, y_train, seed, use_smote, **params):
+    """
+    Refit ``model``'s hyperparameters (plus ``params``) the way helper.training fits it.
+
+    The forest goes through the same _search_estimator pipeline, so with
+    imbalanced-learn installed the training rows are oversampled with SMOTE
+    exactly as for the baseline.
+    """
+    estimator, prefix, _ = _search_estimator(seed, use_smote)
+    forest_params = dict(model.get_params(), **params)
+    if prefix:
+        # SMOTE already balances the classes
+        forest_params.pop('class_weight', None)
+    estimator.set_params(**{prefix + name: value for name, value in forest_params.items()})
+    estimator.fit(X_scaled, y_train)
+    return estimator.named_steps['model'] if prefix else estimator
+
+
+def _pruned_forest(model, n_trees):
+    # Trees of a Random Forest are independent, so the first n are an unbiased subsample
+    pruned = copy.copy(model)
+    pruned.estimators_ = model.estimators_[:n_trees]
+    pruned.n_estimators = n_trees
+    return pruned
+
+
+def build_candidates(model, scaller, label_encoder, X_train, y_train, seed=RANDOM_SEED, use_smote=True):
+    """
+    Build the compact alternatives to the current Random Forest.
+
+    Args:
+        model: Current RandomForestClassifier (trained on scaled FEATURE_NAMES)
+        scaller, label_encoder: Its fitted scaler and label encoder
+        X_train, y_train: Raw training features and encoded labels (from split_dataset)
+        seed: Random seed of the refitted models
+        use_smote: Refit forests with SMOTE when available, like helper.training
+
+    Returns:
+        dict {name: (description, servable)} where servable is a ModelBundle for
+        forests, or a fitted classifier (scored through ``scaller``) otherwise
+    """
+    X_scaled = pd.DataFrame(scaller.transform(X_train), columns=FEATURE_NAMES)
+    candidates = {
+        'baseline': ('Model saat ini', bundle_from_artifacts(model, scaller, label_encoder)),
+    }
+    candidates['float32'] = (
+        'Model saat ini dengan threshold/nilai float32',
+        bundle_from_forest(float32_forest(candidates['baseline'][1].forest), scaller),
+    )
+    for n_trees in (model.n_estimators // 2, model.n_estimators // 4):
+        if n_trees > 0:
+            candidates[f'trees_{n_trees}'] = (
+                f'{n_trees} pohon pertama model saat ini',
+                bundle_from_artifacts(_pruned_forest(model, n_trees), scaller, label_encoder),
+            )
+    for name, limits in LIMITED_FORESTS.items():
+        forest = _refit(model, X_scaled, y_train, seed, use_smote, **limits)
+        candidates[name] = (
+            f'Random Forest dilatih ulang dengan {limits}', bundle_from_artifacts(forest, scaller, label_encoder)
+        )
+
+    # Distillation targets: the current forest's probabilities on the training rows
+    teacher = model.predict_proba(X_scaled)
+    tree = _soft_label_fit(
+        RandomForestClassifier(n_estimators=1, bootstrap=False, max_features=None, max_depth=8,
+                               min_samples_leaf=5, random_state=seed),
+        X_scaled, teacher,
+    )
+    candidates['distilled_tree'] = (
+        'Satu pohon (kedalaman 8) hasil distilasi', bundle_from_artifacts(tree, scaller, label_encoder)
+    )
+    gbm = _soft_label_fit(HistGradientBoostingClassifier(max_iter=100, random_state=seed), X_scaled, teacher)
+    candidates['distilled_gbm'] = ('Gradient boosting hasil distilasi', gbm)
+    return candidates
+
+
+def _median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def evaluate_candidate(servable, scaller, class_names, X_test, y_test, baseline_labels=None, workdir='.', repeat=50):
+    """
+    Measure accuracy, per-class F1, artifact size, load time and latency of one candidate.
+
+    Forests are written and reloaded as model bundles and scored with the
+    compiled engine; other models are pickled and scored through the scaler,
+    the same way the app serves them.
+
+    Returns:
+        dict of metrics (and 'labels', the predicted class names)
+    """
+    path = os.path.join(workdir, 'candidate')
+    if hasattr(servable, 'forest'):
+        write_bundle(path, servable)
+        load = lambda: load_bundle(path)
+        loaded = load()
+        predict = lambda X: loaded.predict_with_proba(X)[0]
+        n_nodes = int(len(loaded.forest.feature))
+    else:
+        joblib.dump(servable, path)
+        load = lambda: joblib.load(path)
+        loaded = load()
+
+        def predict(X):
+            scaled = pd.DataFrame(scaller.transform(X), columns=FEATURE_NAMES)
+            return np.asarray(class_names)[loaded.predict_proba(scaled).argmax(axis=1)]
+        n_nodes = None
+
+    labels = np.asarray(predict(X_test)).astype(str)
+    truth = np.asarray(class_names)[y_test]
+    f1 = f1_score(truth, labels, labels=class_names, average=None)
+    one_row = X_test.iloc[:1]
+    batch_ms = _median_ms(lambda: predict(X_test), max(3, repeat // 10))
+    metrics = {
+        'accuracy': float(accuracy_score(truth, labels)),
+        'macro_f1': float(f1.mean()),
+        'f1': {name: float(score) for name, score in zip(class_names, f1)},
+        'agreement_with_baseline': None if baseline_labels is None else float((labels == baseline_labels).mean()),
+        'size_bytes': os.path.getsize(path),
+        'nodes': n_nodes,
+        'load_ms': _median_ms(load, max(3, repeat // 10)),
+        'single_row_ms': _median_ms(lambda: predict(one_row), repeat),
+        'batch_ms': batch_ms,
+        'batch_rows_per_second': len(X_test) / (batch_ms / 1000),
+        'labels': labels,
+    }
+    os.remove(path)
+    return metrics
+
+
+def compact(csv_path=DEFAULT_CSV_PATH, model_path=DEFAULT_MODEL_PATH, scaller_path=DEFAULT_SCALLER_PATH,
+            encoder_path=DEFAULT_ENCODER_PATH, report_path=DEFAULT_COMPACTION_REPORT_PATH, seed=RANDOM_SEED,
+            test_size=0.2, tolerance=ACCURACY_TOLERANCE, f1_tolerance=MINORITY_F1_TOLERANCE, save=None,
+            bundle_path=DEFAULT_COMPACT_BUNDLE_PATH, refit_baseline=False, use_smote=True, repeat=50):
+    """
+    Compare compact serving models against the current Random Forest.
+
+    Uses the same held-out split as helper.training, so after a training run
+    the baseline is evaluated on rows it never saw. A model trained some other
+    way (e.g. on the full dataset) can be refitted on the training split with
+    ``refit_baseline`` to keep the comparison fair.
+
+    Args:
+        csv_path: Student CSV
+        model_path, scaller_path, encoder_path: Current model artifacts
+        report_path: JSON report output path
+        seed, test_size: Split parameters (must match the training run)
+        tolerance: Largest accuracy drop for a candidate to be recommended
+        f1_tolerance: Largest drop of the smallest class's F1 for a candidate to be recommended
+        save: Candidate name to write as a model bundle ('recommended' for the recommendation)
+        bundle_path: Output path of the saved candidate
+        refit_baseline: Refit the current model's hyperparameters on the training split first
+        use_smote: Refit forests with SMOTE when available, like helper.training
+        repeat: Timing repetitions for the single-row latency
+
+    Returns:
+        The report dict that was written to ``report_path``
+    """
+    X_train, X_test, y_train, y_test, _, n_rows = split_dataset(csv_path, seed, test_size)
+    model = joblib.load(model_path)
+    scaller = joblib.load(scaller_path)
+    label_encoder = joblib.load(encoder_path)
+    class_names = [str(c) for c in label_encoder.classes_]
+    if refit_baseline:
+        X_scaled = pd.DataFrame(scaller.transform(X_train), columns=FEATURE_NAMES)
+        model = _refit(model, X_scaled, y_train, seed, use_smote)
+    minority_class = class_names[int(np.bincount(y_train).argmin())]
+
+    candidates = build_candidates(model, scaller, label_encoder, X_train, y_train, seed, use_smote)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, (description, servable) in candidates.items():
+            baseline_labels = results['baseline']['labels'] if results else None
+            results[name] = evaluate_candidate(
+                servable, scaller, class_names, X_test, y_test, baseline_labels, workdir, repeat
+            )
+            results[name]['description'] = description
+    for metrics in results.values():
+        metrics.pop('labels')
+
+    baseline = results['baseline']
+    eligible = [
+        name for name, metrics in results.items()
+        if metrics['accuracy'] >= baseline['accuracy'] - tolerance
+        and metrics['f1'][minority_class] >= baseline['f1'][minority_class] - f1_tolerance
+        and hasattr(candidates[name][1], 'forest')
+    ]
+    recommended = min(eligible, key=lambda name: results[name]['size_bytes'])
+
+    saved = None
+    if save is not None:
+        name = recommended if save == 'recommended' else save
+        servable = candidates[name][1]
+        if not hasattr(servable, 'forest'):
+            raise ValueError(f"Candidate {name!r} is not a forest and cannot be written as a model bundle")
+        # Keep drift monitoring working when the compact bundle is served
+        servable.drift_reference = servable.header['drift_reference'] = build_drift_reference(X_train)
+        write_bundle(bundle_path, servable)
+        saved = {'candidate': name, 'path': bundle_path, 'version': servable.version}
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'data': {'path': csv_path, 'rows': n_rows, 'train_rows': len(X_train), 'test_rows': len(X_test), 'seed': seed},
+        'baseline': {'path': model_path, 'refitted': refit_baseline},
+        'tolerance': tolerance,
+        'minority_class': minority_class,
+        'f1_tolerance': f1_tolerance,
+        'candidates': results,
+        'recommended': recommended,
+        'saved': saved,
+    }
+    with open(report_path + '.tmp', 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(report_path + '.tmp', report_path)
+    return report
+
+
+def format_report(report):
+    """Render the candidate comparison as a plain-text table."""
+    minority = report['minority_class']
+    lines = [
+        f"{'candidate':<16}{'acc':>7}{'macroF1':>9}{'F1 ' + minority:>13}{'agree':>7}{'size KB':>10}{'load ms':>9}"
+        f"{'1-row ms':>10}{'rows/s':>10}"
+    ]
+    for name, m in report['candidates'].items():
+        agreement = '-' if m['agreement_with_baseline'] is None else f"{m['agreement_with_baseline']:.3f}"
+        lines.append(
+            f"{name:<16}{m['accuracy']:>7.3f}{m['macro_f1']:>9.3f}{m['f1'][minority]:>13.3f}{agreement:>7}"
+            f"{m['size_bytes'] / 1024:>10.0f}{m['load_ms']:>9.2f}{m['single_row_ms']:>10.2f}"
+            f"{m['batch_rows_per_second']:>10,.0f}"
+        )
+    lines.append(f"Recommended (accuracy within {report['tolerance']:.3f} and {minority} F1 within "
+                 f"{report['f1_tolerance']:.3f} of baseline, smallest bundle): {report['recommended']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare compact serving models against the current Random Forest.")
+    parser.add_argument('--data', default=DEFAULT_CSV_PATH, help="Student CSV")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--scaller', default=DEFAULT_SCALLER_PATH)
+    parser.add_argument('--encoder', default=DEFAULT_ENCODER_PATH)
+    parser.add_argument('--report', default=DEFAULT_COMPACTION_REPORT_PATH)
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--tolerance', type=float, default=ACCURACY_TOLERANCE,
+                        help="Largest accuracy drop for the recommendation (default: 0.01)")
+    parser.add_argument('--f1-tolerance', type=float, default=MINORITY_F1_TOLERANCE,
+                        help="Largest F1 drop of the smallest class for the recommendation (default: 0.02)")
+    parser.add_argument('--save', default=None, metavar='CANDIDATE',
+                        help="Write this candidate (or 'recommended') as a model bundle")
+    parser.add_argument('--bundle', default=DEFAULT_COMPACT_BUNDLE_PATH, help="Output path for --save")
+    parser.add_argument('--refit-baseline', action='store_true',
+                        help="Refit the current model on the training split (if it was trained on all rows)")
+    parser.add_argument('--no-smote', action='store_true', help="Refit forests with balanced class weights instead of SMOTE")
+    args = parser.parse_args(argv)
+
+    report = compact(
+        args.data, args.model, args.scaller, args.encoder, args.report, seed=args.seed,
+        test_size=args.test_size, tolerance=args.tolerance, f1_tolerance=args.f1_tolerance, save=args.save,
+        bundle_path=args.bundle, refit_baseline=args.refit_baseline, use_smote=not args.no_smote,
+    )
+    print(format_report(report))
+    if report['saved']:
+        print(f"Wrote {report['saved']['candidate']} to {report['saved']['path']} (version {report['saved']['version']})")
+    print(f"Report written to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import threading
+
+import pandas as pd
+
+from .data_store import dataset_changes
+
+# Dimensions of the pre-aggregated count cube
+CUBE_KEYS = ['Course_Name', 'Gender', 'Age_at_enrollment', 'Scholarship_holder', 'Status']
+
+_cubes = {}
+_lock = threading.Lock()
+
+
+def build_count_cube(df):
+    """
+    Count students per (Course, Gender, Age, Scholarship, Status) combination.
+
+    Args:
+        df: Student DataFrame with the CUBE_KEYS columns
+
+    Returns:
+        DataFrame with one row per non-empty cell and a 'Count' column
+    """
+    cube = (
+        df.groupby(CUBE_KEYS, observed=True, dropna=False)
+        .size()
+        .rename('Count')
+        .reset_index()
+    )
+    cube = cube[cube['Count'] > 0].reset_index(drop=True)
+    cube.attrs['version'] = df.attrs.get('version')
+    return cube
+
+
+def update_count_cube(cube, added, removed):
+    """
+    Apply a data delta to a count cube without rescanning the full dataset.
+
+    Args:
+        cube: Count cube of the previous dataset version
+        added: Rows that were added (new or updated students)
+        removed: Rows that were replaced
+
+    Returns:
+        New count cube, equal to build_count_cube of the updated dataset
+    """
+    parts = [cube, build_count_cube(added)]
+    if len(removed):
+        removed_counts = build_count_cube(removed)
+        parts.append(removed_counts.assign(Count=-removed_counts['Count']))
+    updated = (
+        pd.concat(parts, ignore_index=True)
+        .groupby(CUBE_KEYS, observed=True, dropna=False)['Count']
+        .sum()
+        .reset_index()
+    )
+    return updated[updated['Count'] > 0].reset_index(drop=True)
+
+
+def get_count_cube(df):
+    """
+    Return the count cube of ``df``, built once per dataset version.
+
+    A version loaded incrementally (see data_store.dataset_changes) is derived
+    from the cube of its parent version and the delta.
+    """
+    version = df.attrs.get('version')
+    if version is None:
+        return build_count_cube(df)
+
+    cube = _cubes.get(version)
+    if cube is None:
+        with _lock:
+            cube = _cubes.get(version)
+            if cube is None:
+                changes = dataset_changes(df)
+                parent = _cubes.get(changes['parent']) if changes is not None else None
+                if parent is not None:
+                    cube = update_count_cube(parent, changes['added'], changes['removed'])
+                else:
+                    cube = build_count_cube(df)
+                cube.attrs['version'] = version
+                _cubes.clear()
+                _cubes[version] = cube
+    return cube
+
+
+def slice_cube(cube, course=None, gender=None, age_range=None):
+    """
+    Select the cube cells that match the dashboard filters.
+
+    Args:
+        cube: Count cube from build_count_cube
+        course: Course name, or None for all programs
+        gender: Gender code (1: male, 0: female), or None for both
+        age_range: Inclusive (min, max) age tuple, or None for all ages
+
+    Returns:
+        The matching cube rows (still carrying the 'Count' column)
+    """
+    mask = pd.Series(True, index=cube.index)
+    if course is not None:
+        mask &= cube['Course_Name'] == course
+    if gender is not None:
+        mask &= cube['Gender'] == gender
+    if age_range is not None:
+        mask &= cube['Age_at_enrollment'].between(age_range[0], age_range[1])
+    return cube[mask]
+
+
+def status_counts(cube):
+    """Return the number of students per status in a (sliced) cube."""
+    counts = cube.groupby('Status', observed=False)['Count'].sum()
+    return {status: int(count) for status, count in counts.items()}
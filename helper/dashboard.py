@@ -1,7 +1,36 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 
+from .instrumentation import instrument
+
+# Above this many rows, charts are binned server-side instead of shipping raw rows
+LARGE_DATA_THRESHOLD = 20_000
+
+# Maximum number of x bins for the aggregated economic scatter
+ECONOMIC_SCORE_BINS = 100
+
+# Columns each chart builder reads, so callers can pass a narrow frame
+CHART_COLUMNS = {
+    'status_distribution': ['Status'],
+    'course_success_rate': ['Course_Name', 'Status'],
+    'age_distribution': ['Age_at_enrollment', 'Status'],
+    'grade_analysis': ['Curricular_units_1st_sem_grade', 'Curricular_units_2nd_sem_grade', 'Status'],
+    'economic_impact': ['Economic_pressure_score', 'Status', 'Debtor'],
+    'scholarship_impact': ['Scholarship_holder', 'Status'],
+}
+
+def _status_table(df, by):
+    # Count students per group and status; a count cube carries its own 'Count' column
+    if 'Count' in df.columns:
+        table = df.groupby([by, 'Status'], observed=True)['Count'].sum().unstack(fill_value=0)
+    else:
+        table = df.groupby([by, 'Status'], observed=True).size().unstack(fill_value=0)
+    table.columns = table.columns.astype(str)
+    return table
+
 # Functions for dashboard visualizations
+@instrument()
 def create_status_distribution(df):
     # Status distribution
     status_counts = df['Status'].value_counts().reset_index()
@@ -27,9 +56,11 @@ def create_status_distribution(df):
     fig.update_layout(legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5))
     return fig
 
+@instrument()
 def create_course_success_rate(df):
+    # df can be raw student rows or a count cube slice
     # Group by course and calculate percentage of graduates, enrollees and dropouts
-    course_stats = df.groupby(['Course_Name', 'Status']).size().unstack().fillna(0)
+    course_stats = _status_table(df, 'Course_Name')
     
     if 'Graduate' not in course_stats.columns:
         course_stats['Graduate'] = 0
@@ -56,6 +87,7 @@ def create_course_success_rate(df):
     )
     return fig
 
+@instrument()
 def create_age_distribution(df):
     # Age distribution by status
     age_status = df[['Age_at_enrollment', 'Status']].copy()
@@ -64,6 +96,39 @@ def create_age_distribution(df):
     status_mapping = {'Dropout': 'Dropout', 'Graduate': 'Lulus', 'Enrolled': 'Terdaftar'}
     age_status['Status'] = age_status['Status'].map(status_mapping)
     
+    color_map = {
+        'Dropout': '#FF6B6B', 
+        'Terdaftar': '#4ECDC4', 
+        'Lulus': '#59CD90'
+    }
+    
+    if len(age_status) > LARGE_DATA_THRESHOLD:
+        # Large data: bin on the server so only 20 bars per status are sent
+        ages = age_status['Age_at_enrollment'].to_numpy()
+        edges = np.histogram_bin_edges(ages, bins=20)
+        binned = []
+        for status, group in age_status.groupby('Status', observed=True)['Age_at_enrollment']:
+            counts, _ = np.histogram(group.to_numpy(), bins=edges)
+            binned.append(pd.DataFrame({
+                'Age_at_enrollment': (edges[:-1] + edges[1:]) / 2,
+                'count': counts,
+                'Status': status
+            }))
+        binned = pd.concat(binned, ignore_index=True)
+        
+        fig = px.bar(
+            binned,
+            x='Age_at_enrollment',
+            y='count',
+            color='Status',
+            title='Distribusi Usia berdasarkan Status',
+            labels={'Age_at_enrollment': 'Usia saat Pendaftaran', 'count': 'Jumlah Mahasiswa'},
+            color_discrete_map=color_map
+        )
+        fig.update_layout(bargap=0)
+        fig.update_traces(width=edges[1] - edges[0])
+        return fig
+    
     fig = px.histogram(
         age_status, 
         x='Age_at_enrollment', 
@@ -71,14 +136,11 @@ def create_age_distribution(df):
         nbins=20,
         title='Distribusi Usia berdasarkan Status',
         labels={'Age_at_enrollment': 'Usia saat Pendaftaran', 'count': 'Jumlah Mahasiswa'},
-        color_discrete_map={
-            'Dropout': '#FF6B6B', 
-            'Terdaftar': '#4ECDC4', 
-            'Lulus': '#59CD90'
-        }
+        color_discrete_map=color_map
     )
     return fig
 
+@instrument()
 def create_grade_analysis(df):
     # Create grade visualization
     grade_data = df[['Curricular_units_1st_sem_grade', 'Curricular_units_2nd_sem_grade', 'Status']].copy()
@@ -103,6 +165,7 @@ def create_grade_analysis(df):
     )
     return fig
 
+@instrument()
 def create_economic_impact(df):
     # Economic pressure score vs status
     eco_data = df[['Economic_pressure_score', 'Status', 'Debtor']].copy()
@@ -112,6 +175,34 @@ def create_economic_impact(df):
     eco_data['Status'] = eco_data['Status'].map(status_mapping)
     eco_data['Has_Debt'] = eco_data['Debtor'].map({0: 'Tidak Memiliki Hutang', 1: 'Memiliki Hutang'})
     
+    if len(eco_data) > LARGE_DATA_THRESHOLD:
+        # Large data: one WebGL marker per (score bin, status, debt) cell, sized by its count
+        scores = eco_data['Economic_pressure_score'].to_numpy()
+        if len(np.unique(scores)) > ECONOMIC_SCORE_BINS:
+            edges = np.histogram_bin_edges(scores, bins=ECONOMIC_SCORE_BINS)
+            bin_index = np.clip(np.digitize(scores, edges) - 1, 0, ECONOMIC_SCORE_BINS - 1)
+            eco_data['Economic_pressure_score'] = ((edges[:-1] + edges[1:]) / 2)[bin_index]
+        density = (
+            eco_data.groupby(['Economic_pressure_score', 'Status', 'Has_Debt'], observed=True)
+            .size()
+            .rename('Jumlah')
+            .reset_index()
+        )
+        
+        fig = px.scatter(
+            density,
+            x='Economic_pressure_score',
+            y='Status',
+            color='Has_Debt',
+            size='Jumlah',
+            hover_data=['Jumlah'],
+            title='Pengaruh Tekanan Ekonomi terhadap Status',
+            labels={'Economic_pressure_score': 'Skor Tekanan Ekonomi', 'Status': 'Status Mahasiswa'},
+            color_discrete_sequence=['#4ECDC4', '#FF6B6B'],
+            render_mode='webgl'
+        )
+        return fig
+    
     fig = px.scatter(
         eco_data, 
         x='Economic_pressure_score', 
@@ -123,9 +214,10 @@ def create_economic_impact(df):
     )
     return fig
 
+@instrument()
 def create_scholarship_impact(df):
-    # Scholarship impact
-    scholar_data = df.groupby(['Scholarship_holder', 'Status']).size().unstack().fillna(0)
+    # Scholarship impact (df can be raw student rows or a count cube slice)
+    scholar_data = _status_table(df, 'Scholarship_holder')
     
     if 'Graduate' not in scholar_data.columns:
         scholar_data['Graduate'] = 0
@@ -145,6 +237,9 @@ def create_scholarship_impact(df):
     statuses = {'Graduate': 'Lulus', 'Dropout': 'Dropout', 'Enrolled': 'Terdaftar'}
     
     for scholarship in [0, 1]:
+        # A filter can leave no students with (or without) a scholarship
+        if scholarship not in scholar_data.index:
+            continue
         for status in ['Graduate', 'Dropout', 'Enrolled']:
             scholarship_status.append({
                 'Scholarship': labels[scholarship],
@@ -152,7 +247,7 @@ def create_scholarship_impact(df):
                 'Percentage': scholar_data.loc[scholarship, f'{status}_Pct']
             })
     
-    scholarship_df = pd.DataFrame(scholarship_status)
+    scholarship_df = pd.DataFrame(scholarship_status, columns=['Scholarship', 'Status', 'Percentage'])
     
     fig = px.bar(
         scholarship_df, 
@@ -169,3 +264,34 @@ def create_scholarship_impact(df):
         barmode='group'
     )
     return fig
+
+@instrument()
+def create_predicted_vs_actual(df):
+    # Actual status vs model prediction (df needs 'Status' and 'Predicted_Status')
+    status_mapping = {'Dropout': 'Dropout', 'Graduate': 'Lulus', 'Enrolled': 'Terdaftar'}
+    comparison = (
+        df.assign(
+            Status=df['Status'].astype(str).map(status_mapping),
+            Predicted_Status=df['Predicted_Status'].astype(str).map(status_mapping)
+        )
+        .groupby(['Status', 'Predicted_Status'], observed=True)
+        .size()
+        .reset_index(name='Count')
+    )
+    
+    fig = px.bar(
+        comparison,
+        x='Status',
+        y='Count',
+        color='Predicted_Status',
+        title='Status Aktual vs Prediksi Model',
+        labels={'Status': 'Status Aktual', 'Count': 'Jumlah Mahasiswa', 'Predicted_Status': 'Prediksi Model'},
+        category_orders={'Status': ['Dropout', 'Terdaftar', 'Lulus'], 'Predicted_Status': ['Dropout', 'Terdaftar', 'Lulus']},
+        color_discrete_map={
+            'Dropout': '#FF6B6B', 
+            'Terdaftar': '#4ECDC4', 
+            'Lulus': '#59CD90'
+        },
+        barmode='group'
+    )
+    return fig
@@ -0,0 +1,590 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the in-process lock still applies
+    fcntl = None
+
+from .features import DERIVED_FEATURES, add_derived_features
+from .instrumentation import instrument
+
+DEFAULT_CSV_PATH = 'data/data_students.csv'
+STORE_FORMAT = 2
+
+# Stable student key used to apply updates from ingested segments
+ID_COLUMN = 'Student_id'
+SEGMENTS_DIR = 'segments'
+
+# Segments are folded into a memory-mapped snapshot once the rows they add
+# since the last snapshot exceed this fraction of the base rows
+COMPACT_FRACTION = 0.25
+
+# Map course codes to names
+COURSE_MAPPING = {
+    33: 'Biofuel Production Technologies',
+    171: 'Animation and Multimedia Design',
+    8014: 'Social Service (evening attendance)',
+    9003: 'Agronomy',
+    9070: 'Communication Design',
+    9085: 'Veterinary Nursing',
+    9119: 'Informatics Engineering',
+    9130: 'Equinculture',
+    9147: 'Management',
+    9238: 'Social Service',
+    9254: 'Tourism',
+    9500: 'Nursing',
+    9556: 'Oral Hygiene',
+    9670: 'Advertising and Marketing Management',
+    9773: 'Journalism and Communication',
+    9853: 'Basic Education',
+    9991: 'Management (evening attendance)'
+}
+
+STATUS_CATEGORIES = ['Dropout', 'Enrolled', 'Graduate']
+CATEGORICAL_COLUMNS = {
+    'Course_Name': sorted(COURSE_MAPPING.values()),
+    'Status': STATUS_CATEGORIES,
+}
+
+# Columns computed from the raw ones, never taken from ingested records
+DERIVED_COLUMNS = ['Economic_pressure_score'] + DERIVED_FEATURES
+
+# Loaded datasets shared read-only by every session in this process
+_datasets = {}
+_changes = {}
+_lock = threading.Lock()
+
+# Serializes manifest read-modify-write (ingest) within this process
+_ingest_lock = threading.Lock()
+
+
+def default_store_path(csv_path):
+    """Return the columnar store directory that belongs to ``csv_path``."""
+    return os.path.splitext(csv_path)[0] + '.store'
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def compact_frame(df):
+    """
+    Downcast a raw student frame to compact dtypes.
+
+    Integer codes become the smallest integer type that holds them and the
+    columns listed in CATEGORICAL_COLUMNS become categoricals. Float columns
+    are kept as float64 so model inputs are not rounded.
+
+    Args:
+        df: DataFrame with the columns of data/data_students.csv
+
+    Returns:
+        A new DataFrame with compact dtypes and a Course_Name column
+    """
+    compact = {}
+    for column in df.columns:
+        values = df[column]
+        if column in CATEGORICAL_COLUMNS:
+            continue
+        if pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, downcast='integer')
+        compact[column] = values
+
+    compact = pd.DataFrame(compact)
+    if 'Course_Name' not in df.columns:
+        df = df.assign(Course_Name=df['Course'].map(COURSE_MAPPING))
+    for column, categories in CATEGORICAL_COLUMNS.items():
+        compact[column] = pd.Categorical(df[column], categories=categories)
+    return compact
+
+
+def _save_columns(directory, df):
+    # One .npy per column; categoricals are stored as their integer codes
+    columns = []
+    for i, column in enumerate(df.columns):
+        values = df[column]
+        entry = {'name': column, 'file': f'{i:03d}.npy'}
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            entry['categories'] = list(values.cat.categories)
+            array = values.cat.codes.to_numpy()
+        else:
+            array = values.to_numpy()
+        entry['dtype'] = str(array.dtype)
+        np.save(os.path.join(directory, entry['file']), array)
+        columns.append(entry)
+    return columns
+
+
+def _store_version(base_version, segments):
+    if not segments:
+        return base_version
+    chain = [base_version] + [[segment['name'], segment['n_rows']] for segment in segments]
+    return hashlib.sha256(json.dumps(chain).encode()).hexdigest()[:16]
+
+
+def _write_manifest(store_path, manifest):
+    # Replaced atomically, so readers see either the old or the new segment list
+    tmp_path = os.path.join(store_path, 'manifest.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(store_path, 'manifest.json'))
+
+
+def build_store(csv_path=DEFAULT_CSV_PATH, store_path=None):
+    """
+    Convert the CSV dataset once into a memory-mappable columnar store.
+
+    Every column is written as its own .npy file next to a manifest.json that
+    records dtypes, categories and the signature of the source CSV. Rows get a
+    Student_id (their CSV position) unless the CSV already has one. Segments
+    appended by ingest_records are carried over to the rebuilt store. Callers
+    hold the store lock (see _current_manifest), so only one process rebuilds.
+
+    Args:
+        csv_path: Path to the source CSV file
+        store_path: Target directory (default: <csv name>.store)
+
+    Returns:
+        Path of the written store directory
+    """
+    store_path = store_path or default_store_path(csv_path)
+    signature = _source_signature(csv_path)
+    df = compact_frame(pd.read_csv(csv_path, delimiter=","))
+    if ID_COLUMN not in df.columns:
+        df[ID_COLUMN] = np.arange(len(df), dtype=np.int64)
+
+    parent, name = os.path.split(os.path.abspath(store_path))
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix=name + '.tmp-')
+    columns = _save_columns(tmp_path, df)
+
+    # Keep ingested segments of an older store of the same format. They are
+    # hard-linked, so the live store stays complete until it is replaced.
+    old_manifest = _read_manifest(store_path)
+    segments = []
+    if old_manifest is not None and old_manifest.get('format') == STORE_FORMAT and old_manifest['segments']:
+        segments = old_manifest['segments']
+        shutil.copytree(
+            os.path.join(store_path, SEGMENTS_DIR), os.path.join(tmp_path, SEGMENTS_DIR), copy_function=os.link
+        )
+
+    base_version = hashlib.sha256(
+        json.dumps([STORE_FORMAT, signature], sort_keys=True).encode()
+    ).hexdigest()[:16]
+    ids = [int(df[ID_COLUMN].max()) + 1 if len(df) else 0]
+    ids += [segment['max_id'] + 1 for segment in segments]
+    manifest = {
+        'format': STORE_FORMAT,
+        'base_version': base_version,
+        'version': _store_version(base_version, segments),
+        'source': signature,
+        'n_rows': len(df),
+        'columns': columns,
+        'segments': segments,
+        'next_id': max(ids),
+    }
+    _write_manifest(tmp_path, manifest)
+
+    # Move the old store aside first: a directory can only replace an empty one
+    old_path = None
+    if os.path.exists(store_path):
+        old_path = tempfile.mkdtemp(dir=parent, prefix=name + '.old-')
+        os.replace(store_path, old_path)
+    os.replace(tmp_path, store_path)
+    if old_path is not None:
+        shutil.rmtree(old_path, ignore_errors=True)
+    return store_path
+
+
+@contextlib.contextmanager
+def _store_lock(store_path):
+    # Exclusive across threads and, where fcntl exists, across processes. The
+    # lock file sits next to the store because build_store replaces the directory.
+    with _ingest_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(store_path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _current_manifest(csv_path, store_path, locked=False):
+    """
+    Return the store manifest, rebuilding the store when it is missing or older than the CSV.
+
+    The rebuild runs under the store lock and the manifest is checked again
+    once the lock is held, so processes that all notice a changed CSV
+    rebuild it once, one after the other.
+    """
+    manifest = _read_manifest(store_path)
+    current = manifest is not None and manifest.get('format') == STORE_FORMAT
+    if current and manifest['source'] == _source_signature(csv_path):
+        return manifest
+    if not locked:
+        with _store_lock(store_path):
+            return _current_manifest(csv_path, store_path, locked=True)
+    build_store(csv_path, store_path)
+    return _read_manifest(store_path)
+
+
+def _read_manifest(store_path):
+    try:
+        with open(os.path.join(store_path, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _manifest_mtime(store_path):
+    try:
+        return os.stat(os.path.join(store_path, 'manifest.json')).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _open_columns(directory, entries, categories):
+    columns = {}
+    for entry in entries:
+        array = np.load(os.path.join(directory, entry['file']), mmap_mode='r')
+        if entry['name'] in categories:
+            columns[entry['name']] = pd.Categorical.from_codes(array, categories[entry['name']])
+        else:
+            columns[entry['name']] = array
+    return pd.DataFrame(columns, copy=False)
+
+
+def _categories(manifest):
+    return {entry['name']: entry['categories'] for entry in manifest['columns'] if 'categories' in entry}
+
+
+def _open_segments(store_path, manifest, segments):
+    # Rows of the given segments: the latest record per student, in order of first appearance
+    categories = _categories(manifest)
+    frames = [
+        _open_columns(os.path.join(store_path, SEGMENTS_DIR, segment['name']), segment['columns'], categories)
+        for segment in segments
+    ]
+    delta = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    codes, uniques = pd.factorize(delta[ID_COLUMN])
+    if len(uniques) == len(delta):
+        return delta
+    latest = np.zeros(len(uniques), dtype=np.int64)
+    np.maximum.at(latest, codes, np.arange(len(delta)))
+    return delta.take(latest).reset_index(drop=True)
+
+
+def _same_values(a, b):
+    return np.array_equal(a, b, equal_nan=a.dtype.kind == 'f' and b.dtype.kind == 'f')
+
+
+def _apply_delta(df, delta):
+    """
+    Overlay ``delta`` on ``df``: updated students keep their row, new students are appended.
+
+    Columns the delta does not change are reused as they are, so memory-mapped
+    columns stay memory-mapped. A changed column is copied whole, and
+    appending students changes every column, so that version costs one copy
+    of the frame in memory per process until the next snapshot maps it again
+    (see COMPACT_FRACTION).
+
+    Returns:
+        (new frame, rows of ``df`` that were replaced, row of every delta row in the new frame)
+    """
+    positions = pd.Index(df[ID_COLUMN].to_numpy()).get_indexer(delta[ID_COLUMN].to_numpy())
+    updated = positions >= 0
+    target = positions[updated]
+    appended = not updated.all()
+    rows = positions.copy()
+    rows[~updated] = len(df) + np.arange((~updated).sum())
+
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        categorical = isinstance(values.dtype, pd.CategoricalDtype)
+        current = values.cat.codes.to_numpy() if categorical else values.to_numpy()
+        changes = delta[column].cat.codes.to_numpy() if categorical else delta[column].to_numpy()
+        if not appended and _same_values(current[target], changes[updated]):
+            columns[column] = values.array if categorical else current
+            continue
+        # Segments are downcast on their own, so the merged dtype may be wider
+        merged = np.concatenate([current, changes[~updated]]).astype(np.result_type(current, changes), copy=False)
+        merged[target] = changes[updated]
+        columns[column] = pd.Categorical.from_codes(merged, values.cat.categories) if categorical else merged
+
+    return pd.DataFrame(columns, copy=False), df.iloc[target].reset_index(drop=True), rows
+
+
+def _open_store(store_path, manifest):
+    # The snapshot (if any) already holds the first snapshot['segments'] segments
+    snapshot = manifest.get('snapshot')
+    if snapshot is not None:
+        df = _open_columns(os.path.join(store_path, snapshot['name']), snapshot['columns'], _categories(manifest))
+        pending = manifest['segments'][snapshot['segments']:]
+    else:
+        df = _open_columns(store_path, manifest['columns'], _categories(manifest))
+        pending = manifest['segments']
+    if pending:
+        df, _, _ = _apply_delta(df, _open_segments(store_path, manifest, pending))
+    df.attrs['version'] = manifest['version']
+    return df
+
+
+def _compact_store(store_path, manifest):
+    """
+    Write the current rows (base plus every segment) as a memory-mappable snapshot.
+
+    The segments stay in the store, so build_store can still replay them on a
+    rebuilt base; readers open the snapshot and apply only the newer segments.
+    The data version does not change.
+    """
+    df = _open_store(store_path, manifest)
+    name = f"snapshot-{len(manifest['segments']):06d}"
+    snapshot_path = os.path.join(store_path, name)
+    shutil.rmtree(snapshot_path + '.tmp', ignore_errors=True)
+    os.makedirs(snapshot_path + '.tmp')
+    columns = _save_columns(snapshot_path + '.tmp', df)
+    shutil.rmtree(snapshot_path, ignore_errors=True)
+    os.replace(snapshot_path + '.tmp', snapshot_path)
+
+    previous = manifest.get('snapshot')
+    manifest['snapshot'] = {'name': name, 'segments': len(manifest['segments']), 'n_rows': len(df), 'columns': columns}
+    _write_manifest(store_path, manifest)
+    if previous is not None and previous['name'] != name:
+        # Frames mapped from the old snapshot keep working; the files are only unlinked
+        shutil.rmtree(os.path.join(store_path, previous['name']), ignore_errors=True)
+
+
+@instrument()
+def load_dataset(csv_path=DEFAULT_CSV_PATH, store_path=None):
+    """
+    Return the shared, read-only student dataset.
+
+    The CSV is parsed only when the store is missing or older than the CSV;
+    otherwise the columns are memory-mapped from the store. The frame is
+    cached per process and must not be modified in place. When new segments
+    were ingested since the cached frame was loaded, only those segments are
+    read and applied to it (see dataset_changes). Columns they do not change
+    stay memory-mapped; changed columns, or all of them when students were
+    added, are copied into memory until the next snapshot.
+
+    Args:
+        csv_path: Path to the source CSV file
+        store_path: Columnar store directory (default: <csv name>.store)
+
+    Returns:
+        DataFrame with compact dtypes; ``df.attrs['version']`` identifies the data
+    """
+    store_path = store_path or default_store_path(csv_path)
+    signature = (_source_signature(csv_path), _manifest_mtime(store_path))
+    key = os.path.abspath(store_path)
+
+    cached = _datasets.get(key)
+    if cached is not None and cached['signature'] == signature:
+        return cached['df']
+
+    with _lock:
+        cached = _datasets.get(key)
+        if cached is not None and cached['signature'] == signature:
+            return cached['df']
+        try:
+            return _load_uncached(csv_path, store_path, key, cached)
+        except FileNotFoundError:
+            # Another process replaced the store or a snapshot while it was being opened
+            with _store_lock(store_path):
+                return _load_uncached(csv_path, store_path, key, cached, locked=True)
+
+
+def _load_uncached(csv_path, store_path, key, cached, locked=False):
+    manifest = _current_manifest(csv_path, store_path, locked)
+    previous = cached['manifest'] if cached is not None else None
+    n_known = len(previous['segments']) if previous is not None else 0
+    if (previous is not None and previous['base_version'] == manifest['base_version']
+            and manifest['segments'][:n_known] == previous['segments']
+            and manifest.get('snapshot') == previous.get('snapshot')):
+        if manifest['version'] == previous['version']:
+            df = cached['df']
+        else:
+            # Only the newly appended segments are read
+            delta = _open_segments(store_path, manifest, manifest['segments'][n_known:])
+            df, removed, rows = _apply_delta(cached['df'], delta)
+            df.attrs['version'] = manifest['version']
+            _changes.clear()
+            _changes[manifest['version']] = {
+                'parent': previous['version'], 'added': delta, 'removed': removed, 'rows': rows
+            }
+    else:
+        df = _open_store(store_path, manifest)
+
+    _datasets[key] = {
+        'signature': (manifest['source'], _manifest_mtime(store_path)), 'manifest': manifest, 'df': df
+    }
+    return df
+
+
+def dataset_version(df):
+    """Return the version identifier of a frame returned by load_dataset."""
+    return df.attrs.get('version')
+
+
+def dataset_changes(df):
+    """
+    Return how ``df`` differs from the previously loaded version, if it was loaded incrementally.
+
+    Returns:
+        dict with 'parent' (previous version), 'added' (new or updated rows),
+        'removed' (rows they replaced) and 'rows' (position of each added row
+        in ``df``; updated students keep their position), or None
+    """
+    return _changes.get(df.attrs.get('version'))
+
+
+def ingest_records(records, csv_path=DEFAULT_CSV_PATH, store_path=None):
+    """
+    Append new or updated student records to the store as one segment.
+
+    Records with a Student_id that is already stored replace that student's
+    row; missing columns are then taken from the stored row, so e.g. only the
+    2nd semester columns can be sent. Records without a Student_id are new
+    students and must carry every raw column; one batch may mix both. Ingests
+    into the same store are serialized, so each gets its own segment. The derived columns
+    (Economic_pressure_score, Approval_rate, ...) are computed for these
+    records only. Writing costs time proportional to the number of records,
+    plus an occasional snapshot of the whole store once the segments since the
+    last one exceed COMPACT_FRACTION of the base rows. Loading the new version
+    reads only the new segment but may copy columns (see load_dataset).
+
+    Args:
+        records: DataFrame of raw student columns (optionally with Student_id)
+        csv_path: Path to the source CSV file
+        store_path: Columnar store directory (default: <csv name>.store)
+
+    Returns:
+        dict with 'version', 'segment', 'added' (new students) and 'updated' (records with a Student_id)
+    """
+    store_path = store_path or default_store_path(csv_path)
+    with _store_lock(store_path):
+        return _ingest_locked(records, csv_path, store_path)
+
+
+def _ingest_locked(records, csv_path, store_path):
+    manifest = _current_manifest(csv_path, store_path, locked=True)
+
+    records = records.reset_index(drop=True)
+    if ID_COLUMN not in records.columns:
+        records[ID_COLUMN] = pd.NA
+    given = records[ID_COLUMN].notna().to_numpy()
+    ids = np.empty(len(records), dtype=np.int64)
+    ids[given] = records.loc[given, ID_COLUMN].astype(np.int64).to_numpy()
+    ids[~given] = manifest['next_id'] + np.arange((~given).sum())
+    records[ID_COLUMN] = ids
+
+    stored_columns = [entry['name'] for entry in manifest['columns']]
+    source_columns = [c for c in stored_columns if c not in DERIVED_COLUMNS and c not in ('Course_Name', ID_COLUMN)]
+    for column in source_columns:
+        if column not in records.columns:
+            records[column] = pd.NA
+    present = records[source_columns].notna()
+    complete = present.all(axis=1).to_numpy()
+
+    # Only records without a Student_id must be complete; the others are checked per record below
+    incomplete_new = np.flatnonzero(~given & ~complete)
+    if len(incomplete_new):
+        first = incomplete_new[0]
+        missing = [c for c in source_columns if not present.at[first, c]]
+        raise ValueError(
+            f"New students need every column; {len(incomplete_new)} record(s) without Student_id are incomplete "
+            f"(row {first} misses {missing})"
+        )
+
+    partial = given & ~complete
+    if partial.any():
+        # Fill partial updates from the latest stored row of each student
+        current = load_dataset(csv_path, store_path)
+        current = current[current[ID_COLUMN].isin(ids[partial])].set_index(ID_COLUMN)
+        unknown = np.setdiff1d(ids[partial], current.index.to_numpy())
+        if len(unknown):
+            raise ValueError(f"Partial updates need a stored student; unknown Student_id {unknown[:10].tolist()}")
+        stored = current.loc[ids[partial]]
+        for column in [c for c in source_columns if not present.loc[partial, c].all()]:
+            fill = stored[column].astype(object) if column == 'Status' else stored[column]
+            values = records.loc[partial, column]
+            records.loc[partial, column] = values.where(values.notna(), fill.to_numpy()).to_numpy()
+
+    unknown_courses = set(records['Course'].unique()) - set(COURSE_MAPPING)
+    unknown_status = set(records['Status'].astype(str).unique()) - set(STATUS_CATEGORIES)
+    if unknown_courses or unknown_status:
+        raise ValueError(f"Unknown course codes {sorted(unknown_courses)} or statuses {sorted(unknown_status)}")
+
+    raw = records[source_columns].infer_objects()
+    for entry in manifest['columns']:
+        # Filled integer codes come back as float after a NaN; restore them like the base store
+        column = entry['name']
+        if column in source_columns and 'categories' not in entry and np.dtype(entry['dtype']).kind in 'iu':
+            values = raw[column]
+            if values.dtype.kind == 'f' and (values % 1 == 0).all():
+                raw[column] = values.astype(np.int64)
+    delta = add_derived_features(raw)
+    delta = compact_frame(delta.assign(**{ID_COLUMN: ids}))[stored_columns]
+
+    # Segment files are complete before the manifest points at them
+    name = f"{len(manifest['segments']) + 1:06d}"
+    segment_path = os.path.join(store_path, SEGMENTS_DIR, name)
+    shutil.rmtree(segment_path + '.tmp', ignore_errors=True)
+    os.makedirs(segment_path + '.tmp')
+    columns = _save_columns(segment_path + '.tmp', delta)
+    shutil.rmtree(segment_path, ignore_errors=True)
+    os.replace(segment_path + '.tmp', segment_path)
+
+    manifest['segments'].append({'name': name, 'n_rows': len(delta), 'max_id': int(ids.max()), 'columns': columns})
+    manifest['next_id'] = max(manifest['next_id'], int(ids.max()) + 1)
+    manifest['version'] = _store_version(manifest['base_version'], manifest['segments'])
+    _write_manifest(store_path, manifest)
+
+    snapshot = manifest.get('snapshot')
+    pending = manifest['segments'][snapshot['segments'] if snapshot is not None else 0:]
+    if sum(segment['n_rows'] for segment in pending) > COMPACT_FRACTION * manifest['n_rows']:
+        _compact_store(store_path, manifest)
+    return {'version': manifest['version'], 'segment': name, 'added': int((~given).sum()), 'updated': int(given.sum())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the columnar student store or ingest new records into it.")
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help="Source CSV of the store")
+    parser.add_argument('--store', default=None, help="Store directory (default: <csv name>.store)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('build', help="(Re)build the store from the CSV")
+    ingest = subparsers.add_parser('ingest', help="Append new or updated student records as a segment")
+    ingest.add_argument('records', help="CSV with raw student columns; rows with a Student_id update that student")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        store_path = args.store or default_store_path(args.csv)
+        with _store_lock(store_path):
+            print(f"Store written to {build_store(args.csv, store_path)}")
+    else:
+        start = time.perf_counter()
+        records = pd.read_csv(args.records, float_precision='round_trip')
+        result = ingest_records(records, args.csv, args.store)
+        print(
+            f"Segment {result['segment']}: {result['added']} new, {result['updated']} updated "
+            f"in {time.perf_counter() - start:.2f}s (version {result['version']})"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# Raw student columns the model needs, in canonical order
+RAW_FEATURES = [
+    'Application_mode', 'Debtor', 'Tuition_fees_up_to_date', 'Gender', 'Scholarship_holder',
+    'Age_at_enrollment', 'Previous_qualification_grade', 'Admission_grade', 'Displaced',
+    'Curricular_units_1st_sem_enrolled', 'Curricular_units_1st_sem_approved', 'Curricular_units_1st_sem_grade',
+    'Curricular_units_2nd_sem_enrolled', 'Curricular_units_2nd_sem_approved', 'Curricular_units_2nd_sem_grade'
+]
+
+# Engineered features appended after the raw ones
+DERIVED_FEATURES = ['Total_enrolled_units', 'Total_approved_unit', 'Approval_rate', 'Average_grade']
+
+# Canonical model input order (the order scaller.pkl and rf_model.pkl were fitted on)
+FEATURE_NAMES = RAW_FEATURES + DERIVED_FEATURES
+
+ECONOMIC_FEATURES = ['Unemployment_rate', 'Inflation_rate', 'GDP']
+
+
+def _wide(values):
+    # Sum small integer codes (e.g. int8 from the data store) without overflow
+    values = np.asarray(values)
+    return values.astype(np.int64) if np.issubdtype(values.dtype, np.integer) else values.astype(np.float64)
+
+
+def derive_features(enrolled_1st, enrolled_2nd, approved_1st, approved_2nd, grade_1st, grade_2nd):
+    """
+    Compute the engineered academic features on whole arrays at once.
+
+    Returns:
+        dict of DERIVED_FEATURES name -> array
+    """
+    total_enrolled = _wide(enrolled_1st) + _wide(enrolled_2nd)
+    total_approved = _wide(approved_1st) + _wide(approved_2nd)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        approval_rate = np.where(total_enrolled > 0, (total_approved / total_enrolled) * 100, 0.0)
+    average_grade = (_wide(grade_1st) + _wide(grade_2nd)) / 2
+    return {
+        'Total_enrolled_units': total_enrolled,
+        'Total_approved_unit': total_approved,
+        'Approval_rate': approval_rate,
+        'Average_grade': average_grade,
+    }
+
+
+def add_derived_features(df):
+    """
+    Return a copy of ``df`` with the engineered features added.
+
+    Economic_pressure_score is added as well when the economic indicator
+    columns are present.
+
+    Args:
+        df: DataFrame with the raw student columns
+
+    Returns:
+        New DataFrame with the DERIVED_FEATURES (and Economic_pressure_score) columns
+    """
+    derived = {}
+    if all(column in df.columns for column in ECONOMIC_FEATURES):
+        derived['Economic_pressure_score'] = (
+            _wide(df['Unemployment_rate']) + _wide(df['Inflation_rate']) - _wide(df['GDP'])
+        )
+    derived.update(derive_features(
+        df['Curricular_units_1st_sem_enrolled'], df['Curricular_units_2nd_sem_enrolled'],
+        df['Curricular_units_1st_sem_approved'], df['Curricular_units_2nd_sem_approved'],
+        df['Curricular_units_1st_sem_grade'], df['Curricular_units_2nd_sem_grade']
+    ))
+    return df.assign(**{name: pd.Series(values, index=df.index) for name, values in derived.items()})
+
+
+def build_feature_frame(df):
+    """Return the model input frame (FEATURE_NAMES order) for raw student rows."""
+    missing = [column for column in RAW_FEATURES if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing student columns: {missing}")
+    columns = {name: df[name].to_numpy() for name in RAW_FEATURES}
+    columns.update(derive_features(
+        columns['Curricular_units_1st_sem_enrolled'], columns['Curricular_units_2nd_sem_enrolled'],
+        columns['Curricular_units_1st_sem_approved'], columns['Curricular_units_2nd_sem_approved'],
+        columns['Curricular_units_1st_sem_grade'], columns['Curricular_units_2nd_sem_grade']
+    ))
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def build_feature_block(block):
+    """
+    Return the model input matrix for a NumPy block of raw features.
+
+    Args:
+        block: Array of shape (n_rows, len(RAW_FEATURES)) in RAW_FEATURES order
+
+    Returns:
+        float64 array of shape (n_rows, len(FEATURE_NAMES))
+    """
+    block = np.asarray(block, dtype=np.float64)
+    if block.ndim != 2 or block.shape[1] != len(RAW_FEATURES):
+        raise ValueError(f"Expected a block with {len(RAW_FEATURES)} columns, got shape {block.shape}")
+    column = {name: block[:, i] for i, name in enumerate(RAW_FEATURES)}
+    derived = derive_features(
+        column['Curricular_units_1st_sem_enrolled'], column['Curricular_units_2nd_sem_enrolled'],
+        column['Curricular_units_1st_sem_approved'], column['Curricular_units_2nd_sem_approved'],
+        column['Curricular_units_1st_sem_grade'], column['Curricular_units_2nd_sem_grade']
+    )
+    return np.column_stack([block] + [derived[name] for name in DERIVED_FEATURES])
+
+
+def check_feature_names(fitted):
+    """
+    Raise ValueError if a fitted scaler/model expects a different feature order.
+
+    Args:
+        fitted: Estimator with a feature_names_in_ attribute (or a list of names)
+    """
+    names = getattr(fitted, 'feature_names_in_', fitted)
+    if names is None:
+        return
+    names = list(names)
+    if names != FEATURE_NAMES:
+        raise ValueError(
+            "Feature order mismatch between the artifact and helper.features.FEATURE_NAMES: "
+            f"{names} != {FEATURE_NAMES}"
+        )
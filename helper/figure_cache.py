@@ -0,0 +1,69 @@
+import json
+import threading
+from collections import OrderedDict
+
+# Maximum number of serialized figures kept per process
+MAX_FIGURES = 256
+
+# Shared by every session in this process; values are figure JSON strings so
+# no session can mutate another session's figure.
+_figures = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+_lock = threading.Lock()
+
+
+def _as_chart(figure_json):
+    figure = json.loads(figure_json)
+    if not figure.get('data'):
+        # st.plotly_chart rejects figure dicts without traces (e.g. a filter
+        # that matches no students), but accepts an empty Figure object
+        import plotly.graph_objects as go
+        return go.Figure(figure)
+    return figure
+
+
+def cached_figure(chart_id, key, build, max_figures=MAX_FIGURES):
+    """
+    Return a chart as a Plotly figure dict, building it only on a cache miss.
+
+    Args:
+        chart_id: Name of the chart (e.g. 'status_distribution')
+        key: Hashable filter state, e.g. (dataset version, course, gender, age range)
+        build: Callable returning a plotly Figure; only called on a miss
+        max_figures: LRU capacity
+
+    Returns:
+        dict that can be passed to st.plotly_chart (a Figure when it has no traces)
+    """
+    cache_key = (chart_id,) + tuple(key)
+    with _lock:
+        figure_json = _figures.get(cache_key)
+        if figure_json is not None:
+            _figures.move_to_end(cache_key)
+            _stats['hits'] += 1
+            return _as_chart(figure_json)
+        _stats['misses'] += 1
+
+    figure_json = build().to_json()
+
+    with _lock:
+        _figures[cache_key] = figure_json
+        _figures.move_to_end(cache_key)
+        while len(_figures) > max_figures:
+            _figures.popitem(last=False)
+            _stats['evictions'] += 1
+    return _as_chart(figure_json)
+
+
+def figure_cache_stats():
+    """Return hit/miss/eviction counters and the current number of cached figures."""
+    with _lock:
+        return dict(_stats, size=len(_figures), bytes=sum(len(v) for v in _figures.values()))
+
+
+def clear_figure_cache():
+    """Drop all cached figures and reset the counters."""
+    with _lock:
+        _figures.clear()
+        for name in _stats:
+            _stats[name] = 0
@@ -0,0 +1,408 @@
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Batches of at least this many rows are traversed by scikit-learn's compiled
+# tree code (see CompiledForest._native_trees); smaller ones stay in NumPy,
+# which has no per-tree call overhead
+NATIVE_MIN_ROWS = 128
+
+_compiled = {}
+_lock = threading.Lock()
+_native_lock = threading.Lock()
+
+
+def _float64_to_key(x):
+    # Map float64 values to int64 keys with the same ordering
+    bits = np.asarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits >= 0, bits, np.int64(-0x8000000000000000) - bits)
+
+
+def _key_to_float64(key):
+    bits = np.where(key >= 0, key, np.int64(-0x8000000000000000) - key)
+    return bits.astype(np.int64).view(np.float64)
+
+
+def _fold_thresholds(threshold, mean, scale):
+    """
+    Convert thresholds on scaled features into thresholds on raw features.
+
+    sklearn compares float32((x - mean) / scale) <= threshold. That expression
+    is monotonic in x, so the largest float64 x that passes is found by
+    bisection over the ordered float64 bit patterns. Comparing raw x against it
+    then gives exactly the same decision as the scaler + tree path.
+    """
+    def passes(key):
+        with np.errstate(over='ignore', invalid='ignore'):
+            scaled = ((_key_to_float64(key) - mean) / scale).astype(np.float32)
+        return scaled.astype(np.float64) <= threshold
+
+    lo = np.full(threshold.shape, _float64_to_key(-np.inf), dtype=np.int64)
+    hi = np.full(threshold.shape, _float64_to_key(np.inf), dtype=np.int64)
+    all_pass = passes(hi)
+
+    # 64 halvings cover the whole int64 key range
+    for _ in range(64):
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        ok = passes(mid)
+        lo = np.where(ok, mid, lo)
+        hi = np.where(ok, hi, mid)
+
+    return np.where(all_pass, np.inf, _key_to_float64(lo))
+
+
+class CompiledForest:
+    """
+    Random Forest flattened into NumPy node arrays with the scaler folded in.
+
+    All trees share one set of node arrays; ``roots`` holds the index of each
+    tree's root and leaves point to themselves. ``value`` holds the class
+    distribution of every node exactly as sklearn's predict_proba uses it.
+    """
+
+    def __init__(self, feature_names, classes, roots, feature, threshold, left, right, value, max_depth,
+                 children=None, is_leaf=None):
+        self.feature_names = list(feature_names)
+        self.classes = np.asarray(classes)
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.max_depth = int(max_depth)
+
+        # Traversal helpers: children[2 * node + went_left]. Passed in when the
+        # arrays come from a memory-mapped bundle so they are not rebuilt.
+        self.children = np.stack([right, left], axis=1).ravel() if children is None else children
+        self.is_leaf = left == np.arange(len(left)) if is_leaf is None else is_leaf
+        self._native = None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _as_matrix(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names]
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected {len(self.feature_names)} features, got {X.shape[1]}")
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinite values")
+        return X
+
+    def apply(self, X):
+        """Return the leaf index reached in every tree, shape (n_rows, n_trees)."""
+        return self._leaves_by_tree(self._as_matrix(X)).T
+
+    def _native_trees(self):
+        """
+        Return the forest as scikit-learn Tree objects over rank-encoded features.
+
+        sklearn compares float32 features, which cannot represent the folded
+        raw thresholds. Each feature value is therefore replaced by the number
+        of distinct thresholds of that feature below it, and threshold j of
+        that feature by j + 0.5. Both are small integers, exact in float32,
+        and x <= threshold holds exactly when rank(x) <= j, so the leaves are
+        the same. Built on the first large batch; the node arrays are copied
+        (not memory-mapped) into the trees.
+
+        Returns:
+            (edges, trees) with the sorted thresholds per feature, or None
+            when scikit-learn is not available
+        """
+        if self._native is not None:
+            return self._native or None
+        with _native_lock:
+            if self._native is None:
+                self._native = self._build_native_trees()
+        return self._native or None
+
+    def _build_native_trees(self):
+        try:
+            from sklearn.tree._tree import NODE_DTYPE, Tree
+        except ImportError:
+            return ()
+
+        n_features = len(self.feature_names)
+        internal = ~self.is_leaf
+        edges = [np.unique(self.threshold[internal & (self.feature == j)]) for j in range(n_features)]
+        rank_threshold = np.full(len(self.feature), -2.0)
+        for j in range(n_features):
+            split = internal & (self.feature == j)
+            rank_threshold[split] = np.searchsorted(edges[j], self.threshold[split]) + 0.5
+
+        n_classes = np.array([self.value.shape[1]], dtype=np.intp)
+        ends = np.append(self.roots[1:], len(self.feature))
+        trees = []
+        try:
+            for root, end in zip(self.roots, ends):
+                ids = slice(root, end)
+                leaf = self.is_leaf[ids]
+                nodes = np.zeros(end - root, dtype=NODE_DTYPE)
+                nodes['left_child'] = np.where(leaf, -1, self.left[ids] - root)
+                nodes['right_child'] = np.where(leaf, -1, self.right[ids] - root)
+                nodes['feature'] = np.where(leaf, -2, self.feature[ids])
+                nodes['threshold'] = rank_threshold[ids]
+                nodes['n_node_samples'] = 1
+                nodes['weighted_n_node_samples'] = 1.0
+                tree = Tree(n_features, n_classes, 1)
+                tree.__setstate__({
+                    'max_depth': self.max_depth,
+                    'node_count': len(nodes),
+                    'nodes': nodes,
+                    'values': np.ascontiguousarray(self.value[ids], dtype=np.float64)[:, None, :],
+                })
+                trees.append(tree)
+        except (KeyError, TypeError, ValueError) as e:
+            # Private scikit-learn layout changed; the NumPy traversal still works
+            warnings.warn(f"Falling back to the NumPy forest traversal: {type(e).__name__}: {e}")
+            return ()
+        return edges, trees
+
+    def _leaves_by_tree(self, X, block_size=2048):
+        native = self._native_trees() if len(X) >= NATIVE_MIN_ROWS else None
+        if native is not None:
+            edges, trees = native
+            ranks = np.empty(X.shape, dtype=np.float32)
+            for j, feature_edges in enumerate(edges):
+                ranks[:, j] = np.searchsorted(feature_edges, X[:, j])
+            leaves = np.empty((self.n_trees, len(X)), dtype=np.intp)
+            for i, (root, tree) in enumerate(zip(self.roots, trees)):
+                leaves[i] = tree.apply(ranks)
+                leaves[i] += root
+            return leaves
+
+        leaves = np.empty((self.n_trees, len(X)), dtype=np.intp)
+        # Row blocks keep the per-path work arrays cache-sized
+        for start in range(0, len(X), block_size):
+            block = X[start:start + block_size]
+            leaves[:, start:start + len(block)] = self._apply_block(block)
+        return leaves
+
+    def _apply_block(self, X, steps_per_compaction=4):
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+
+        # One entry per (tree, row) path, grouped by tree so node lookups stay
+        # local. Leaves point to themselves, so a few extra steps are harmless
+        # and finished paths are only dropped every few steps.
+        nodes = np.repeat(self.roots, n_rows)
+        current = nodes.copy()
+        row_offset = np.tile(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        active = np.arange(len(nodes))
+        while active.size:
+            for _ in range(steps_per_compaction):
+                go_left = flat_X[row_offset + self.feature[current]] <= self.threshold[current]
+                current = self.children[2 * current + go_left]
+            nodes[active] = current
+            keep = ~self.is_leaf[current]
+            active, current, row_offset = active[keep], current[keep], row_offset[keep]
+        return nodes.reshape(self.n_trees, n_rows)
+
+    def predict_with_proba(self, X):
+        """
+        Return (labels, probabilities) from a single traversal.
+
+        Probabilities are accumulated tree by tree in the same order as
+        sklearn's RandomForestClassifier, so both outputs match it exactly.
+        """
+        leaves = self._leaves_by_tree(self._as_matrix(X))
+        # Same running sum over trees as sklearn, so rounding matches too
+        proba = np.zeros((leaves.shape[1], self.value.shape[1]))
+        tree_proba = np.empty(proba.shape, dtype=self.value.dtype)
+        for tree_leaves in leaves:
+            proba += np.take(self.value, tree_leaves, axis=0, out=tree_proba)
+        proba /= self.n_trees
+        return self.classes.take(np.argmax(proba, axis=1), axis=0), proba
+
+    def contributions(self, X, block_size=2048):
+        """
+        Decision-path (Saabas) attribution of every prediction to the features.
+
+        Each split moves a path from one node's class distribution to its
+        child's; that change is credited to the split feature. Per row,
+        ``bias + contributions.sum(axis=1)`` equals predict_proba.
+
+        Returns:
+            (bias, contributions) with shapes (n_classes,) and (n_rows, n_features, n_classes)
+        """
+        X = self._as_matrix(X)
+        n_rows, n_features = X.shape
+        n_classes = self.value.shape[1]
+        bias = self.value[self.roots].mean(axis=0)
+        contributions = np.zeros((n_rows, n_features, n_classes))
+        for start in range(0, n_rows, block_size):
+            block = X[start:start + block_size]
+            contributions[start:start + len(block)] = self._contribution_block(block)
+        contributions /= self.n_trees
+        return bias, contributions
+
+    def _contribution_block(self, X):
+        n_rows, n_features = X.shape
+        n_classes = self.value.shape[1]
+        flat_X = X.ravel()
+        totals = np.zeros((n_classes, n_rows * n_features))
+
+        current = np.repeat(self.roots, n_rows)
+        rows = np.tile(np.arange(n_rows, dtype=np.intp), self.n_trees)
+        keep = ~self.is_leaf[current]
+        current, rows = current[keep], rows[keep]
+        while current.size:
+            feature = self.feature[current]
+            go_left = flat_X[rows * n_features + feature] <= self.threshold[current]
+            child = self.children[2 * current + go_left]
+            delta = self.value[child] - self.value[current]
+            slot = rows * n_features + feature
+            for c in range(n_classes):
+                totals[c] += np.bincount(slot, weights=delta[:, c], minlength=n_rows * n_features)
+            keep = ~self.is_leaf[child]
+            current, rows = child[keep], rows[keep]
+        return totals.T.reshape(n_rows, n_features, n_classes)
+
+    def predict_proba(self, X):
+        return self.predict_with_proba(X)[1]
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+
+def compile_forest(model, scaller=None, feature_names=None):
+    """
+    Export a fitted RandomForestClassifier (or ExtraTreesClassifier) into a CompiledForest.
+
+    Args:
+        model: Fitted single-output forest classifier (see is_compilable)
+        scaller: Fitted StandardScaler applied before the model, or None
+        feature_names: Raw feature order (default: the scaler's or model's feature_names_in_)
+
+    Returns:
+        CompiledForest that scores raw (unscaled) features directly
+    """
+    if not is_compilable(model):
+        raise ValueError(
+            f"Only fitted RandomForestClassifier / ExtraTreesClassifier can be compiled, got {type(model).__name__}"
+        )
+    if getattr(model, 'n_outputs_', 1) != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+    # Imported here: serving a bundle never needs scikit-learn. Trees store
+    # class fractions in tree_.value since scikit-learn 1.4, before that they
+    # stored weighted counts that predict_proba normalized per call.
+    import sklearn
+    stores_fractions = tuple(int(v) for v in sklearn.__version__.split('.')[:2]) >= (1, 4)
+
+    if feature_names is None:
+        source = scaller if scaller is not None else model
+        feature_names = list(getattr(source, 'feature_names_in_', range(model.n_features_in_)))
+
+    n_features = len(feature_names)
+    mean = getattr(scaller, 'mean_', None)
+    scale = getattr(scaller, 'scale_', None)
+    mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+
+    roots, features, thresholds, lefts, rights, values = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        node_ids = np.arange(tree.node_count, dtype=np.intp)
+
+        feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+        threshold = np.where(is_leaf, np.inf, tree.threshold)
+        internal = ~is_leaf
+        threshold[internal] = _fold_thresholds(threshold[internal], mean[feature[internal]], scale[feature[internal]])
+
+        value = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+        if not stores_fractions:
+            normalizer = value.sum(axis=1)[:, None]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+        roots.append(offset)
+        features.append(feature)
+        thresholds.append(threshold)
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        values.append(value)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return CompiledForest(
+        feature_names=feature_names,
+        classes=model.classes_,
+        roots=np.asarray(roots, dtype=np.intp),
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        value=np.concatenate(values),
+        max_depth=max_depth,
+    )
+
+
+def float32_forest(forest):
+    """
+    Return a copy of ``forest`` with float32 thresholds/values and int32 node indices.
+
+    Thresholds are rounded down to the next float32, so a raw value only
+    changes branch when it falls between the float32 and float64 threshold.
+    This roughly halves the bundle size; agreement with the float64 forest
+    should be checked on real data (see helper.compaction).
+    """
+    threshold = forest.threshold.astype(np.float32)
+    too_high = threshold.astype(np.float64) > forest.threshold
+    threshold[too_high] = np.nextafter(threshold[too_high], np.float32(-np.inf))
+    return CompiledForest(
+        feature_names=forest.feature_names,
+        classes=forest.classes,
+        roots=forest.roots.astype(np.int32),
+        feature=forest.feature.astype(np.int32),
+        threshold=threshold,
+        left=forest.left.astype(np.int32),
+        right=forest.right.astype(np.int32),
+        value=forest.value.astype(np.float32),
+        max_depth=forest.max_depth,
+    )
+
+
+def get_compiled_forest(model, scaller=None):
+    """Return the CompiledForest of (model, scaller), compiled once per object pair."""
+    key = (id(model), id(scaller))
+    entry = _compiled.get(key)
+    if entry is None:
+        with _lock:
+            entry = _compiled.get(key)
+            if entry is None:
+                # Keep references so the ids stay valid; old pairs are dropped on reload
+                entry = (model, scaller, compile_forest(model, scaller))
+                _compiled.clear()
+                _compiled[key] = entry
+    return entry[2]
+
+
+def is_compilable(model):
+    """
+    Return True if ``model`` is a fitted forest that compile_forest scores exactly.
+
+    Only RandomForestClassifier and ExtraTreesClassifier qualify: their
+    predict_proba is the plain mean of the trees' class distributions over
+    all features. Other tree ensembles (AdaBoost's weighted votes, Bagging's
+    feature subsets, boosting) would be scored wrongly.
+    """
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+    estimators = getattr(model, 'estimators_', None)
+    return (
+        isinstance(model, (RandomForestClassifier, ExtraTreesClassifier))
+        and isinstance(estimators, list)
+        and len(estimators) > 0
+        and all(hasattr(e, 'tree_') for e in estimators)
+    )
@@ -0,0 +1,267 @@
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import warnings
+from bisect import bisect_left
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Environment switches (all off by default)
+ENV_ENABLED = 'STUDENT_METRICS'            # "1" turns stage timing on
+ENV_PORT = 'STUDENT_METRICS_PORT'          # serve /metrics (Prometheus text) on this port
+ENV_JSON_LOG = 'STUDENT_METRICS_LOG'       # append a JSON snapshot to this file periodically
+ENV_JSON_INTERVAL = 'STUDENT_METRICS_LOG_INTERVAL'
+ENV_PROFILE = 'STUDENT_PROFILE'            # "1" allows ?profile=... (also allowed with STUDENT_METRICS)
+ENV_PROFILE_DIR = 'STUDENT_PROFILE_DIR'
+
+# Histogram bucket upper bounds in seconds (Prometheus style, +Inf is implicit)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = os.environ.get(ENV_ENABLED, '').lower() not in ('', '0', 'false', 'no')
+_stages = {}
+_lock = threading.Lock()
+_exporters = {}
+
+
+def metrics_enabled():
+    return _enabled
+
+
+def set_enabled(enabled=True):
+    """Turn stage timing on or off for this process."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def record(stage, seconds):
+    """Add one observation (in seconds) to the histogram of ``stage``."""
+    with _lock:
+        entry = _stages.get(stage)
+        if entry is None:
+            entry = _stages[stage] = {'buckets': [0] * (len(BUCKETS) + 1), 'count': 0, 'sum': 0.0, 'max': 0.0}
+        entry['buckets'][bisect_left(BUCKETS, seconds)] += 1
+        entry['count'] += 1
+        entry['sum'] += seconds
+        entry['max'] = max(entry['max'], seconds)
+
+
+class _Timer:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(stage):
+    """
+    Context manager that records the duration of its block under ``stage``.
+
+    When instrumentation is disabled this returns a shared no-op object.
+    """
+    return _Timer(stage) if _enabled else _NULL_TIMER
+
+
+def instrument(stage=None):
+    """
+    Decorator that records every call of the function under ``stage``
+    (default: the function name). Disabled calls go straight through.
+    """
+    def decorate(fn):
+        name = stage or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def stage_metrics():
+    """
+    Return the per-stage histograms.
+
+    Returns:
+        dict of stage -> {'count', 'sum', 'mean', 'max', 'buckets'} where buckets maps
+        each upper bound (and '+Inf') to the non-cumulative number of observations
+    """
+    with _lock:
+        stages = {name: dict(entry, buckets=list(entry['buckets'])) for name, entry in _stages.items()}
+    labels = [str(bound) for bound in BUCKETS] + ['+Inf']
+    return {
+        name: {
+            'count': entry['count'],
+            'sum': entry['sum'],
+            'mean': entry['sum'] / entry['count'] if entry['count'] else 0.0,
+            'max': entry['max'],
+            'buckets': dict(zip(labels, entry['buckets'])),
+        }
+        for name, entry in sorted(stages.items())
+    }
+
+
+def reset_metrics():
+    with _lock:
+        _stages.clear()
+
+
+def prometheus_text(metric='student_app_stage_seconds'):
+    """Render the stage histograms in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {metric} Time spent per app stage.",
+        f"# TYPE {metric} histogram",
+    ]
+    for name, entry in stage_metrics().items():
+        cumulative = 0
+        for bound, count in entry['buckets'].items():
+            cumulative += count
+            lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{stage="{name}"}} {entry["sum"]}')
+        lines.append(f'{metric}_count{{stage="{name}"}} {entry["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] == '/metrics':
+            body, content_type = prometheus_text().encode(), 'text/plain; version=0.0.4'
+        elif self.path.split('?')[0] == '/metrics.json':
+            body, content_type = json.dumps(stage_metrics()).encode(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port, host='0.0.0.0'):
+    """Serve GET /metrics (Prometheus) and /metrics.json from a daemon thread, once per process."""
+    with _lock:
+        if 'server' in _exporters:
+            return _exporters['server']
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+        _exporters['server'] = server
+        return server
+
+
+def start_json_logger(path, interval=60.0):
+    """Append a JSON line with all stage metrics to ``path`` every ``interval`` seconds, once per process."""
+    def run():
+        while True:
+            time.sleep(interval)
+            line = {'time': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'stages': stage_metrics()}
+            with open(path, 'a') as f:
+                f.write(json.dumps(line) + '\n')
+
+    with _lock:
+        if 'json_logger' not in _exporters:
+            thread = threading.Thread(target=run, name='metrics-json-log', daemon=True)
+            thread.start()
+            _exporters['json_logger'] = thread
+
+
+def start_exporters_from_env():
+    """Start the exporters configured through STUDENT_METRICS_PORT / STUDENT_METRICS_LOG (if enabled)."""
+    if not _enabled:
+        return
+    port = os.environ.get(ENV_PORT)
+    if port:
+        start_metrics_server(int(port))
+    log_path = os.environ.get(ENV_JSON_LOG)
+    if log_path:
+        start_json_logger(log_path, float(os.environ.get(ENV_JSON_INTERVAL, 60)))
+
+
+def profiling_allowed():
+    """Return whether on-demand profiles may be taken (STUDENT_METRICS or STUDENT_PROFILE is set)."""
+    return _enabled or os.environ.get(ENV_PROFILE, '').lower() not in ('', '0', 'false', 'no')
+
+
+def start_profile(mode='cprofile'):
+    """
+    Start profiling one rerun.
+
+    An unknown mode, or pyinstrument when it is not installed, only emits a
+    warning: the mode usually comes from a URL parameter and must not break
+    the page.
+
+    Args:
+        mode: 'cprofile' (standard library) or 'pyinstrument' (optional dependency)
+
+    Returns:
+        Handle for stop_profile, or None when no profile was started
+    """
+    if mode == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            warnings.warn("Profiling with pyinstrument requires: pip install pyinstrument")
+            return None
+        profiler = Profiler()
+        profiler.start()
+    elif mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        warnings.warn(f"Unknown profile mode: {mode}")
+        return None
+    return mode, profiler
+
+
+def stop_profile(handle, output_dir=None):
+    """
+    Stop a profile started with start_profile and write it to ``output_dir``.
+
+    Returns:
+        Path of the written .prof (cProfile, open with snakeviz/pstats) or .html (pyinstrument) file
+    """
+    mode, profiler = handle
+    output_dir = output_dir or os.environ.get(ENV_PROFILE_DIR, 'profiles')
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    if mode == 'pyinstrument':
+        profiler.stop()
+        path = os.path.join(output_dir, f'rerun-{stamp}.html')
+        with open(path, 'w') as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = os.path.join(output_dir, f'rerun-{stamp}.prof')
+        profiler.dump_stats(path)
+    return path
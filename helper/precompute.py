@@ -0,0 +1,212 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .batch_scoring import score_frame
+from .data_store import ID_COLUMN
+from .features import FEATURE_NAMES, build_feature_frame
+from .instrumentation import instrument, timed
+from .risk_index import _model_key
+
+# PSI levels: below the first value the feature is stable, above the second it drifted
+PSI_THRESHOLDS = (0.1, 0.25)
+
+# Quantile bins of the training distribution used for PSI
+DRIFT_BINS = 10
+
+# One background worker: jobs are cheap to queue and obsolete ones are skipped
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='precompute')
+_state = {'requested': None, 'running': None, 'latest': None, 'error': None}
+_lock = threading.Lock()
+
+
+def _psi(actual, expected, epsilon=1e-4):
+    actual = np.maximum(actual, epsilon)
+    expected = np.maximum(expected, epsilon)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def _bin_shares(values, edges):
+    return np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1) / len(values)
+
+
+def build_drift_reference(features, n_bins=DRIFT_BINS):
+    """
+    Snapshot the per-feature distribution of the training data.
+
+    Bin edges are the training quantiles, deduplicated, so discrete features
+    (codes, 0/1 flags, unit counts) get one bin per value range instead of
+    empty bins. The result is plain JSON; helper.training stores it in the
+    model bundle header.
+
+    Args:
+        features: Training frame (FEATURE_NAMES columns, raw values)
+        n_bins: Maximum bins per feature
+
+    Returns:
+        dict {feature: {'edges', 'shares', 'mean', 'std'}}
+    """
+    reference = {}
+    probabilities = np.arange(1, n_bins) / n_bins
+    for name in FEATURE_NAMES:
+        values = features[name].to_numpy(dtype=np.float64)
+        edges = np.unique(np.quantile(values, probabilities))
+        reference[name] = {
+            'edges': edges.tolist(),
+            'shares': _bin_shares(values, edges).tolist(),
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+        }
+    return reference
+
+
+def feature_drift(features, reference):
+    """
+    Compare every model feature with the training distribution.
+
+    PSI (population stability index) over the training bins is the drift
+    score; the mean shift is reported in training standard deviations.
+
+    Args:
+        features: Model input frame (FEATURE_NAMES columns, raw values)
+        reference: Result of build_drift_reference (e.g. ModelBundle.drift_reference)
+
+    Returns:
+        DataFrame indexed by feature with train_mean, mean, mean_shift, psi
+        and level ('stabil' / 'sedang' / 'signifikan')
+    """
+    rows = []
+    for name in FEATURE_NAMES:
+        values = features[name].to_numpy(dtype=np.float64)
+        entry = reference[name]
+        psi = _psi(_bin_shares(values, np.asarray(entry['edges'])), np.asarray(entry['shares']))
+        rows.append({
+            'feature': name,
+            'train_mean': entry['mean'],
+            'mean': float(values.mean()),
+            'mean_shift': (values.mean() - entry['mean']) / entry['std'] if entry['std'] else 0.0,
+            'psi': psi,
+            'level': 'stabil' if psi < PSI_THRESHOLDS[0] else 'sedang' if psi < PSI_THRESHOLDS[1] else 'signifikan',
+        })
+    return pd.DataFrame(rows).set_index('feature')
+
+
+@instrument()
+def run_precompute(df, model, scaller=None, class_names=None, dropout_label='Dropout', reference=None):
+    """
+    Score every student and measure feature drift, synchronously.
+
+    Args:
+        df: Student dataset (from load_dataset)
+        model: ModelBundle, CompiledForest or fitted classifier
+        scaller: Fitted scaler (unused for bundles)
+        class_names: Class names for plain sklearn models
+        dropout_label: Name of the Dropout class
+        reference: Training distribution (build_drift_reference); defaults to
+            the one stored in the bundle
+
+    Returns:
+        dict with 'version', 'model', 'scores' (one row per df row, same order:
+        Student_id, Predicted_Status, Dropout_probability), 'drift' (see
+        feature_drift, None without a training reference), 'seconds' and 'finished_at'
+    """
+    start = time.perf_counter()
+    with timed('precompute.score'):
+        scored = score_frame(df, model, scaller, class_names)
+    scores = pd.DataFrame({
+        ID_COLUMN: df[ID_COLUMN].to_numpy() if ID_COLUMN in df.columns else np.arange(len(df)),
+        'Predicted_Status': scored['Predicted_Status'].astype(str).to_numpy(),
+        'Dropout_probability': scored[f'Prob_{dropout_label}'].to_numpy(),
+    })
+
+    drift = None
+    reference = reference if reference is not None else getattr(model, 'drift_reference', None)
+    if reference is not None:
+        with timed('precompute.drift'):
+            drift = feature_drift(build_feature_frame(df), reference)
+
+    return {
+        'version': df.attrs.get('version'),
+        'model': _model_key(model),
+        'scores': scores,
+        'drift': drift,
+        'seconds': time.perf_counter() - start,
+        'finished_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def is_precompute_current(result, df, model):
+    """Return whether a precompute result belongs to this dataset version and model."""
+    return result is not None and result['version'] == df.attrs.get('version') and result['model'] == _model_key(model)
+
+
+def _job(key, df, model, scaller, class_names, dropout_label):
+    with _lock:
+        if _state['requested'] != key:
+            # A newer dataset or model was requested while this job waited
+            return
+        _state['running'] = key
+    try:
+        result = run_precompute(df, model, scaller, class_names, dropout_label)
+    except Exception as e:
+        with _lock:
+            _state['running'] = None
+            _state['error'] = f"{type(e).__name__}: {e}"
+            # Let the next request retry this key
+            if _state['requested'] == key:
+                _state['requested'] = None
+        raise
+    with _lock:
+        _state['running'] = None
+        _state['latest'] = result
+        _state['error'] = None
+
+
+def request_precompute(df, model, scaller=None, class_names=None, dropout_label='Dropout'):
+    """
+    Start the background precompute for (dataset version, model) unless it already ran or is queued.
+
+    Never blocks: the work runs on a background thread.
+
+    Returns:
+        True when a new job was queued
+    """
+    key = (df.attrs.get('version'), _model_key(model))
+    with _lock:
+        latest = _state['latest']
+        if _state['requested'] == key or (latest is not None and (latest['version'], latest['model']) == key):
+            return False
+        _state['requested'] = key
+    _executor.submit(_job, key, df, model, scaller, class_names, dropout_label)
+    return True
+
+
+def get_precompute(df, model, scaller=None, class_names=None, dropout_label='Dropout'):
+    """
+    Return the latest finished precompute result and refresh it in the background if needed.
+
+    The result may belong to an older dataset version or model while the new
+    one is still being computed; check is_precompute_current before aligning
+    ``result['scores']`` with ``df``.
+
+    Returns:
+        Result dict of run_precompute, or None before the first job finished
+    """
+    request_precompute(df, model, scaller, class_names, dropout_label)
+    with _lock:
+        return _state['latest']
+
+
+def precompute_status():
+    """Return whether a job is running, the key of the last finished result and the last error."""
+    with _lock:
+        latest = _state['latest']
+        return {
+            'running': _state['running'] is not None,
+            'latest': None if latest is None else (latest['version'], latest['model']),
+            'error': _state['error'],
+        }
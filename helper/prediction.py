@@ -1,12 +1,16 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import joblib
 import plotly.express as px
 import plotly.graph_objects as go
 import os
 
+from .features import build_feature_frame
+from .forest import CompiledForest, get_compiled_forest, is_compilable
+from .instrumentation import instrument, timed
+
 # Fungsi untuk prediksi input user
+@instrument()
 def user_input_features():
     st.markdown("### 📋 Data Mahasiswa")
     
@@ -67,63 +71,136 @@ def user_input_features():
         Scholarship_holder = st.radio('Penerima Beasiswa?', ['Ya', 'Tidak'])
         Scholarship_holder = 1 if Scholarship_holder == 'Ya' else 0
     
-    # Hitung variabel turunan secara otomatis
-    Total_enrolled_units = Curricular_units_1st_sem_enrolled + Curricular_units_2nd_sem_enrolled
-    Total_approved_unit = Curricular_units_1st_sem_approved + Curricular_units_2nd_sem_approved
-    Approval_rate = (Total_approved_unit / Total_enrolled_units * 100) if Total_enrolled_units > 0 else 0
-    Average_grade = (Curricular_units_1st_sem_grade + Curricular_units_2nd_sem_grade) / 2
-
-    # Create a DataFrame with feature names to avoid RandomForest feature names error
-    feature_names = [
-        'Application_mode', 'Debtor', 'Tuition_fees_up_to_date', 'Gender', 'Scholarship_holder', 
-        'Age_at_enrollment', 'Previous_qualification_grade', 'Admission_grade', 'Displaced',
-        'Curricular_units_1st_sem_enrolled', 'Curricular_units_1st_sem_approved', 'Curricular_units_1st_sem_grade',
-        'Curricular_units_2nd_sem_enrolled', 'Curricular_units_2nd_sem_approved', 'Curricular_units_2nd_sem_grade', 
-        'Total_enrolled_units', 'Total_approved_unit', 'Approval_rate', 'Average_grade'
-    ]
-    
-    input_values = [[
-        Application_mode, Debtor, Tuition_fees_up_to_date, Gender, Scholarship_holder,
-        Age_at_enrollment, Previous_qualification_grade, Admission_grade, Displaced,
-        Curricular_units_1st_sem_enrolled, Curricular_units_1st_sem_approved, Curricular_units_1st_sem_grade,
-        Curricular_units_2nd_sem_enrolled, Curricular_units_2nd_sem_approved, Curricular_units_2nd_sem_grade,
-        Total_enrolled_units, Total_approved_unit, Approval_rate, Average_grade
-    ]]
+    # Kumpulkan input mentah, variabel turunan dihitung oleh helper.features
+    raw_input = pd.DataFrame([{
+        'Application_mode': Application_mode, 'Debtor': Debtor,
+        'Tuition_fees_up_to_date': Tuition_fees_up_to_date, 'Gender': Gender,
+        'Scholarship_holder': Scholarship_holder, 'Age_at_enrollment': Age_at_enrollment,
+        'Previous_qualification_grade': Previous_qualification_grade, 'Admission_grade': Admission_grade,
+        'Displaced': Displaced,
+        'Curricular_units_1st_sem_enrolled': Curricular_units_1st_sem_enrolled,
+        'Curricular_units_1st_sem_approved': Curricular_units_1st_sem_approved,
+        'Curricular_units_1st_sem_grade': Curricular_units_1st_sem_grade,
+        'Curricular_units_2nd_sem_enrolled': Curricular_units_2nd_sem_enrolled,
+        'Curricular_units_2nd_sem_approved': Curricular_units_2nd_sem_approved,
+        'Curricular_units_2nd_sem_grade': Curricular_units_2nd_sem_grade
+    }])
     
-    features = pd.DataFrame(input_values, columns=feature_names)
+    # DataFrame in the canonical feature order to avoid RandomForest feature names error
+    features = build_feature_frame(raw_input)
     
     return features
 
 # Fungsi untuk prediksi menggunakan model RF
-def predict_student_status(input_features, model, scaller):
+@instrument()
+def predict_student_status(input_features, model, scaller, return_contributions=False):
     """
     Predict student status using the trained Random Forest model
     
+    Random Forest models are scored with the compiled forest engine (scaler
+    folded into the split thresholds), which returns the label and the
+    probabilities from one traversal and matches sklearn exactly.
+    
     Args:
         input_features: DataFrame with the correct feature names and format
-        model: The loaded machine learning model
-        scaller: The loaded scaler for feature normalization
+        model: The loaded machine learning model (or a CompiledForest, e.g. ModelBundle.forest)
+        scaller: The loaded scaler for feature normalization (unused for a CompiledForest)
+        return_contributions: Also return the per-feature contributions (forests only)
     
     Returns:
-        prediction: predicted class (0: Dropout, 1: Enrolled, 2: Graduate)
+        prediction: predicted class (a class label such as 'Dropout' for bundle forests)
         probabilities: probability for each class
+        contributions: only with return_contributions; DataFrame (features x classes) of
+            decision-path contributions that sum to probabilities minus the base rate,
+            or None for models that are not forests
     """
+    if isinstance(model, CompiledForest) or is_compilable(model):
+        engine = model if isinstance(model, CompiledForest) else get_compiled_forest(model, scaller)
+        with timed('predict_student_status.compiled_forest'):
+            labels, probabilities = engine.predict_with_proba(input_features)
+        if not return_contributions:
+            return labels[0], probabilities[0]
+        with timed('predict_student_status.contributions'):
+            _, contributions = engine.contributions(input_features)
+        contributions = pd.DataFrame(
+            contributions[0], index=engine.feature_names, columns=[str(c) for c in engine.classes]
+        )
+        return labels[0], probabilities[0], contributions
+
     # Get feature names before scaling
     feature_names = input_features.columns
     
     # Scale the input features
-    scaled_features = scaller.transform(input_features)
+    with timed('predict_student_status.scale'):
+        scaled_features = scaller.transform(input_features)
     
     # Convert back to DataFrame with the same feature names to avoid warning
     scaled_df = pd.DataFrame(scaled_features, columns=feature_names)
     
-    # Make prediction
-    prediction = model.predict(scaled_df)
-    
-    # Get probabilities if available
+    # Get probabilities if available, the label follows from them
     try:
-        probabilities = model.predict_proba(scaled_df)[0]
-    except:
+        with timed('predict_student_status.predict_proba'):
+            probabilities = model.predict_proba(scaled_df)[0]
+        prediction = model.classes_[np.argmax(probabilities)]
+    except AttributeError:
         probabilities = None
-        
-    return prediction[0], probabilities
\ No newline at end of file
+        with timed('predict_student_status.predict'):
+            prediction = model.predict(scaled_df)[0]
+    
+    if return_contributions:
+        return prediction, probabilities, None
+    return prediction, probabilities
+
+
+# Label fitur untuk penjelasan prediksi
+FEATURE_LABELS = {
+    'Application_mode': 'Jalur Pendaftaran',
+    'Debtor': 'Memiliki Tunggakan',
+    'Tuition_fees_up_to_date': 'SPP Tepat Waktu',
+    'Gender': 'Jenis Kelamin',
+    'Scholarship_holder': 'Penerima Beasiswa',
+    'Age_at_enrollment': 'Usia saat Masuk',
+    'Previous_qualification_grade': 'Nilai Kualifikasi Sebelumnya',
+    'Admission_grade': 'Nilai Masuk',
+    'Displaced': 'Tinggal di Luar Kota',
+    'Curricular_units_1st_sem_enrolled': 'MK Terdaftar Sem 1',
+    'Curricular_units_1st_sem_approved': 'MK Lulus Sem 1',
+    'Curricular_units_1st_sem_grade': 'Nilai Sem 1',
+    'Curricular_units_2nd_sem_enrolled': 'MK Terdaftar Sem 2',
+    'Curricular_units_2nd_sem_approved': 'MK Lulus Sem 2',
+    'Curricular_units_2nd_sem_grade': 'Nilai Sem 2',
+    'Total_enrolled_units': 'Total MK Terdaftar',
+    'Total_approved_unit': 'Total MK Lulus',
+    'Approval_rate': 'Tingkat Kelulusan MK',
+    'Average_grade': 'Rata-rata Nilai',
+}
+
+
+def create_contribution_chart(contributions, status, status_label=None, top=10):
+    """
+    Ranked bar chart of the features that pushed one prediction toward/away from ``status``.
+
+    Args:
+        contributions: DataFrame from predict_student_status(..., return_contributions=True)
+        status: Class column to explain (e.g. 'Dropout')
+        status_label: Display name of the class
+        top: Number of features shown (largest absolute contribution)
+
+    Returns:
+        plotly Figure
+    """
+    values = contributions[status]
+    values = values.reindex(values.abs().sort_values(ascending=False).index[:top])[::-1]
+    chart = pd.DataFrame({
+        'Fitur': [FEATURE_LABELS.get(name, name) for name in values.index],
+        'Kontribusi': values.to_numpy() * 100,
+        'Arah': np.where(values.to_numpy() >= 0, 'Menaikkan', 'Menurunkan'),
+    })
+    fig = px.bar(
+        chart, x='Kontribusi', y='Fitur', color='Arah', orientation='h',
+        title=f'Faktor yang Mempengaruhi Probabilitas {status_label or status}',
+        color_discrete_map={'Menaikkan': '#FF6B6B', 'Menurunkan': '#4ECDC4'},
+        labels={'Kontribusi': 'Kontribusi (poin persen)'}
+    )
+    fig.update_layout(yaxis={'categoryorder': 'array', 'categoryarray': chart['Fitur'].tolist()})
+    return fig
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+import time
+
+# One shared copy of every artifact per server process. Streamlit re-executes
+# app.py on each interaction but keeps imported modules, so this dict survives
+# reruns and is shared by all sessions.
+_artifacts = {}
+_lock = threading.Lock()
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_artifact(path, loader=None, identify=None):
+    """
+    Return the shared, lazily loaded artifact stored at ``path``.
+
+    The file is only deserialized on first use and again when its mtime or size
+    changes. A touched file whose identity is unchanged is not reloaded.
+
+    Args:
+        path: Path to the artifact file
+        loader: Function used to deserialize the file (default: joblib.load)
+        identify: Function returning the content identity of the file (default:
+            sha256 of the whole file). Formats that carry their own content
+            hash, like model bundles (bundle.bundle_identity), avoid reading
+            the file twice.
+
+    Returns:
+        The loaded object. Raises FileNotFoundError if the file does not exist.
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    entry = _artifacts.get(key)
+    if entry is not None and entry['signature'] == signature:
+        return entry['object']
+
+    with _lock:
+        entry = _artifacts.get(key)
+        if entry is not None and entry['signature'] == signature:
+            return entry['object']
+
+        identity = (identify or _file_digest)(key)
+        if entry is not None and entry['identity'] == identity:
+            # Same content, only the metadata changed
+            entry['signature'] = signature
+            return entry['object']
+
+        if loader is None:
+            # Imported here so bundle-only processes never load joblib
+            import joblib
+            loader = joblib.load
+        start = time.perf_counter()
+        obj = loader(key)
+        load_seconds = time.perf_counter() - start
+
+        _artifacts[key] = {
+            'object': obj,
+            'signature': signature,
+            'identity': identity,
+            'size_bytes': stat.st_size,
+            'load_seconds': load_seconds,
+            'loaded_at': time.time(),
+            'loads': (entry['loads'] + 1) if entry is not None else 1,
+        }
+        return obj
+
+
+def artifact_stats():
+    """Return load time, file size and reload count for every loaded artifact."""
+    return [
+        {
+            'path': path,
+            'size_bytes': entry['size_bytes'],
+            'load_seconds': entry['load_seconds'],
+            'loaded_at': entry['loaded_at'],
+            'loads': entry['loads'],
+            'identity': entry['identity'],
+        }
+        for path, entry in _artifacts.items()
+    ]
+
+
+def clear_artifacts():
+    """Drop every cached artifact so the next access loads it again."""
+    with _lock:
+        _artifacts.clear()
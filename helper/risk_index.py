@@ -0,0 +1,204 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .batch_scoring import score_frame
+from .bundle import ModelBundle
+from .data_store import ID_COLUMN, dataset_changes
+from .instrumentation import instrument
+
+# Students kept per course in the precomputed ranking
+TOP_K = 100
+
+# Columns kept for every Enrolled student (besides the course and the probability)
+RISK_COLUMNS = [ID_COLUMN, 'Gender', 'Age_at_enrollment', 'Approval_rate', 'Average_grade']
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _model_key(model):
+    # Bundles carry a content version; other models are identified by object
+    return model.version if isinstance(model, ModelBundle) else id(model)
+
+
+def _top_k(probabilities, k):
+    # Positions of the k largest probabilities, highest first, without a full sort
+    if k <= 0:
+        return np.arange(0)
+    if len(probabilities) > k:
+        candidates = np.argpartition(-probabilities, k - 1)[:k]
+    else:
+        candidates = np.arange(len(probabilities))
+    return candidates[np.argsort(-probabilities[candidates], kind='stable')]
+
+
+def _by_course(enrolled, probabilities):
+    students = pd.DataFrame({column: enrolled[column].to_numpy() for column in RISK_COLUMNS})
+    students['Dropout_probability'] = probabilities
+    courses = enrolled['Course_Name'].astype(str).to_numpy()
+    return {
+        course: students[courses == course].reset_index(drop=True)
+        for course in pd.unique(courses)
+    }
+
+
+def _score_enrolled(rows, model, scaller, class_names, dropout_label, probabilities=None):
+    # Dropout probability of the Enrolled students in ``rows``, one frame per course
+    is_enrolled = rows['Status'].astype(str).to_numpy() == 'Enrolled'
+    enrolled = rows[is_enrolled]
+    if len(enrolled) == 0:
+        return {}
+    if probabilities is not None:
+        # Already scored (e.g. by helper.precompute), aligned with ``rows``
+        return _by_course(enrolled, np.asarray(probabilities)[is_enrolled])
+    scored = score_frame(enrolled, model, scaller, class_names)
+    return _by_course(enrolled, scored[f'Prob_{dropout_label}'].to_numpy())
+
+
+def _rank(students, k):
+    # Column arrays are kept next to the frame so queries stay in NumPy
+    columns = {column: students[column].to_numpy() for column in students.columns}
+    return {
+        'students': students,
+        'columns': columns,
+        'top': _top_k(columns['Dropout_probability'], k),
+    }
+
+
+def build_risk_index(df, model, scaller=None, class_names=None, dropout_label='Dropout', k=TOP_K,
+                     probabilities=None):
+    """
+    Score every Enrolled student once and keep a top-k Dropout ranking per course.
+
+    Args:
+        df: Student dataset (from load_dataset)
+        model: ModelBundle, CompiledForest or fitted classifier
+        scaller: Fitted scaler (unused for bundles)
+        class_names: Class names for plain sklearn models
+        dropout_label: Name of the Dropout class
+        k: Students kept in each course's precomputed ranking
+        probabilities: Dropout probability of every row of df, already computed
+            by ``model`` (then nothing is scored)
+
+    Returns:
+        dict with 'courses' ({course: {'students', 'top'}}), 'k' and 'version'
+    """
+    courses = _score_enrolled(df, model, scaller, class_names, dropout_label, probabilities)
+    return {
+        'courses': {course: _rank(students, k) for course, students in courses.items()},
+        'k': k,
+        'version': df.attrs.get('version'),
+    }
+
+
+def update_risk_index(index, added, removed, model, scaller=None, class_names=None, dropout_label='Dropout'):
+    """
+    Apply a data delta to a risk index: only the added rows are scored and
+    only the courses they (or the replaced rows) belong to are re-ranked.
+
+    Returns:
+        New risk index (the old one is not modified)
+    """
+    scored = _score_enrolled(added, model, scaller, class_names, dropout_label)
+    changed_ids = np.union1d(added[ID_COLUMN].to_numpy(), removed[ID_COLUMN].to_numpy())
+    affected = set(scored) | set(removed['Course_Name'].astype(str)) | set(added['Course_Name'].astype(str))
+
+    courses = dict(index['courses'])
+    for course in affected:
+        parts = []
+        if course in courses:
+            students = courses[course]['students']
+            parts.append(students[~np.isin(students[ID_COLUMN].to_numpy(), changed_ids)])
+        if course in scored:
+            parts.append(scored[course])
+        students = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        if len(students):
+            courses[course] = _rank(students, index['k'])
+        else:
+            courses.pop(course, None)
+    return {'courses': courses, 'k': index['k'], 'version': index['version']}
+
+
+def get_risk_index(df, model, scaller=None, class_names=None, dropout_label='Dropout', probabilities=None):
+    """
+    Return the risk index for (dataset version, model), shared per process.
+
+    With ``probabilities`` (the Dropout probability of every row of df from
+    ``model``, e.g. precompute results) the index is only ranked, not scored.
+    Otherwise a dataset version that was loaded incrementally is derived from
+    the index of its parent version by scoring only the changed rows, and a
+    new model rebuilds the whole index.
+    """
+    key = (df.attrs.get('version'), _model_key(model))
+    index = _indexes.get(key)
+    if index is None:
+        with _lock:
+            index = _indexes.get(key)
+            if index is None:
+                changes = dataset_changes(df)
+                parent = _indexes.get((changes['parent'], key[1])) if changes is not None else None
+                if probabilities is not None:
+                    index = build_risk_index(df, model, dropout_label=dropout_label, probabilities=probabilities)
+                elif parent is not None:
+                    index = update_risk_index(
+                        parent, changes['added'], changes['removed'], model, scaller, class_names, dropout_label
+                    )
+                else:
+                    index = build_risk_index(df, model, scaller, class_names, dropout_label)
+                index['version'] = key[0]
+                _indexes.clear()
+                _indexes[key] = index
+    return index
+
+
+@instrument()
+def top_at_risk(index, course=None, n=10, gender=None, age_range=None):
+    """
+    Return the n Enrolled students with the highest Dropout probability.
+
+    The precomputed top-k of each course is used when it holds enough students
+    matching the filters; otherwise that course's Enrolled students are ranked
+    again with a partial sort.
+
+    Args:
+        index: Risk index from get_risk_index
+        course: Course name, or None for all programs
+        n: Number of students to return
+        gender: Gender code (1: male, 0: female), or None for both
+        age_range: Inclusive (min, max) age tuple, or None for all ages
+
+    Returns:
+        DataFrame with Course_Name, RISK_COLUMNS and Dropout_probability, highest risk first
+    """
+    columns = RISK_COLUMNS + ['Dropout_probability']
+    courses = [course] if course is not None else list(index['courses'])
+    selected = {column: [] for column in ['Course_Name'] + columns}
+    for name in courses:
+        entry = index['courses'].get(name)
+        if entry is None:
+            continue
+        arrays = entry['columns']
+        for positions in (entry['top'], None):
+            gender_values = arrays['Gender'] if positions is None else arrays['Gender'][positions]
+            age_values = arrays['Age_at_enrollment'] if positions is None else arrays['Age_at_enrollment'][positions]
+            mask = np.ones(len(gender_values), dtype=bool)
+            if gender is not None:
+                mask &= gender_values == gender
+            if age_range is not None:
+                mask &= (age_values >= age_range[0]) & (age_values <= age_range[1])
+            # The top-k answers the query unless filters left fewer than n of a larger course
+            if positions is None or mask.sum() >= n or len(positions) == len(arrays['Gender']):
+                break
+        matches = np.flatnonzero(mask) if positions is None else positions[mask]
+        matches = matches[_top_k(arrays['Dropout_probability'][matches], n)]
+        for column in columns:
+            selected[column].append(arrays[column][matches])
+        selected['Course_Name'].append(np.full(len(matches), name, dtype=object))
+
+    if not selected['Course_Name']:
+        return pd.DataFrame(columns=['Course_Name'] + columns)
+    merged = {column: np.concatenate(parts) for column, parts in selected.items()}
+    order = _top_k(merged['Dropout_probability'], n)
+    return pd.DataFrame({column: values[order] for column, values in merged.items()})
@@ -0,0 +1,470 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .batch_scoring import DEFAULT_ENCODER_PATH, DEFAULT_MODEL_PATH, DEFAULT_SCALLER_PATH, _load_artifacts, score_frame
+from .bundle import ModelBundle
+from .data_store import DEFAULT_CSV_PATH, load_dataset
+from .features import RAW_FEATURES
+from .risk_index import get_risk_index, top_at_risk
+
+# Number of recent requests kept for the latency percentiles
+LATENCY_WINDOW = 10_000
+
+# Largest request body read from a client (about 40k students per request)
+MAX_BODY_BYTES = 16 * 2 ** 20
+
+
+class LatencyStats:
+    """Rolling request latencies and lifetime throughput counters."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+
+    def record_request(self, seconds, rows):
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.rows += rows
+
+    def record_batch(self, rows):
+        self.batch_sizes.append(rows)
+        self.batches += 1
+
+    def snapshot(self):
+        elapsed = time.perf_counter() - self.started
+        latencies = np.asarray(self.latencies) * 1000
+        return {
+            'requests': self.requests,
+            'rows': self.rows,
+            'batches': self.batches,
+            'errors': self.errors,
+            'uptime_seconds': elapsed,
+            'requests_per_second': self.requests / elapsed if elapsed > 0 else 0.0,
+            'rows_per_second': self.rows / elapsed if elapsed > 0 else 0.0,
+            'latency_ms_p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'latency_ms_p99': float(np.percentile(latencies, 99)) if len(latencies) else None,
+            'mean_batch_rows': float(np.mean(self.batch_sizes)) if self.batch_sizes else None,
+        }
+
+
+class MicroBatcher:
+    """
+    Collect concurrent scoring requests into micro-batches.
+
+    A batch is closed when it holds ``max_batch_size`` rows or when
+    ``max_wait_ms`` has passed since its first request, then scored with a
+    single ``score_batch`` call in a worker thread.
+    """
+
+    def __init__(self, score_batch, max_batch_size=256, max_wait_ms=5.0, stats=None):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats or LatencyStats()
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def score(self, rows):
+        """Queue an array of students (one row each) and wait for their results."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            n_rows = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while n_rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                n_rows += len(item[0])
+
+            batch = np.concatenate([rows for rows, _ in items])
+            try:
+                scored = await loop.run_in_executor(None, self.score_batch, batch)
+            except Exception as e:
+                if len(items) == 1:
+                    if not items[0][1].done():
+                        items[0][1].set_exception(e)
+                    continue
+                # Score the requests one by one so only the failing one gets the error
+                await self._run_separately(loop, items)
+                continue
+
+            self.stats.record_batch(len(batch))
+            start = 0
+            for rows, future in items:
+                if not future.done():
+                    future.set_result(scored[start:start + len(rows)])
+                start += len(rows)
+
+    async def _run_separately(self, loop, items):
+        for rows, future in items:
+            try:
+                scored = await loop.run_in_executor(None, self.score_batch, rows)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.stats.record_batch(len(rows))
+            if not future.done():
+                future.set_result(scored)
+
+
+def _parse_students(payload):
+    # Accepts one student object, a list of them, or {"students": [...]}
+    if isinstance(payload, dict) and 'students' in payload:
+        payload = payload['students']
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not payload:
+        raise ValueError("Expected a student object, a list of students or {\"students\": [...]}")
+    try:
+        rows = np.array([[student[name] for name in RAW_FEATURES] for student in payload], dtype=np.float64)
+    except KeyError as e:
+        raise ValueError(f"Missing student field: {e.args[0]}")
+    except (TypeError, ValueError):
+        raise ValueError(f"Every student must be an object with numeric fields {RAW_FEATURES}")
+    # NaN / Infinity (JSON or "nan" strings) would make the whole micro-batch fail
+    invalid = ~np.isfinite(rows)
+    if invalid.any():
+        student, field = np.argwhere(invalid)[0]
+        raise ValueError(f"Student {student}: field {RAW_FEATURES[field]} must be a finite number")
+    return rows
+
+
+async def _read_request(reader, max_body=MAX_BODY_BYTES):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length < 0 or length > max_body:
+        # Refused without reading the body; None tells the caller to answer 413
+        return method, target, headers, None
+    body = await reader.readexactly(length) if length else b''
+    return method, target, headers, body
+
+
+def _response(status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    reason = {
+        200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large', 500: 'Internal Server Error'
+    }[status]
+    head = (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+class ScoringService:
+    """
+    JSON scoring endpoint backed by a MicroBatcher.
+
+    Routes:
+        POST /score    one or many students -> {"predictions": [...]}
+        GET  /at-risk  top Enrolled students by Dropout probability
+                       (?course=&n=10&gender=&age_min=&age_max=)
+        GET  /metrics  latency percentiles and throughput
+        GET  /health   {"status": "ok"}
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, scaller_path=DEFAULT_SCALLER_PATH,
+                 encoder_path=DEFAULT_ENCODER_PATH, max_batch_size=256, max_wait_ms=5.0, bundle_path=None,
+                 dataset_path=DEFAULT_CSV_PATH):
+        self.model, self.scaller, self.class_names = _load_artifacts(
+            model_path, scaller_path, encoder_path, bundle_path
+        )
+        self.dataset_path = dataset_path
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(self.score_batch, max_batch_size, max_wait_ms, self.stats)
+
+    def score_batch(self, block):
+        # One DataFrame and one predict_proba call per micro-batch
+        rows = pd.DataFrame(block, columns=RAW_FEATURES)
+        scored = score_frame(rows, self.model, self.scaller, self.class_names)
+        probability_columns = [c for c in scored.columns if c.startswith('Prob_')]
+        classes = [c[len('Prob_'):] for c in probability_columns]
+        return [
+            {'status': status, 'probabilities': dict(zip(classes, probabilities))}
+            for status, probabilities in zip(
+                scored['Predicted_Status'].tolist(), scored[probability_columns].to_numpy().tolist()
+            )
+        ]
+
+    def at_risk(self, query):
+        # Picks up newly ingested segments; only changed rows are rescored
+        params = {name: values[-1] for name, values in parse_qs(query).items()}
+        age_range = None
+        if 'age_min' in params or 'age_max' in params:
+            age_range = (int(params.get('age_min', 0)), int(params.get('age_max', 1000)))
+        index = get_risk_index(load_dataset(self.dataset_path), self.model, self.scaller, self.class_names)
+        students = top_at_risk(
+            index,
+            course=params.get('course'),
+            n=int(params.get('n', 10)),
+            gender=int(params['gender']) if 'gender' in params else None,
+            age_range=age_range,
+        )
+        return json.loads(students.to_json(orient='records'))
+
+    async def handle(self, method, target, body):
+        parts = urlsplit(target)
+        path = parts.path
+        if method == 'GET' and path == '/health':
+            health = {'status': 'ok'}
+            if isinstance(self.model, ModelBundle):
+                health['model_version'] = self.model.version
+            return 200, health
+        if method == 'GET' and path == '/metrics':
+            return 200, self.stats.snapshot()
+        if method == 'GET' and path == '/at-risk':
+            try:
+                students = await asyncio.get_running_loop().run_in_executor(None, self.at_risk, parts.query)
+            except ValueError as e:
+                return 400, {'error': str(e)}
+            return 200, {'students': students}
+        if method == 'POST' and path == '/score':
+            start = time.perf_counter()
+            try:
+                rows = _parse_students(json.loads(body or b'null'))
+            except ValueError as e:
+                self.stats.errors += 1
+                return 400, {'error': str(e)}
+            scored = await self.batcher.score(rows)
+            self.stats.record_request(time.perf_counter() - start, len(rows))
+            return 200, {'predictions': scored}
+        return 404, {'error': f"No route for {method} {path}"}
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                if body is None:
+                    self.stats.errors += 1
+                    writer.write(_response(413, {'error': f"Request body larger than {MAX_BODY_BYTES} bytes"}, False))
+                    await writer.drain()
+                    break
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    status, payload = await self.handle(method, target, body)
+                except Exception as e:
+                    self.stats.errors += 1
+                    status, payload = 500, {'error': str(e)}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8000, ready=None):
+        """Run the HTTP server until cancelled."""
+        self.batcher.start()
+        server = await asyncio.start_server(self._serve_connection, host, port)
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+async def _post(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    response = await reader.readexactly(length)
+    return int(status_line.split()[1]), json.loads(response)
+
+
+async def run_load(url, students, n_requests=2000, concurrency=32, rows_per_request=1, seed=42):
+    """
+    Fire ``n_requests`` POST /score requests from ``concurrency`` keep-alive clients.
+
+    Args:
+        url: Base URL of the scoring service, e.g. http://127.0.0.1:8000
+        students: List of student dicts to sample request bodies from
+        n_requests: Total number of requests
+        concurrency: Number of concurrent client connections
+        rows_per_request: Students per request
+        seed: Random seed for sampling students
+
+    Returns:
+        dict with client-side latency percentiles and throughput
+    """
+    parts = urlsplit(url)
+    rng = random.Random(seed)
+    latencies = []
+    failures = 0
+    counter = iter(range(n_requests))
+
+    async def client():
+        nonlocal failures
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+        try:
+            for _ in counter:
+                payload = rng.sample(students, rows_per_request)
+                start = time.perf_counter()
+                status, _ = await _post(reader, writer, parts.hostname, '/score', payload)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    failures += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'failures': failures,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'rows_per_second': len(latencies) * rows_per_request / elapsed,
+        'latency_ms_p50': float(np.percentile(latencies_ms, 50)),
+        'latency_ms_p99': float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def _load_students(csv_path, limit=5000):
+    data = pd.read_csv(csv_path, nrows=limit)
+    return data[RAW_FEATURES].to_dict(orient='records')
+
+
+async def _local_load_test(args):
+    # Start a service in this process, drive it with the load generator, print both sides
+    service = ScoringService(
+        args.model, args.scaller, args.encoder, args.max_batch_size, args.max_wait_ms, args.bundle, args.dataset
+    )
+    ready = asyncio.Event()
+    server = asyncio.get_running_loop().create_task(service.serve(args.host, args.port, ready))
+    await ready.wait()
+    try:
+        students = _load_students(args.data)
+        client = await run_load(
+            f"http://{args.host}:{args.port}", students, args.requests, args.concurrency, args.rows_per_request
+        )
+    finally:
+        server.cancel()
+        try:
+            await server
+        except asyncio.CancelledError:
+            pass
+    return client, service.stats.snapshot()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP scoring service for student status.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_service_args(sub):
+        sub.add_argument('--host', default='127.0.0.1')
+        sub.add_argument('--port', type=int, default=8000)
+        sub.add_argument('--model', default=DEFAULT_MODEL_PATH)
+        sub.add_argument('--scaller', default=DEFAULT_SCALLER_PATH)
+        sub.add_argument('--encoder', default=DEFAULT_ENCODER_PATH)
+        sub.add_argument('--bundle', default=None, help="Model bundle (replaces --model/--scaller/--encoder)")
+        sub.add_argument('--dataset', default=DEFAULT_CSV_PATH, help="Student dataset served by /at-risk")
+        sub.add_argument('--max-batch-size', type=int, default=256, help="Rows per micro-batch")
+        sub.add_argument('--max-wait-ms', type=float, default=5.0, help="Max wait before a batch is scored")
+
+    def add_load_args(sub):
+        sub.add_argument('--requests', type=int, default=2000)
+        sub.add_argument('--concurrency', type=int, default=32)
+        sub.add_argument('--rows-per-request', type=int, default=1)
+        sub.add_argument('--data', default='data/data_students.csv', help="CSV to sample students from")
+
+    add_service_args(subparsers.add_parser('serve', help="Run the scoring service"))
+
+    loadgen = subparsers.add_parser('loadgen', help="Send load to a running service")
+    loadgen.add_argument('--url', default='http://127.0.0.1:8000')
+    add_load_args(loadgen)
+
+    local = subparsers.add_parser('loadtest', help="Start a service and load it in one process")
+    add_service_args(local)
+    add_load_args(local)
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        service = ScoringService(
+            args.model, args.scaller, args.encoder, args.max_batch_size, args.max_wait_ms, args.bundle, args.dataset
+        )
+        print(f"Serving on http://{args.host}:{args.port} (POST /score, GET /metrics)")
+        try:
+            asyncio.run(service.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == 'loadgen':
+        students = _load_students(args.data)
+        client = asyncio.run(run_load(args.url, students, args.requests, args.concurrency, args.rows_per_request))
+        print(json.dumps({'client': client}, indent=2))
+    else:
+        client, server = asyncio.run(_local_load_test(args))
+        print(json.dumps({'client': client, 'server': server}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from .batch_scoring import score_frame
+from .features import RAW_FEATURES
+from .instrumentation import instrument
+
+# Features that can be swept: label, min, max and whether the feature is a whole count
+SWEEP_FEATURES = {
+    'Curricular_units_2nd_sem_grade': ('Nilai Rata-rata Semester 2', 0.0, 20.0, False),
+    'Curricular_units_1st_sem_grade': ('Nilai Rata-rata Semester 1', 0.0, 20.0, False),
+    'Curricular_units_2nd_sem_approved': ('Mata Kuliah Lulus (Sem 2)', 0, 10, True),
+    'Curricular_units_1st_sem_approved': ('Mata Kuliah Lulus (Sem 1)', 0, 10, True),
+    'Curricular_units_2nd_sem_enrolled': ('Mata Kuliah Terdaftar (Sem 2)', 0, 10, True),
+    'Curricular_units_1st_sem_enrolled': ('Mata Kuliah Terdaftar (Sem 1)', 0, 10, True),
+    'Admission_grade': ('Nilai Masuk', 0.0, 200.0, False),
+    'Previous_qualification_grade': ('Nilai Kualifikasi Sebelumnya', 0.0, 200.0, False),
+    'Age_at_enrollment': ('Usia saat Masuk', 17, 70, True),
+}
+
+# Semester pairs whose approved units cannot exceed the enrolled units
+_UNIT_PAIRS = [
+    ('Curricular_units_1st_sem_approved', 'Curricular_units_1st_sem_enrolled'),
+    ('Curricular_units_2nd_sem_approved', 'Curricular_units_2nd_sem_enrolled'),
+]
+
+
+def sweep_values(feature, steps=21):
+    """Return evenly spaced values over the input range of ``feature`` (every integer for counts)."""
+    _, low, high, whole = SWEEP_FEATURES[feature]
+    if whole:
+        return np.unique(np.linspace(low, high, min(steps, high - low + 1)).round()).astype(np.int64)
+    return np.linspace(low, high, steps)
+
+
+def build_sweep_grid(base, feature_x, values_x, feature_y=None, values_y=None):
+    """
+    Repeat one student over every combination of the swept feature values.
+
+    Args:
+        base: One-row DataFrame with the raw student columns (e.g. from user_input_features)
+        feature_x, values_x: First swept feature and its values
+        feature_y, values_y: Optional second swept feature and its values
+
+    Returns:
+        DataFrame of raw student rows, x varying fastest
+    """
+    grid_x, grid_y = np.meshgrid(values_x, values_y if feature_y else [0])
+    n_rows = grid_x.size
+    grid = {name: np.repeat(base[name].to_numpy()[:1], n_rows) for name in RAW_FEATURES}
+    grid[feature_x] = grid_x.ravel()
+    if feature_y:
+        grid[feature_y] = grid_y.ravel()
+    return pd.DataFrame(grid)
+
+
+@instrument()
+def run_sweep(base, model, scaller, feature_x, values_x, feature_y=None, values_y=None, class_names=None):
+    """
+    Score every what-if variant of one student in a single predict_proba call.
+
+    The derived features are recomputed for the whole grid at once by the
+    shared feature pipeline (inside score_frame).
+
+    Args:
+        base: One-row DataFrame with the raw student columns
+        model: ModelBundle, CompiledForest or fitted classifier
+        scaller: Fitted scaler (unused for bundles)
+        feature_x, values_x: First swept feature and its values
+        feature_y, values_y: Optional second swept feature and its values
+        class_names: Optional class names for plain sklearn models
+
+    Returns:
+        DataFrame with the swept feature column(s), Predicted_Status, Prob_<class>
+        columns and 'Valid' (False where approved units exceed enrolled units)
+    """
+    grid = build_sweep_grid(base, feature_x, values_x, feature_y, values_y)
+    scored = score_frame(grid, model, scaller, class_names)
+    swept = [feature_x] + ([feature_y] if feature_y else [])
+    result = pd.concat([grid[swept], scored], axis=1)
+    valid = np.ones(len(grid), dtype=bool)
+    for approved, enrolled in _UNIT_PAIRS:
+        valid &= grid[approved].to_numpy() <= grid[enrolled].to_numpy()
+    result['Valid'] = valid
+    return result
+
+
+def create_sweep_figure(result, feature_x, feature_y=None, status=None, status_labels=None):
+    """
+    Plot a sweep: probability curves for one feature, a probability surface for two.
+
+    Args:
+        result: Output of run_sweep
+        feature_x, feature_y: The swept features
+        status: Class whose probability is shown on the 2D surface
+        status_labels: Optional display names per class
+
+    Returns:
+        plotly Figure
+    """
+    status_labels = status_labels or {}
+    probability_columns = [c for c in result.columns if c.startswith('Prob_')]
+    label_x = SWEEP_FEATURES[feature_x][0]
+
+    if not feature_y:
+        long = result[result['Valid']].melt(
+            id_vars=[feature_x], value_vars=probability_columns, var_name='Status', value_name='Probabilitas'
+        )
+        long['Status'] = long['Status'].str[len('Prob_'):].map(lambda s: status_labels.get(s, s))
+        fig = px.line(
+            long, x=feature_x, y='Probabilitas', color='Status', markers=True,
+            title=f'Probabilitas Status terhadap {label_x}',
+            labels={feature_x: label_x},
+            color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#59CD90']
+        )
+        fig.update_yaxes(range=[0, 1], tickformat='.0%')
+        return fig
+
+    label_y = SWEEP_FEATURES[feature_y][0]
+    column = f'Prob_{status}'
+    surface = result.assign(**{column: result[column].where(result['Valid'])}).pivot(
+        index=feature_y, columns=feature_x, values=column
+    )
+    fig = go.Figure(go.Heatmap(
+        z=surface.to_numpy(), x=surface.columns, y=surface.index,
+        zmin=0, zmax=1, colorscale='RdYlGn_r' if status == 'Dropout' else 'RdYlGn',
+        colorbar=dict(title='Probabilitas', tickformat='.0%'),
+        hovertemplate=f'{label_x}: %{{x}}<br>{label_y}: %{{y}}<br>Probabilitas: %{{z:.1%}}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f'Probabilitas {status_labels.get(status, status)}: {label_x} × {label_y}',
+        xaxis_title=label_x, yaxis_title=label_y
+    )
+    return fig
@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import time
+import warnings
+from datetime import datetime, timezone
+
+import joblib
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
+from sklearn.model_selection import HalvingRandomSearchCV, train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from .batch_scoring import DEFAULT_ENCODER_PATH, DEFAULT_MODEL_PATH, DEFAULT_SCALLER_PATH
+from .bundle import DEFAULT_BUNDLE_PATH, bundle_from_artifacts, write_bundle
+from .data_store import DEFAULT_CSV_PATH
+from .features import FEATURE_NAMES, build_feature_frame
+from .precompute import build_drift_reference
+from .registry import _file_digest
+
+DEFAULT_REPORT_PATH = 'model/training_report.json'
+RANDOM_SEED = 42
+
+# Search space of the notebook's grid plus leaf size and a wider n_estimators range
+PARAM_DISTRIBUTIONS = {
+    'n_estimators': [50, 100, 200, 300],
+    'max_depth': [10, 20, 30, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': [None, 'sqrt', 'log2'],
+}
+
+
+def _search_estimator(seed, use_smote):
+    """
+    Return (estimator, parameter prefix, resampling name) for the search.
+
+    With imbalanced-learn installed SMOTE runs inside each CV fold, so the
+    validation folds never contain synthetic rows. Without it the forest
+    falls back to balanced class weights.
+    """
+    forest = RandomForestClassifier(random_state=seed, n_jobs=1)
+    if use_smote:
+        try:
+            from imblearn.over_sampling import SMOTE
+            from imblearn.pipeline import Pipeline
+        except ImportError:
+            warnings.warn("imbalanced-learn is not installed, using class_weight='balanced' instead of SMOTE")
+        else:
+            return Pipeline([('smote', SMOTE(random_state=seed)), ('model', forest)]), 'model__', 'smote'
+    forest.set_params(class_weight='balanced')
+    return forest, '', 'class_weight'
+
+
+def _dump_tmp(obj, path):
+    tmp_path = path + '.tmp'
+    joblib.dump(obj, tmp_path)
+    return tmp_path
+
+
+def split_dataset(csv_path=DEFAULT_CSV_PATH, seed=RANDOM_SEED, test_size=0.2):
+    """
+    Load the training CSV and make the stratified train/test split used by train().
+
+    Returns:
+        (X_train, X_test, y_train, y_test, label_encoder, n_rows) with raw (unscaled) features
+    """
+    data = pd.read_csv(csv_path, float_precision='round_trip')
+    X = build_feature_frame(data)
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(data['Status'])
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=seed, stratify=y
+    )
+    return X_train, X_test, y_train, y_test, label_encoder, len(data)
+
+
+def train(csv_path=DEFAULT_CSV_PATH, model_path=DEFAULT_MODEL_PATH, scaller_path=DEFAULT_SCALLER_PATH,
+          encoder_path=DEFAULT_ENCODER_PATH, report_path=DEFAULT_REPORT_PATH, bundle_path=DEFAULT_BUNDLE_PATH,
+          seed=RANDOM_SEED, test_size=0.2, cv=3, n_candidates='exhaust', scoring='accuracy', n_jobs=-1, use_smote=True):
+    """
+    Train the Random Forest and write model, scaller, label encoder and report together.
+
+    The hyperparameter search uses successive halving: every candidate starts
+    on a small sample and only the best third moves on to more data, with the
+    folds spread over ``n_jobs`` processes.
+
+    Args:
+        csv_path: Student CSV with the raw feature columns and Status
+        model_path, scaller_path, encoder_path: Artifact output paths
+        report_path: JSON report output path
+        bundle_path: Model bundle output path (None to skip)
+        seed: Random seed for the split, SMOTE, the search and the forest
+        test_size: Held-out fraction used for the reported metrics
+        cv: Cross-validation folds per halving round
+        n_candidates: Number of sampled parameter sets ('exhaust' fills the first round)
+        scoring: Search metric (sklearn scorer name)
+        n_jobs: Parallel search workers (-1 = all cores)
+        use_smote: Oversample the minority classes with SMOTE when available
+
+    Returns:
+        The report dict that was written to ``report_path``
+    """
+    start = time.perf_counter()
+    X_train, X_test, y_train, y_test, label_encoder, n_rows = split_dataset(csv_path, seed, test_size)
+    # Raw training distribution, compared with the served data by helper.precompute
+    drift_reference = build_drift_reference(X_train)
+    # Scaler is fitted on the training split only
+    scaller = StandardScaler().fit(X_train)
+    X_train = pd.DataFrame(scaller.transform(X_train), columns=FEATURE_NAMES)
+    X_test = pd.DataFrame(scaller.transform(X_test), columns=FEATURE_NAMES)
+
+    estimator, prefix, resampling = _search_estimator(seed, use_smote)
+    search = HalvingRandomSearchCV(
+        estimator,
+        {prefix + name: values for name, values in PARAM_DISTRIBUTIONS.items()},
+        n_candidates=n_candidates,
+        factor=3,
+        cv=cv,
+        scoring=scoring,
+        n_jobs=n_jobs,
+        random_state=seed,
+    )
+    search_start = time.perf_counter()
+    search.fit(X_train, y_train)
+    search_seconds = time.perf_counter() - search_start
+
+    best = search.best_estimator_
+    model = best.named_steps['model'] if prefix else best
+
+    y_pred = model.predict(X_test)
+    probabilities = model.predict_proba(X_test)
+    class_names = [str(c) for c in label_encoder.classes_]
+
+    # Write the pickles and the bundle before replacing any, so they always come from one run
+    paths = [model_path, scaller_path, encoder_path]
+    for path in paths + [bundle_path or '']:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_paths = [_dump_tmp(obj, path) for obj, path in zip([model, scaller, label_encoder], paths)]
+    if bundle_path:
+        tmp_paths.append(bundle_path + '.tmp')
+        write_bundle(tmp_paths[-1], bundle_from_artifacts(model, scaller, label_encoder, drift_reference))
+        paths.append(bundle_path)
+    for tmp_path, path in zip(tmp_paths, paths):
+        os.replace(tmp_path, path)
+
+    report = {
+        'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'seconds': time.perf_counter() - start,
+        'search_seconds': search_seconds,
+        'seed': seed,
+        'data': {
+            'path': csv_path,
+            'rows': n_rows,
+            'train_rows': len(X_train),
+            'test_rows': len(X_test),
+        },
+        'resampling': resampling,
+        'search': {
+            'method': 'HalvingRandomSearchCV',
+            'scoring': scoring,
+            'cv': cv,
+            'candidates': int(search.n_candidates_[0]),
+            'iterations': int(search.n_iterations_),
+            'best_score': float(search.best_score_),
+            'best_params': {name[len(prefix):]: value for name, value in search.best_params_.items()},
+        },
+        'test': {
+            'accuracy': float(accuracy_score(y_test, y_pred)),
+            'roc_auc_ovr': float(roc_auc_score(y_test, probabilities, multi_class='ovr')),
+            'per_class': classification_report(y_test, y_pred, target_names=class_names, output_dict=True),
+            'confusion_matrix': confusion_matrix(y_test, y_pred).tolist(),
+        },
+        'feature_names': FEATURE_NAMES,
+        'classes': class_names,
+        'sklearn_version': sklearn.__version__,
+        'artifacts': {
+            os.path.basename(path): {'sha256': _file_digest(path), 'size_bytes': os.path.getsize(path)}
+            for path in paths
+        },
+    }
+    with open(report_path + '.tmp', 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(report_path + '.tmp', report_path)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the student status Random Forest and write its artifacts.")
+    parser.add_argument('--data', default=DEFAULT_CSV_PATH, help="Training CSV")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--scaller', default=DEFAULT_SCALLER_PATH)
+    parser.add_argument('--encoder', default=DEFAULT_ENCODER_PATH)
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH)
+    parser.add_argument('--bundle', default=DEFAULT_BUNDLE_PATH)
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--cv', type=int, default=3)
+    parser.add_argument('--candidates', default='exhaust', help="Parameter sets to sample (default: exhaust)")
+    parser.add_argument('--scoring', default='accuracy')
+    parser.add_argument('--jobs', type=int, default=-1, help="Parallel search workers (default: all cores)")
+    parser.add_argument('--no-smote', action='store_true', help="Use balanced class weights instead of SMOTE")
+    parser.add_argument('--compact', action='store_true',
+                        help="Afterwards compare compact serving models (see helper.compaction)")
+    args = parser.parse_args(argv)
+
+    n_candidates = args.candidates if args.candidates == 'exhaust' else int(args.candidates)
+    report = train(
+        args.data, args.model, args.scaller, args.encoder, args.report, args.bundle, seed=args.seed,
+        test_size=args.test_size, cv=args.cv, n_candidates=n_candidates, scoring=args.scoring,
+        n_jobs=args.jobs, use_smote=not args.no_smote,
+    )
+    print(f"Trained in {report['seconds']:.1f}s (search {report['search_seconds']:.1f}s, {report['resampling']})")
+    print(f"Best params: {report['search']['best_params']}")
+    print(f"Test accuracy: {report['test']['accuracy']:.4f}")
+    for name in report['classes']:
+        metrics = report['test']['per_class'][name]
+        print(f"  {name:<10} precision={metrics['precision']:.3f} recall={metrics['recall']:.3f} f1={metrics['f1-score']:.3f}")
+    print(f"Report written to {args.report}")
+
+    if args.compact:
+        from .compaction import compact, format_report
+
+        compaction = compact(
+            args.data, args.model, args.scaller, args.encoder, seed=args.seed, test_size=args.test_size,
+            use_smote=not args.no_smote,
+        )
+        print(format_report(compaction))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+import joblib
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from helper.features import FEATURE_NAMES, build_feature_frame
+
+SOURCE_CSV = 'data/data_students.csv'
+
+
+@pytest.fixture(scope='session')
+def artifacts(tmp_path_factory):
+    """Paths of a small model, scaller and label encoder fitted like helper.training."""
+    directory = tmp_path_factory.mktemp('model')
+    data = pd.read_csv(SOURCE_CSV).iloc[:800]
+    X = build_feature_frame(data)
+    scaller = StandardScaler().fit(X)
+    encoder = LabelEncoder().fit(data['Status'])
+    model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0)
+    model.fit(pd.DataFrame(scaller.transform(X), columns=FEATURE_NAMES), encoder.transform(data['Status']))
+    paths = [str(directory / name) for name in ('model.pkl', 'scaller.pkl', 'encoder.pkl')]
+    for obj, path in zip([model, scaller, encoder], paths):
+        joblib.dump(obj, path)
+    return paths
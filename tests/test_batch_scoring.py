@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from helper.batch_scoring import score_file
+from helper.features import FEATURE_NAMES
+
+SOURCE_CSV = 'data/data_students.csv'
+
+
+def test_parquet_chunks_with_missing_values_share_one_schema(tmp_path, artifacts):
+    pq = pytest.importorskip('pyarrow.parquet')
+    data = pd.read_csv(SOURCE_CSV).iloc[:300]
+    data.insert(0, 'Student_id', np.arange(len(data)))
+    data['Note'] = ''
+    lines = data.to_csv(index=False).splitlines()
+    columns = lines[0].split(',')
+    # Third chunk: a missing Student_id (int64 turns float), a fractional
+    # age (an int feature turns float) and the first non-empty note
+    row = lines[1 + 250].split(',')
+    row[columns.index('Student_id')] = ''
+    row[columns.index('Age_at_enrollment')] = '20.5'
+    row[columns.index('Note')] = 'pindahan'
+    lines[1 + 250] = ','.join(row)
+    input_path = tmp_path / 'students.csv'
+    input_path.write_text('\n'.join(lines) + '\n')
+
+    output_path = str(tmp_path / 'scored.parquet')
+    summary = score_file(str(input_path), output_path, *artifacts, chunk_size=100, workers=1, explain='Dropout')
+
+    table = pq.read_table(output_path)
+    assert summary['rows'] == table.num_rows == 300
+    assert table.schema.field('Student_id').type == 'int64'
+    assert table.column('Student_id').null_count == 1
+    assert table.schema.field('Note').type == 'string'
+    assert table.column('Note').to_pylist()[250] == 'pindahan'
+    for name in FEATURE_NAMES + ['Prob_Dropout', 'Contrib_Admission_grade']:
+        assert table.schema.field(name).type == 'double'
+    assert table.column('Age_at_enrollment').to_pylist()[250] == 20.5
@@ -0,0 +1,108 @@
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from helper.bundle import (
+    bundle_from_artifacts, bundle_from_forest, bundle_identity, load_bundle, read_header, write_bundle,
+)
+from helper.features import FEATURE_NAMES, build_feature_frame
+from helper.forest import float32_forest
+
+SOURCE_CSV = 'data/data_students.csv'
+
+
+@pytest.fixture(scope='module')
+def fitted(artifacts):
+    return [joblib.load(path) for path in artifacts]
+
+
+@pytest.fixture(scope='module')
+def features():
+    return build_feature_frame(pd.read_csv(SOURCE_CSV).iloc[:1000])
+
+
+@pytest.fixture
+def bundle_path(tmp_path, fitted):
+    path = str(tmp_path / 'model.bundle')
+    write_bundle(path, bundle_from_artifacts(*fitted))
+    return path
+
+
+def _is_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_round_trip_is_memory_mapped_and_exact(bundle_path, fitted, features):
+    model, scaller, encoder = fitted
+    bundle = load_bundle(bundle_path)
+
+    for name in ['threshold', 'value', 'children', 'feature']:
+        assert _is_mapped(getattr(bundle.forest, name))
+    assert bundle.class_labels == list(encoder.classes_)
+    assert bundle.feature_names == FEATURE_NAMES
+    np.testing.assert_array_equal(bundle.scaler_mean, scaller.mean_)
+
+    labels, proba = bundle.predict_with_proba(features)
+    expected = model.predict_proba(pd.DataFrame(scaller.transform(features), columns=FEATURE_NAMES))
+    np.testing.assert_array_equal(proba, expected)
+    np.testing.assert_array_equal(labels, encoder.classes_[expected.argmax(axis=1)])
+
+
+def test_float32_forest_keeps_its_dtypes(tmp_path, fitted, features):
+    scaller = fitted[1]
+    forest = float32_forest(bundle_from_artifacts(*fitted).forest)
+    path = str(tmp_path / 'compact.bundle')
+    write_bundle(path, bundle_from_forest(forest, scaller))
+
+    loaded = load_bundle(path).forest
+    assert loaded.threshold.dtype == np.float32 and loaded.left.dtype == np.int32
+    np.testing.assert_array_equal(loaded.predict_proba(features), forest.predict_proba(features))
+
+
+@pytest.mark.parametrize('feature_names', [FEATURE_NAMES[::-1], FEATURE_NAMES[:-1], FEATURE_NAMES + ['GDP']])
+def test_mismatched_feature_schema_is_refused(bundle_path, feature_names):
+    with pytest.raises(ValueError, match="Feature schema mismatch"):
+        load_bundle(bundle_path, feature_names=feature_names)
+
+
+def test_verify_detects_corrupted_arrays(bundle_path):
+    identity = bundle_identity(bundle_path)
+    header, data_start = read_header(bundle_path)
+    load_bundle(bundle_path, verify=True)
+
+    # Flip one byte inside the threshold array
+    offset = data_start + header['arrays']['threshold']['offset'] + 3
+    with open(bundle_path, 'r+b') as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    load_bundle(bundle_path)
+    with pytest.raises(ValueError, match="corrupted"):
+        load_bundle(bundle_path, verify=True)
+    # The identity only covers the header; verify=True is what checks the arrays
+    assert bundle_identity(bundle_path) == identity
+
+
+def test_identity_changes_with_the_bundle(tmp_path, bundle_path, fitted):
+    other_path = str(tmp_path / 'other.bundle')
+    shutil.copy(bundle_path, other_path)
+    assert bundle_identity(other_path) == bundle_identity(bundle_path)
+
+    write_bundle(other_path, bundle_from_artifacts(*fitted, drift_reference={'note': 'other'}))
+    assert bundle_identity(other_path) != bundle_identity(bundle_path)
+
+
+def test_other_files_are_not_bundles(tmp_path):
+    path = tmp_path / 'model.pkl'
+    path.write_bytes(b'\x80\x04not a bundle')
+    with pytest.raises(ValueError, match="not a model bundle"):
+        load_bundle(str(path))
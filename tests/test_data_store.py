@@ -0,0 +1,134 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from helper import data_store
+from helper import bitmap_index
+from helper.bitmap_index import build_bitmap_index, get_bitmap_index
+from helper.cube import CUBE_KEYS, build_count_cube, get_count_cube
+from helper.data_store import ID_COLUMN, dataset_changes, ingest_records, load_dataset
+
+SOURCE_CSV = 'data/data_students.csv'
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'students.csv'
+    shutil.copy(SOURCE_CSV, path)
+    return str(path)
+
+
+def _reopen(csv_path):
+    # Drop the process cache so the store is opened from disk, not incrementally
+    data_store._datasets.pop(os.path.abspath(data_store.default_store_path(csv_path)), None)
+    return load_dataset(csv_path)
+
+
+def _is_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def _sorted_cube(cube):
+    return cube.sort_values(CUBE_KEYS).reset_index(drop=True)
+
+
+def _assert_same_bitmaps(index, expected):
+    assert index['n_rows'] == expected['n_rows']
+    assert index['bitmaps'].keys() == expected['bitmaps'].keys()
+    for column, bitmaps in expected['bitmaps'].items():
+        assert index['bitmaps'][column].keys() == bitmaps.keys()
+        for value, bits in bitmaps.items():
+            np.testing.assert_array_equal(index['bitmaps'][column][value], bits)
+
+
+def _ingest_and_compare(csv_path, records, monkeypatch):
+    before = load_dataset(csv_path)
+    get_count_cube(before)
+    get_bitmap_index(before)
+    ingest_records(records, csv_path)
+
+    df = load_dataset(csv_path)
+    assert dataset_changes(df) is not None
+    # The new version's index must come from the delta, not a full build
+    monkeypatch.setattr(bitmap_index, 'build_bitmap_index', None)
+    index = get_bitmap_index(df)
+    monkeypatch.undo()
+    full = _reopen(csv_path)
+    assert full.attrs['version'] == df.attrs['version']
+    pd.testing.assert_frame_equal(df, full, check_dtype=False)
+
+    pd.testing.assert_frame_equal(_sorted_cube(get_count_cube(df)), _sorted_cube(build_count_cube(full)))
+    _assert_same_bitmaps(index, build_bitmap_index(full))
+    return df
+
+
+def test_incremental_load_matches_full_rebuild(csv_path, monkeypatch):
+    base = load_dataset(csv_path)
+    raw = pd.read_csv(csv_path)
+
+    # Partial update: only the 2nd semester grade and the status of 50 students
+    updates = pd.DataFrame({
+        ID_COLUMN: base[ID_COLUMN].to_numpy()[:50],
+        'Curricular_units_2nd_sem_grade': np.linspace(10, 15, 50),
+        'Status': ['Graduate'] * 50,
+    })
+    df = _ingest_and_compare(csv_path, updates, monkeypatch)
+    assert _is_mapped(df['Age_at_enrollment'].to_numpy())
+    assert len(df) == len(base)
+
+    # New students plus a second update of students changed above
+    mixed = pd.concat([
+        raw.iloc[100:130],
+        # Other students' values, so course, gender and age change too
+        raw.iloc[200:210].assign(**{ID_COLUMN: base[ID_COLUMN].to_numpy()[:10], 'Status': 'Dropout'}),
+    ], ignore_index=True)
+    df = _ingest_and_compare(csv_path, mixed, monkeypatch)
+    assert len(df) == len(base) + 30
+
+
+def test_compaction_keeps_data_and_maps_columns(csv_path, monkeypatch):
+    base = load_dataset(csv_path)
+    raw = pd.read_csv(csv_path)
+
+    n_new = int(data_store.COMPACT_FRACTION * len(base)) + 1
+    result = ingest_records(raw.iloc[:n_new], csv_path)
+    manifest = data_store._read_manifest(data_store.default_store_path(csv_path))
+    assert manifest['snapshot']['segments'] == 1
+    assert manifest['version'] == result['version']
+
+    df = load_dataset(csv_path)
+    assert len(df) == len(base) + n_new
+    assert all(_is_mapped(df[column].to_numpy()) for column in ['Admission_grade', ID_COLUMN])
+
+    # Segments after the snapshot are applied on top of it
+    _ingest_and_compare(csv_path, raw.iloc[n_new:n_new + 5], monkeypatch)
+
+
+def _load_summary(csv_path):
+    df = load_dataset(csv_path)
+    return len(df), df.attrs['version'], float(df.loc[df[ID_COLUMN] == 0, 'Curricular_units_2nd_sem_grade'].iloc[0])
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_processes_rebuild_a_changed_csv_once(csv_path):
+    import multiprocessing
+
+    ingest_records(pd.DataFrame({ID_COLUMN: [0], 'Curricular_units_2nd_sem_grade': [17.25]}), csv_path)
+    n_rows = len(load_dataset(csv_path))
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    with multiprocessing.get_context('fork').Pool(4) as pool:
+        results = pool.map(_load_summary, [csv_path] * 8)
+
+    assert len(set(results)) == 1
+    assert results[0][0] == n_rows and results[0][2] == 17.25
+    leftovers = [name for name in os.listdir(os.path.dirname(csv_path)) if '.tmp-' in name or '.old-' in name]
+    assert leftovers == []
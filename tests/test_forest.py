@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import AdaBoostClassifier, BaggingClassifier, ExtraTreesClassifier, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from helper import forest as forest_module
+from helper.forest import compile_forest, is_compilable
+
+FEATURES = [f'f{i}' for i in range(6)]
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_classification(
+        n_samples=600, n_features=len(FEATURES), n_informative=4, n_classes=3, random_state=0
+    )
+    # Raw features on different scales, like the student data
+    X = pd.DataFrame(X * [1, 10, 100, 0.1, 5, 1000] + [0, 50, -20, 3, 0, 1e4], columns=FEATURES)
+    return X, y
+
+
+def _fit(estimator, X, y):
+    scaller = StandardScaler().fit(X)
+    model = estimator.fit(pd.DataFrame(scaller.transform(X), columns=FEATURES), y)
+    return model, scaller
+
+
+def _sklearn_proba(model, scaller, X):
+    return model.predict_proba(pd.DataFrame(scaller.transform(X), columns=FEATURES))
+
+
+def _near_thresholds(model, scaller, X, n_rows=400, seed=0):
+    # Rows with one feature set to a split threshold (in raw units) or one ulp around it
+    rng = np.random.default_rng(seed)
+    splits = [
+        (feature, threshold)
+        for tree in model.estimators_
+        for feature, threshold in zip(tree.tree_.feature, tree.tree_.threshold)
+        if feature >= 0
+    ]
+    rows = X.to_numpy()[rng.integers(0, len(X), n_rows)].copy()
+    for row in rows:
+        feature, threshold = splits[rng.integers(len(splits))]
+        raw = threshold * scaller.scale_[feature] + scaller.mean_[feature]
+        row[feature] = np.nextafter(raw, rng.choice([-np.inf, raw, np.inf]))
+    return pd.DataFrame(rows, columns=FEATURES)
+
+
+@pytest.fixture(params=['numpy', 'native'])
+def traversal(request, monkeypatch):
+    # Every batch goes through one traversal: NumPy, or sklearn's trees over rank-encoded features
+    monkeypatch.setattr(forest_module, 'NATIVE_MIN_ROWS', 10 ** 9 if request.param == 'numpy' else 1)
+    return request.param
+
+
+@pytest.mark.parametrize('estimator', [
+    RandomForestClassifier(n_estimators=25, random_state=0),
+    RandomForestClassifier(n_estimators=10, max_depth=4, min_samples_leaf=5, random_state=1),
+    ExtraTreesClassifier(n_estimators=15, random_state=0),
+])
+def test_predict_proba_matches_sklearn(data, estimator, traversal):
+    X, y = data
+    model, scaller = _fit(estimator, X, y)
+    forest = compile_forest(model, scaller)
+
+    for rows in (X, _near_thresholds(model, scaller, X)):
+        labels, proba = forest.predict_with_proba(rows)
+        expected = _sklearn_proba(model, scaller, rows)
+        np.testing.assert_array_equal(proba, expected)
+        np.testing.assert_array_equal(labels, model.classes_[expected.argmax(axis=1)])
+        expected_leaves = model.apply(pd.DataFrame(scaller.transform(rows), columns=FEATURES))
+        np.testing.assert_array_equal(forest.apply(rows), expected_leaves + forest.roots)
+
+
+def test_contributions_sum_to_predict_proba(data):
+    X, y = data
+    model, scaller = _fit(RandomForestClassifier(n_estimators=20, random_state=0), X, y)
+    forest = compile_forest(model, scaller)
+
+    bias, contributions = forest.contributions(X)
+    assert contributions.shape == (len(X), len(FEATURES), len(model.classes_))
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), forest.predict_proba(X), atol=1e-12)
+
+
+@pytest.mark.parametrize('estimator', [
+    AdaBoostClassifier(n_estimators=5, random_state=0),
+    BaggingClassifier(n_estimators=5, max_features=0.5, random_state=0),
+])
+def test_other_tree_ensembles_are_not_compiled(data, estimator):
+    X, y = data
+    model, scaller = _fit(estimator, X, y)
+    assert not is_compilable(model)
+    with pytest.raises(ValueError):
+        compile_forest(model, scaller)
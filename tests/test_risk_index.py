@@ -0,0 +1,72 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from helper import data_store, risk_index
+from helper.data_store import ID_COLUMN, dataset_changes, ingest_records, load_dataset
+from helper.risk_index import build_risk_index, get_risk_index, top_at_risk
+
+SOURCE_CSV = 'data/data_students.csv'
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'students.csv'
+    shutil.copy(SOURCE_CSV, path)
+    return str(path)
+
+
+def _ranked(students):
+    # Order independent of how the rows were appended
+    return students.sort_values(['Dropout_probability', ID_COLUMN], ascending=[False, True]).reset_index(drop=True)
+
+
+def test_incremental_index_matches_full_rebuild(csv_path, artifacts, monkeypatch):
+    model, scaller, encoder = [joblib.load(path) for path in artifacts]
+    class_names = list(encoder.classes_)
+    base = load_dataset(csv_path)
+    get_risk_index(base, model, scaller, class_names)
+
+    raw = pd.read_csv(csv_path)
+    status = base['Status'].astype(str).to_numpy()
+    enrolled_ids = base[ID_COLUMN].to_numpy()[status == 'Enrolled'][:15]
+    graduate_ids = base[ID_COLUMN].to_numpy()[status == 'Graduate'][:15]
+    records = pd.concat([
+        # New Enrolled students
+        raw[raw['Status'] == 'Enrolled'].iloc[:20],
+        # Enrolled students that graduate, leave the index
+        pd.DataFrame({ID_COLUMN: enrolled_ids[:10], 'Status': 'Graduate'}),
+        # Enrolled students with new grades, moved to another course
+        pd.DataFrame({ID_COLUMN: enrolled_ids[10:], 'Curricular_units_2nd_sem_grade': 5.0, 'Course': 9500}),
+        # Graduates listed as Enrolled again, join the index
+        pd.DataFrame({ID_COLUMN: graduate_ids, 'Status': 'Enrolled'}),
+    ], ignore_index=True)
+    ingest_records(records, csv_path)
+
+    df = load_dataset(csv_path)
+    assert dataset_changes(df) is not None
+    # The new version's index must be derived from the delta
+    monkeypatch.setattr(risk_index, 'build_risk_index', None)
+    index = get_risk_index(df, model, scaller, class_names)
+    monkeypatch.undo()
+
+    data_store._datasets.pop(os.path.abspath(data_store.default_store_path(csv_path)))
+    full = build_risk_index(load_dataset(csv_path), model, scaller, class_names)
+
+    assert sorted(index['courses']) == sorted(full['courses'])
+    for course, entry in full['courses'].items():
+        pd.testing.assert_frame_equal(_ranked(index['courses'][course]['students']), _ranked(entry['students']))
+
+    for query in [{}, {'course': 'Nursing'}, {'gender': 0, 'age_range': (18, 25)}, {'n': 200}]:
+        query = {'n': 25, **query}
+        np.testing.assert_array_equal(
+            top_at_risk(index, **query)['Dropout_probability'].to_numpy(),
+            top_at_risk(full, **query)['Dropout_probability'].to_numpy(),
+        )
+    moved = index['courses']['Nursing']['students']
+    assert set(enrolled_ids[10:]) <= set(moved[ID_COLUMN])
+    assert not set(enrolled_ids[:10]) & {i for entry in index['courses'].values() for i in entry['students'][ID_COLUMN]}
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from helper.features import RAW_FEATURES
+from helper.scoring_service import MAX_BODY_BYTES, MicroBatcher, ScoringService
+
+SOURCE_CSV = 'data/data_students.csv'
+
+
+@pytest.fixture(scope='module')
+def students():
+    return pd.read_csv(SOURCE_CSV)[RAW_FEATURES].iloc[:20].to_dict(orient='records')
+
+
+def test_failing_request_does_not_fail_its_batch():
+    def score_batch(rows):
+        if (rows < 0).any():
+            raise ValueError("negative input")
+        return rows.sum(axis=1).tolist()
+
+    async def run():
+        batcher = MicroBatcher(score_batch, max_batch_size=100, max_wait_ms=50)
+        batcher.start()
+        try:
+            requests = [np.full((2, 3), 1.0), np.full((1, 3), -1.0), np.full((3, 3), 2.0)]
+            results = await asyncio.gather(*(batcher.score(rows) for rows in requests), return_exceptions=True)
+        finally:
+            await batcher.stop()
+        return results, batcher.stats
+
+    (good, bad, other), stats = asyncio.run(run())
+    assert good == [3.0, 3.0]
+    assert isinstance(bad, ValueError)
+    assert other == [6.0, 6.0, 6.0]
+    # The combined batch failed, then each request was scored on its own
+    assert stats.batches == 2
+
+
+def test_non_finite_values_are_rejected(artifacts, students):
+    service = ScoringService(*artifacts)
+
+    async def run():
+        service.batcher.start()
+        try:
+            nan_json = json.dumps([students[0], dict(students[1], Admission_grade=float('nan'))]).encode()
+            inf_string = json.dumps(dict(students[2], Debtor='inf')).encode()
+            return await asyncio.gather(
+                service.handle('POST', '/score', json.dumps(students[:5]).encode()),
+                service.handle('POST', '/score', nan_json),
+                service.handle('POST', '/score', inf_string),
+            )
+        finally:
+            await service.batcher.stop()
+
+    (ok_status, ok), (nan_status, nan_error), (inf_status, inf_error) = asyncio.run(run())
+    assert ok_status == 200 and len(ok['predictions']) == 5
+    assert nan_status == 400 and 'Student 1: field Admission_grade' in nan_error['error']
+    assert inf_status == 400 and 'field Debtor' in inf_error['error']
+    assert service.stats.errors == 2
+
+
+def test_oversized_body_gets_413_without_being_read(artifacts, students):
+    service = ScoringService(*artifacts)
+
+    async def request(head, body=b''):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(head + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        response = await reader.read()
+        writer.close()
+        return status_line, response
+
+    async def run():
+        nonlocal port
+        service.batcher.start()
+        server = await asyncio.start_server(service._serve_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            body = json.dumps(students[:2]).encode()
+            small = await request(
+                f"POST /score HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode(), body
+            )
+            # Only the headers are sent: the server must answer without waiting for the body
+            large = await asyncio.wait_for(
+                request(f"POST /score HTTP/1.1\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\n\r\n".encode()), 5
+            )
+        finally:
+            server.close()
+            await server.wait_closed()
+            await service.batcher.stop()
+        return small, large
+
+    port = None
+    (small_status, _), (large_status, large_body) = asyncio.run(run())
+    assert small_status.startswith(b'HTTP/1.1 200')
+    assert large_status.startswith(b'HTTP/1.1 413')
+    assert b'Request body larger than' in large_body